@@ -1,5 +1,6 @@
 #!/bin/env python3
 from fuzzsdn.app.analytics.log.regexes import *
+from fuzzsdn.app.analytics.log.log_scanner import *
 from fuzzsdn.app.analytics.log.log_parser import *
 from fuzzsdn.app.analytics.log.onos_log_parser import *
 from fuzzsdn.app.analytics.log.ryu_log_parser import *
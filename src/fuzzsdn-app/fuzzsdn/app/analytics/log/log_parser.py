@@ -1,34 +1,64 @@
 #!/bin/env python3
-import mmap
 import os
 import re
-import shutil
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
-from fuzzsdn.common import app_path
+from fuzzsdn.app.analytics.log.log_scanner import LogScanner
+
+
+class LogVerdict:
+    """
+    The outcome of a test, as decided from the logs of the controller.
+    """
+
+    def __init__(self):
+        self.has_error      = False
+        self.error_type     = None
+        self.error_reason   = None
+        self.error_effect   = None
+        self.final          = False  # True if no log written afterwards can change the outcome
+    # End def __init__
+
+    def as_tuple(self) -> tuple:
+        """Returns the outcome as a (has_error, error_type, error_reason, error_effect) tuple."""
+        return self.has_error, self.error_type, self.error_reason, self.error_effect
+    # End def as_tuple
+
+    def __repr__(self):
+        return "LogVerdict(has_error={}, error_type={}, error_reason={}, error_effect={}, final={})".format(
+            self.has_error, self.error_type, self.error_reason, self.error_effect, self.final)
+# End class LogVerdict
 
 
 class LogParser:
     """
-    LogParser is the base class for any log parsing operation
+    LogParser is the base class for any log parsing operation.
+
+    The log files are tailed: a mark records the end of each log file, and only the bytes appended after the mark are
+    loaded. Files are identified by their device and inode, so that a rotated (renamed) file is still read from its mark
+    while the new file replacing it is read from its beginning. The first bytes of the file are kept with the mark to
+    detect a file truncated and written again since the mark.
+
+    The logs can also be followed while a test runs (see `follow`), to know its outcome as soon as it is final.
     """
 
+    _HEAD_SIZE = 64  # Number of bytes kept with a mark to detect that a file has been rewritten
+
     def __init__(self):
-        self._cached_log = os.path.join(app_path.tmp_dir(), "{}_cached_log".format(id(self)))
         self._loaded = False
+        self._marks : Dict[Tuple[int, int], Tuple[int, bytes]] = dict()  # Size and head of the files when marked
+        self._log_text : Optional[str] = None  # The loaded logs
+        self._tails : Dict[Tuple[int, int], int] = dict()  # Position up to which the files have been followed
+        self._followed = str()  # Logs followed since the mark
     # End def init
 
     # ===== ( Properties ) =============================================================================================
 
     @property
     def log_trace(self):
-        if self._cached_log is None:
+        if self._log_text is None:
             return AttributeError("No logs cached.")
-
-        with open(self._cached_log, 'r') as f:
-            log_trace = "".join(f.readlines())
-
-        return log_trace
+        return self._log_text
     # End def log_trace
 
     # ===== ( Methods ) ================================================================================================
@@ -38,8 +68,30 @@ class LogParser:
         raise NotImplementedError('subclasses must override parse_log()!')
     # End def parse_log
 
+    def mark(self):
+        """Mark the current end of the log files, so that only the lines written afterwards are loaded."""
+        raise NotImplementedError('subclasses must override mark()!')
+    # End def mark
+
+    def clear_marks(self):
+        """Remove the marks on the log files, so that the log files are loaded from their beginning."""
+        self._marks = dict()
+        self._reset_follow()
+    # End def clear_marks
+
+    def follow(self) -> LogVerdict:
+        """Read the lines written since the last call (since the mark for the first call) and decide the outcome of the
+        test from the logs followed so far.
+
+        Returns:
+            The verdict on the logs followed since the mark.
+        """
+        self._followed += self._read_appended()
+        return self._verdict(self._followed)
+    # End def follow
+
     def load_from_file(self, path : str, pattern : Optional[re.Pattern] = None, concatenate : bool = True, reverse : bool = False):
-        """Load a log file by copying it into a temporary file.
+        """Load the content of log files appended since their mark.
 
         Args:
             path (str)          : The path to the directory where the log files are located.
@@ -58,62 +110,149 @@ class LogParser:
 
             # If concatenate is true, concatenate all the logs
             if concatenate is True and len(log_names) > 1:
-                with open(self._cached_log, 'w') as out_file:
-                    for f_name in sorted(log_names, reverse=reverse):
-                        with open(f_name) as in_file:
-                            for line in in_file:
-                                out_file.write(line)
+                log_text = "".join(self.__read_from_mark(f_name) for f_name in sorted(log_names, reverse=reverse))
 
-            # Else, just copy the last file
+            # Else, just read the last file
             elif len(log_names) > 0:
-                shutil.copy(sorted(log_names, reverse=reverse)[-1], self._cached_log)
+                log_text = self.__read_from_mark(sorted(log_names, reverse=reverse)[-1])
 
             else:
                 raise RuntimeError("Couldn't find any log message, matching pattern '{}' under '{}'".format(pattern.pattern, path))
 
-        # If it's a just a file, copy the log file to the cache.
+        # If it's a just a file, read it.
         else:
-            shutil.copy(path, self._cached_log)
+            log_text = self.__read_from_mark(path)
 
         # Signal that the file is loaded
-        self._loaded = True
+        self.load_from_string(log_text)
     # End def load_from_file
 
     def load_from_string(self, log_str):
-        """Load a log file from a string by writing it into a temporary file.
+        """Load logs from a string.
 
         Args:
-            log_str: The path to the file
+            log_str: The logs to load
         """
-        with open(self._cached_log, 'w') as f:
-            f.write(log_str)
+        self._log_text = log_str
         self._loaded = True
     # End def load_from_string
 
     # ===== ( Protected Methods ) ======================================================================================
 
-    def _match(self, regexes: dict) -> List[dict]:
-        """Parse the cached log file and outputs a list of matches.
+    def _log_source(self) -> Tuple[Optional[str], Optional[re.Pattern]]:
+        """Returns the path to the log file (or directory) of the controller, and the pattern of the log file names."""
+        raise NotImplementedError('subclasses must override _log_source()!')
+    # End def _log_source
+
+    def _verdict(self, log_text: str) -> LogVerdict:
+        """Decide the outcome of a test from its logs."""
+        raise NotImplementedError('subclasses must override _verdict()!')
+    # End def _verdict
+
+    def _read_appended(self) -> str:
+        """Read the complete lines written in the log files since the last call, or since their mark."""
+        path, pattern = self._log_source()
+        if path is None or not os.path.exists(path):
+            return str()
+
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, f) for f in os.listdir(path) if pattern is None or pattern.match(f))
+        else:
+            files = [path]
+
+        appended = str()
+        for f in files:
+            try:
+                appended += self.__read_appended_lines(f)
+            except OSError:  # The file has been rotated while listing the directory
+                continue
+        return appended
+    # End def _read_appended
+
+    def _reset_follow(self):
+        """Forget the logs followed so far, the next call to `follow` starts from the marks."""
+        self._tails = dict()
+        self._followed = str()
+    # End def _reset_follow
+
+    def _mark_files(self, *paths):
+        """Mark the current end of the given log files or of the log files in the given directories."""
+        self._reset_follow()
+        for path in paths:
+            if os.path.isdir(path):
+                files = [os.path.join(path, f) for f in os.listdir(path)]
+            else:
+                files = [path]
+            for f in files:
+                if not os.path.isfile(f):
+                    continue
+                try:
+                    with open(f, 'rb') as log_file:
+                        stat = os.fstat(log_file.fileno())
+                        self._marks[(stat.st_dev, stat.st_ino)] = (stat.st_size, log_file.read(self._HEAD_SIZE))
+                except OSError:  # The file has been rotated while listing the directory
+                    continue
+    # End def _mark_files
+
+    def _match(self, regexes: Union[dict, LogScanner], log_text: Optional[str] = None) -> List[dict]:
+        """Parse the loaded logs (or the given logs) and outputs a list of matches.
 
         The matches are ordered by appearance, to be further processed by a specialized log parser or by the user.
 
         Args:
-            regexes: A dictionary of regex with the name of the regex has key and a regex string as values
+            regexes: A dictionary of regex with the name of the regex has key and a regex string as values, or a
+                     LogScanner built from such a dictionary.
+            log_text: The logs to parse. Default to the loaded logs.
 
         Returns:
             A list dictionaries with a regex key and a match, sorted by the order in which they appear
         """
-        matches = []
-        with open(self._cached_log, 'r+') as f:
-            # map the file to memory to avoid too many copies
-            mm_log_file = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ).read().decode("utf-8")
+        if log_text is None:
+            log_text = self._log_text if self._log_text is not None else ""
+        if isinstance(regexes, LogScanner):
+            return regexes.scan(log_text)
 
+        matches = []
         for rgx_key in regexes.keys():
-            for match in re.finditer(regexes[rgx_key], mm_log_file):
+            for match in re.finditer(regexes[rgx_key], log_text):
                 matches.append({'rgx_key': rgx_key, 'match': match})
 
         # Sort the regex by their match position
         return sorted(matches, key=lambda m: m['match'].start())
     # End def _match
 
+    # ===== ( Private Methods ) ========================================================================================
+
+    def __marked_offset(self, f, stat) -> int:
+        """Returns the offset of the mark of an open log file. A file that was not marked (i.e. created after the mark
+        by a rotation) is read from its beginning, as well as a file that has been truncated since its mark."""
+        size, head = self._marks.get((stat.st_dev, stat.st_ino), (0, b''))
+        f.seek(0)
+        if stat.st_size < size or f.read(len(head)) != head:
+            size = 0
+        return size
+    # End def __marked_offset
+
+    def __read_from_mark(self, path) -> str:
+        """Read a log file from its mark."""
+        with open(path, 'rb') as f:
+            f.seek(self.__marked_offset(f, os.fstat(f.fileno())))
+            return f.read().decode('utf-8', errors='replace')
+    # End def __read_from_mark
+
+    def __read_appended_lines(self, path) -> str:
+        """Read the complete lines written in a log file since the last call, or since its mark."""
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            offset = self._tails.get((stat.st_dev, stat.st_ino))
+            if offset is None or stat.st_size < offset:
+                offset = self.__marked_offset(f, stat)
+            f.seek(offset)
+            data = f.read()
+
+        # Keep the last incomplete line for the next call
+        data = data[:data.rfind(b'\n') + 1]
+        self._tails[(stat.st_dev, stat.st_ino)] = offset + len(data)
+        return data.decode('utf-8', errors='replace')
+    # End def __read_appended_lines
 # End class LogParser
@@ -4,7 +4,7 @@ import os.path
 import re
 from typing import Optional
 
-from fuzzsdn.app.analytics.log import LOG_RGX, LogParser
+from fuzzsdn.app.analytics.log import LOG_KEYWORDS, LOG_RGX, LogParser, LogScanner, LogVerdict
 from fuzzsdn.app import setup
 
 
@@ -16,6 +16,8 @@ class OnosLogParser(LogParser):
     def __init__(self):
         super().__init__()
         self.__log = logging.getLogger(__name__)
+        self.__scanner = LogScanner(LOG_RGX['ONOS'], LOG_KEYWORDS['ONOS'])
+        self.__log_pattern = re.compile(r'karaf(-\d+)*\.log', re.I)
         try:
             self.__log_dir = os.path.join(os.path.expanduser(setup.config().onos.root_dir), 'karaf', 'data', 'log')
         except AttributeError:
@@ -23,12 +25,16 @@ class OnosLogParser(LogParser):
             self.__log_dir = None
     # End def __init__
 
+    def mark(self):
+        if self.__log_dir is not None and os.path.isdir(self.__log_dir):
+            self._mark_files(self.__log_dir)
+    # End def mark
+
     def parse_log(self, path : Optional[str] = None, pattern : Optional[re.Pattern] = None, concatenate : bool = True, reverse : bool = False):
         self.__log.info("Parsing ONOS log file at: \"{}\"".format(self.__log_dir if path in (None, '') else path))
         # Read the log first
         if path is None or path == '':
-            self.load_from_file(self.__log_dir,
-                                pattern=re.compile(r'karaf(-\d+)*\.log', re.I),
+            self.load_from_file(*self._log_source(),
                                 concatenate=True,
                                 reverse=False)
         else:
@@ -37,6 +43,17 @@ class OnosLogParser(LogParser):
                                 concatenate=concatenate,
                                 reverse=reverse)
 
+        verdict = self._verdict(self.log_trace)
+        return verdict.has_error, verdict.error_type, verdict.error_reason, verdict.error_effect, self.log_trace
+    # End def parse_log
+
+    # ===== ( Protected Methods ) ======================================================================================
+
+    def _log_source(self):
+        return self.__log_dir, self.__log_pattern
+    # End def _log_source
+
+    def _verdict(self, log_text: str) -> LogVerdict:
         has_error = False
         error_type = None
         error_reason = None
@@ -47,7 +64,7 @@ class OnosLogParser(LogParser):
         connected_switches = list()
 
         self.__log.debug("Detecting error tokens the log...")
-        key_and_matches = self._match(LOG_RGX['ONOS'])
+        key_and_matches = self._match(self.__scanner, log_text)
 
         for key_match in key_and_matches:
             # When no error was previously detected
@@ -149,8 +166,15 @@ class OnosLogParser(LogParser):
                     self.__log.trace("Switch disconnection detected")
                     error_effect = 'SWITCH_DISCONNECTED'
 
-        return has_error, error_type, error_reason, error_effect, self.log_trace
-    # End def parse_log
+        verdict = LogVerdict()
+        verdict.has_error       = has_error
+        verdict.error_type      = error_type
+        verdict.error_reason    = error_reason
+        verdict.error_effect    = error_effect
+        # A processing error is only classified by the decoder exception logged after it
+        verdict.final           = has_error is True and error_type != 'PROCESSING_ERROR'
+        return verdict
+    # End def _verdict
 # End class OnosLogParser
 
 
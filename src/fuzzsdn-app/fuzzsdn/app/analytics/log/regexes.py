@@ -111,3 +111,33 @@ LOG_RGX = {
     }
 }
 
+
+# Keywords used to locate the matches of the regexes above without trying them over the whole logs (see LogScanner).
+# Every match of a regex starts where its keyword starts, or where it ends for a regex starting with a look-behind.
+LOG_KEYWORDS = {
+
+    'ONOS': {
+        'SWITCH_CONNECTION':            r'New\sswitch\sconnection\sfrom\s/',
+        'ADDED_SWITCH':                 r'Added\sswitch\s',
+        'SWITCH_DISCONNECTED_NICIRA':   r'Switch\sdisconnected\scallback\sfor\ssw:',
+        'SWITCH_DISCONNECTED_STD':      r'Switch\sdisconnected\scallback\sfor\ssw:',
+        'SWITCH_DISCONNECTED_HELLO':    r'Switch\sdisconnected\scallback\sfor\ssw:',
+        'OF_HELLO':                     r'Sending\s',
+        'PROCESSING_ERROR':             r'Error\swhile\sprocessing\smessage\sfrom\s',
+        'PROCESSING_ERROR_HELLO':       r'Error\swhile\sprocessing\smessage\sfrom\s',
+        'TRACEBACK':                    r'Traceback \(most recent call last\):',
+        'DECODER_EXCEPTION':            r'io\.netty\.handler\.codec\.DecoderException:\s',
+        'PKT_DESERIALIZATION_ERROR':    r'Packet\sdeserialization\sproblem',
+        'OPENFLOW_ERROR':               r'Received\serror\smessage\s',
+        'OF_BAD_REQUEST_ERROR':         r'OFBadRequestErrorMsgVer',
+        'SWITCH_STATE_ERROR':           r'Disconnecting\sswitch',
+    },
+
+    'RYU': {
+        'EVENT':            r'EVENT\s',
+        'HELLO_EVENT':      r'hello\sev\s<',
+        'OPF_ERROR':        r'OFPErrorMsg\(',
+        'PARSING_ERROR':    r'Encountered an error while parsing OpenFlow packet from switch',
+        'EXCEPTION':        r'Traceback \(most recent call last\):',
+    }
+}
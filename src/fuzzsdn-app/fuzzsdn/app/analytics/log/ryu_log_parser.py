@@ -3,7 +3,8 @@ import logging
 import os
 
 from fuzzsdn.app import setup
-from fuzzsdn.app.analytics.log import LOG_RGX, LogParser
+from fuzzsdn.app.analytics.log import LOG_KEYWORDS, LOG_RGX, LogParser, LogScanner, LogVerdict
+from fuzzsdn.app.drivers import RyuDriver
 from fuzzsdn.common.openflow.error import ErrorType
 
 
@@ -15,27 +16,74 @@ class RyuLogParser(LogParser):
     def __init__(self):
         super().__init__()
         self.__log = logging.getLogger(__name__)
+        self.__scanner = LogScanner(LOG_RGX['RYU'], LOG_KEYWORDS['RYU'])
         self.__log_path = os.path.join(os.path.expanduser(setup.config().ryu.log_dir), 'ryu.log')
+        self.__buffer_mark = (None, 0)  # Buffer of Ryu running in-process and position marked in it
+        self.__buffer_tail = (None, 0)  # Buffer of Ryu running in-process and position followed in it
     # End def __init__
 
+    def mark(self):
+        self._mark_files(self.__log_path)
+        if RyuDriver.log_buffer() is not None:
+            self.__buffer_mark = (RyuDriver.log_buffer(), RyuDriver.log_buffer().position())
+        self.__buffer_tail = self.__buffer_mark
+    # End def mark
+
+    def clear_marks(self):
+        super().clear_marks()
+        self.__buffer_mark = (None, 0)
+        self.__buffer_tail = (None, 0)
+    # End def clear_marks
+
     def parse_log(self, path=None):
         """
 
         :return: has_error, error_type, error_reason, error_effect, log_trace
         """
-        self.__log.info("Parsing RYU log file at: \"{}\"".format(self.__log_path if path in (None, '') else path))
         # Read the log first
-        if path is None or path == '':
+        buffer = RyuDriver.log_buffer()
+        if path in (None, '') and buffer is not None:
+            self.__log.info("Parsing RYU logs in memory")
+            # A mark taken on a previous run of Ryu doesn't apply to its current buffer
+            since = self.__buffer_mark[1] if self.__buffer_mark[0] is buffer else 0
+            self.load_from_string(buffer.text(since))
+        elif path is None or path == '':
+            self.__log.info("Parsing RYU log file at: \"{}\"".format(self.__log_path))
             self.load_from_file(self.__log_path)
         else:
+            self.__log.info("Parsing RYU log file at: \"{}\"".format(path))
             self.load_from_file(path)
 
+        verdict = self._verdict(self.log_trace)
+        return verdict.has_error, verdict.error_type, verdict.error_reason, verdict.error_effect, self.log_trace
+    # End def parse_log
+
+    # ===== ( Protected Methods ) ======================================================================================
+
+    def _log_source(self):
+        return self.__log_path, None
+    # End def _log_source
+
+    def _read_appended(self) -> str:
+        buffer = RyuDriver.log_buffer()
+        if buffer is None:
+            return super()._read_appended()
+
+        # A position taken on a previous run of Ryu doesn't apply to its current buffer
+        since = self.__buffer_tail[1] if self.__buffer_tail[0] is buffer else 0
+        with buffer.lock:  # No record must be emitted between reading the text and the position
+            text = buffer.text(since)
+            self.__buffer_tail = (buffer, buffer.position())
+        return text
+    # End def _read_appended
+
+    def _verdict(self, log_text: str) -> LogVerdict:
         has_error = False
         error_type = None
         error_reason = None
         error_effect = None
 
-        matches = super()._match(LOG_RGX['RYU'])
+        matches = self._match(self.__scanner, log_text)
 
 
         hello_happened = False
@@ -88,6 +136,13 @@ class RyuLogParser(LogParser):
                     else:
                         error_reason = "{} {}".format(match['type'], match['reason'])
 
-        return has_error, error_type, error_reason, error_effect, self.log_trace
-    # End def parse_log
+        verdict = LogVerdict()
+        verdict.has_error       = has_error
+        verdict.error_type      = error_type
+        verdict.error_reason    = error_reason
+        verdict.error_effect    = error_effect
+        # The reason of a parsing error is given by the exception logged after it
+        verdict.final           = has_error is True and (error_type != 'PARSING_ERROR' or error_reason is not None)
+        return verdict
+    # End def _verdict
 # End class RyuLogParser
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Module to save the state of an experiment, so that it can be resumed after a crash or a reboot.
+
+The checkpoint of an experiment is written in its directory at the end of each iteration and, during the tests, each
+time a batch of samples has been written to the database. Only the samples written to the database can be resumed, so
+the samples still buffered are written before each checkpoint. The checkpoint holds the state of the main loop
+(context, iteration, statistics, rules and their budgets), the counters of the analyzer and the progress of the tests
+of the current iteration. It is pickled, as the rules hold sympy expressions.
+"""
+import logging
+import os
+import pickle
+from typing import Optional
+
+from fuzzsdn.common import app_path
+
+# ===== ( Globals definition ) =========================================================================================
+
+VERSION = 1  # Version of the content of the checkpoints
+_log = logging.getLogger(__name__)
+
+
+# ===== ( Functions ) ==================================================================================================
+
+def path() -> str:
+    """Returns the path of the checkpoint of the current experiment."""
+    return os.path.join(app_path.exp_dir(), 'checkpoint.pkl')
+# End def path
+
+
+def save(state: dict):
+    """Save the state of the experiment. The previous checkpoint is replaced atomically, so that a crash while saving
+    leaves it intact.
+
+    Args:
+        state (dict): The state of the experiment.
+    """
+    tmp_path = path() + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(dict(state, version=VERSION), f)
+    os.replace(tmp_path, path())
+    _log.trace("Checkpoint saved at \"{}\"".format(path()))
+# End def save
+
+
+def load() -> Optional[dict]:
+    """Load the state of the current experiment.
+
+    Returns:
+        The state of the experiment, or None if the experiment has no checkpoint.
+
+    Raises:
+        ValueError: if the checkpoint was written by an incompatible version.
+    """
+    try:
+        with open(path(), 'rb') as f:
+            state = pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+    if state.get('version') != VERSION:
+        raise ValueError("Checkpoint \"{}\" has version {}, expected {}".format(path(), state.get('version'), VERSION))
+    return state
+# End def load
@@ -1,6 +1,7 @@
 #!/bin/env python3
+from fuzzsdn.app.drivers.async_mininet_driver import *
 from fuzzsdn.app.drivers.fuzzer_driver import *
 from fuzzsdn.app.drivers.mininet_driver import *
 from fuzzsdn.app.drivers.onos_driver import *
+from fuzzsdn.app.drivers.privileged_driver import *
 from fuzzsdn.app.drivers.ryu_driver import *
-
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asynchronous driver which runs commands on the nodes of a running Mininet network without going through its CLI.
+
+The commands of the hosts are run in their network namespace with "mnexec", and the commands of the switches are run
+with "ovs-ofctl" on the host, so that many commands can run at the same time.
+"""
+import asyncio
+import itertools
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fuzzsdn.app import setup
+from fuzzsdn.app.analytics.ping_stats import PingStats
+
+
+class AsyncMininetDriver:
+    """Runs concurrent commands on the nodes of a Mininet network.
+
+    Args:
+        nodes (dict): The nodes of the network, as returned by `MininetDriver.nodes`.
+        max_concurrency (int): The maximum number of commands running at the same time.
+    """
+
+    __log = logging.getLogger(__name__)
+
+    def __init__(self, nodes: dict, max_concurrency: int = 32):
+        self.nodes              = nodes
+        self.max_concurrency    = max_concurrency
+
+        self.__semaphores : Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = dict()
+    # End def __init__
+
+    # ===== ( Commands ) ===============================================================================================
+
+    async def run(self, *args: str, node: Optional[str] = None, timeout: float = 5.0) -> Tuple[Optional[int], str]:
+        """Run a command as root, in the namespace of a node or on the host.
+
+        Args:
+            args (str): The command and its arguments.
+            node (str): The name of the node in which the command is run. If None, the command is run on the host.
+            timeout (float): The maximum time in seconds given to the command before it is killed.
+
+        Returns:
+            The return code of the command (None if it has been killed) and its output.
+        """
+        if node is not None:
+            args = ('mnexec', '-a', str(self.nodes[node]['pid'])) + args
+
+        password = None
+        if os.geteuid() != 0:
+            password = setup.config().general.get('sudo_pwd', None)
+            args = ('sudo', '-S', '-p', '') + args if password else ('sudo', '-n') + args
+
+        async with self.__semaphore():
+            self.__log.trace("Running \"{}\"".format(" ".join(args)))
+            process = await asyncio.create_subprocess_exec(*args,
+                                                           stdin=asyncio.subprocess.PIPE,
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.STDOUT)
+            try:
+                output, _ = await asyncio.wait_for(
+                    process.communicate(input="{}\n".format(password).encode() if password else None),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                self.__log.error("\"{}\" did not complete after {}s".format(" ".join(args), timeout))
+                process.kill()
+                await process.wait()
+                return None, str()
+
+        return process.returncode, output.decode('utf-8', errors='replace')
+    # End def run
+
+    async def ping(self, src: str, dst: str, count: int = 1, wait_timeout: float = 1.0,
+                   interval: float = 1.0) -> Optional[PingStats]:
+        """Ping from one host to another.
+
+        Args:
+            src (str): The host from which the ping is sent.
+            dst (str): The host to which the ping is sent.
+            count (int): The number of ping messages to send.
+            wait_timeout (float): The maximum time (in seconds) allowed between a ping and its response.
+            interval (float): The interval (in seconds) between two ping messages.
+
+        Returns:
+            An instance of PingStats if the ping was run, None otherwise.
+        """
+        address = self.address(dst)
+        if address is None:
+            self.__log.error("Cannot ping \"{}\", it has no address".format(dst))
+            return None
+
+        _, output = await self.run('ping', address, '-c', str(count), '-i', str(interval), '-W', str(wait_timeout),
+                                   node=src,
+                                   timeout=(wait_timeout + interval) * count + 5)
+        if 'packets transmitted' not in output:
+            self.__log.error("Ping from \"{}\" to \"{}\" failed: {}".format(src, dst, output.strip()))
+            return None
+        return PingStats(output)
+    # End def ping
+
+    async def ping_all(self, hosts: Optional[Iterable[str]] = None, count: int = 1, wait_timeout: float = 1.0,
+                       interval: float = 1.0) -> Dict[Tuple[str, str], Optional[PingStats]]:
+        """Ping every host from every other host, all at the same time.
+
+        Args:
+            hosts (Iterable[str]): The hosts to ping. Defaults to all the hosts of the network.
+            count (int): The number of ping messages to send between each pair of hosts.
+            wait_timeout (float): The maximum time (in seconds) allowed between a ping and its response.
+            interval (float): The interval (in seconds) between two ping messages.
+
+        Returns:
+            The reachability matrix, as a dictionary of the ping statistics by (source, destination) pair.
+        """
+        if hosts is None:
+            hosts = [name for name in sorted(self.nodes.keys()) if self.nodes[name]['type'] == 'host']
+
+        pairs = list(itertools.permutations(hosts, 2))
+        results = await asyncio.gather(*(self.ping(src, dst, count, wait_timeout, interval) for src, dst in pairs))
+        return dict(zip(pairs, results))
+    # End def ping_all
+
+    async def add_flow(self, sw: str, flow: str, timeout: float = 5.0) -> bool:
+        """Add a flow to the table of a switch. See "ovs-ofctl add-flow" documentation."""
+        return_code, output = await self.run('ovs-ofctl', 'add-flow', sw, flow, timeout=timeout)
+        if return_code != 0:
+            self.__log.error("Couldn't add flow \"{}\" to \"{}\": {}".format(flow, sw, output.strip()))
+        return return_code == 0
+    # End def add_flow
+
+    async def delete_flow(self, sw: str, flow: Optional[str] = None, strict: bool = False,
+                          timeout: float = 5.0) -> bool:
+        """Delete flows from the table of a switch. If no flow is given, all the flows are removed."""
+        args = ('ovs-ofctl', 'del-flows', sw) + ((flow,) if flow is not None else ()) + (('--strict',) if strict else ())
+        return_code, output = await self.run(*args, timeout=timeout)
+        if return_code != 0:
+            self.__log.error("Couldn't delete flows from \"{}\": {}".format(sw, output.strip()))
+        return return_code == 0
+    # End def delete_flow
+
+    async def flush_arp(self, host: str, timeout: float = 5.0) -> bool:
+        """Clear the ARP cache of a host."""
+        return_code, output = await self.run('ip', 'neigh', 'flush', 'all', node=host, timeout=timeout)
+        if return_code != 0:
+            self.__log.error("Couldn't clear the ARP cache of \"{}\": {}".format(host, output.strip()))
+        return return_code == 0
+    # End def flush_arp
+
+    async def reconnect(self, sw: str, timeout: float = 5.0) -> bool:
+        """Force a switch to reconnect to its controllers."""
+        # Setting the same controllers again is a no-op for OVS, they have to be removed first
+        return_code, output = await self.run(
+            'sh', '-c', 'ctrl=$(ovs-vsctl get-controller "$0") && ovs-vsctl del-controller "$0" '
+                        '&& ovs-vsctl set-controller "$0" $ctrl', sw,
+            timeout=timeout
+        )
+        if return_code != 0:
+            self.__log.error("Couldn't reconnect \"{}\" to its controllers: {}".format(sw, output.strip()))
+        return return_code == 0
+    # End def reconnect
+
+    async def get_controllers(self, sw: str, timeout: float = 5.0) -> Optional[List[str]]:
+        """Returns the controllers of a switch, or None if they couldn't be read."""
+        return_code, output = await self.run('ovs-vsctl', 'get-controller', sw, timeout=timeout)
+        if return_code != 0:
+            self.__log.error("Couldn't get the controllers of \"{}\": {}".format(sw, output.strip()))
+            return None
+        return output.split()
+    # End def get_controllers
+
+    async def set_controllers(self, sw: str, controllers: List[str], timeout: float = 5.0) -> bool:
+        """Set the controllers of a switch. Without any controller, the switch is disconnected from its controllers."""
+        if len(controllers) > 0:
+            args = ('ovs-vsctl', 'set-controller', sw, *controllers)
+        else:
+            args = ('ovs-vsctl', 'del-controller', sw)
+        return_code, output = await self.run(*args, timeout=timeout)
+        if return_code != 0:
+            self.__log.error("Couldn't set the controllers of \"{}\": {}".format(sw, output.strip()))
+        return return_code == 0
+    # End def set_controllers
+
+    # ===== ( Nodes ) ==================================================================================================
+
+    def address(self, host: str) -> Optional[str]:
+        """Returns the first IP address of a host, or None if it has none."""
+        interfaces = self.nodes.get(host, dict()).get('interfaces', dict())
+        return next((address for address in interfaces.values() if address is not None), None)
+    # End def address
+
+    # ===== ( Private methods ) ========================================================================================
+
+    def __semaphore(self) -> asyncio.Semaphore:
+        """Returns the semaphore limiting the concurrent commands. A semaphore is bound to the event loop running it."""
+        loop = asyncio.get_event_loop()
+        if loop not in self.__semaphores:
+            self.__semaphores = {loop: asyncio.Semaphore(self.max_concurrency)}
+        return self.__semaphores[loop]
+    # End def __semaphore
+# End class AsyncMininetDriver
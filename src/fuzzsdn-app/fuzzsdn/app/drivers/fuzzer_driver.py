@@ -2,15 +2,17 @@
 import json
 import logging
 import os
+import socket
 import subprocess
-from time import sleep
-from typing import Optional
+from timeit import default_timer as timer
+from typing import Any, Callable, Dict, Optional
 
 import pexpect
 
 from fuzzsdn.app import setup
+from fuzzsdn.app.drivers import readiness, supervisor
 from fuzzsdn.app.drivers.commons import sudo_expect
-from fuzzsdn.common import app_path
+from fuzzsdn.app.drivers.privileged_driver import PrivilegedDriver
 from fuzzsdn.common.utils.log import LogPipe
 
 
@@ -21,6 +23,20 @@ class FuzzerDriver:
     __handle : Optional[subprocess.Popen] = None
     __stderr_pipe = None
     __stdout_pipe = None
+    __jvm_properties : Dict[str, str] = dict()
+    __instructions : Optional[str] = None
+    __control : Optional[socket.socket] = None
+    __control_file = None
+
+    @classmethod
+    def set_jvm_properties(cls, properties: Dict[str, Any]):
+        """Override options of the fuzzer configuration file for the next starts of the fuzzer.
+
+        Args:
+            properties (dict): The fuzzer options (e.g. "SDNSwitchPort") and their values.
+        """
+        cls.__jvm_properties = {key: str(value) for key, value in properties.items()}
+    # End def set_jvm_properties
 
     @classmethod
     def set_instructions(cls, instructions: str):
@@ -32,68 +48,240 @@ class FuzzerDriver:
 
         with open(instr_path, 'w') as f:
             f.write(instructions)
+
+        # In daemon mode, the instructions are sent to the running fuzzer when the test starts
+        cls.__instructions = instructions
     # End def set_fuzzer_instructions
 
+    @classmethod
+    def is_daemon(cls) -> bool:
+        """Returns True if the fuzzer is kept running between the tests (option "daemon" of the configuration file)."""
+        return setup.config().fuzzer.get('daemon', False) is True
+    # End def is_daemon
+
     # ===== Start and Stop methods =====================================================================================
 
     @classmethod
-    def start(cls):
+    def start(cls, timeout: float = 10.0):
+        """Start the fuzzer and wait until it listens for the switches.
 
-        # Flush last fuzz report
-        path = os.path.join(app_path.data_dir(), 'fuzz_report.json')  # TODO: Read that from fuzzer configuration file
-        if os.path.exists(path):
-            cls.__log.debug("Flushing Fuzzer report at \"{}\"".format(path))
+        In daemon mode, a fuzzer that is still running is reused: the last instructions are sent to it through its
+        control channel and its last report is discarded. The fuzzer is only started when it is not running.
 
-            try:
-                os.remove(path)
-                cls.__log.trace("Removed \"{}\"".format(path))
-            except PermissionError:
-                # It is highly probable that sudo is required to delete those files.
-                # If so, try again using sudo
-                child = pexpect.spawn("sudo rm {}".format(path))
-                try:
-                    sudo_expect(spawn=child, pattern=[pexpect.EOF], timeout=180)
-                    cls.__log.trace("Removed \"{}\"".format(path))
-                except KeyError:
-                    cls.__log.error("Unable to remove fuzz report \"{}\". Is sudo configured?".format(path))
-                    cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+        Args:
+            timeout (float): The maximum time to wait for the fuzzer to be ready, in seconds.
+
+        Returns:
+            True if the fuzzer is ready, False otherwise.
+        """
+        cls.__flush_report()
+
+        if cls.is_daemon() and cls.is_running():
+            if cls.__instructions is not None:
+                response = cls.__request({'command': 'instructions', 'instructions': json.loads(cls.__instructions)})
+            else:
+                response = cls.__request({'command': 'reset'})
+            if response is not None and response.get('status') == 'ok':
+                return True
+
+            # The control channel is broken, start a new fuzzer
+            cls.__log.error("The fuzzer could not be prepared for a new test ({}), restarting it".format(response))
+
+        # A previous instance would still listen on the port of the fuzzer
+        cls.stop()
 
         # Start the fuzzer
         cls.__log.info("Starting Control Flow Fuzzer")
 
+        properties = dict(cls.__jvm_properties)
+        if cls.is_daemon():
+            properties['ControlPort'] = str(cls.__control_port())
+
         cls.__stderr_pipe = LogPipe(logging.ERROR, __name__ + "PacketFuzzer.jar")
         cls.__stdout_pipe = LogPipe(logging.DEBUG, __name__ + "PacketFuzzer.jar")
         # noinspection PyTypeChecker
         cls.__handle = subprocess.Popen(
-            ["java", "-jar", os.path.expanduser(setup.config().fuzzer.jar_path)],
+            ["java"]
+            + ["-Dfuzzsdn.{}={}".format(key, value) for key, value in properties.items()]
+            + ["-jar", os.path.expanduser(setup.config().fuzzer.jar_path)],
             stderr=cls.__stderr_pipe,
             stdout=cls.__stdout_pipe
         )
+        supervisor.track('fuzzer', cls.__handle)
 
-        # TODO: Replace by a check, to know if the Fuzzer has properly started
-        sleep(2)  # Wait 2 sec to be sure
-        return True
+        # Wait for the proxy of the fuzzer to listen for the switches. The fuzzer reads its first instructions from the
+        # instruction file.
+        port = int(setup.config().fuzzer.port)
+        ready = readiness.wait_for_port(port, timeout=timeout, pid=cls.__handle.pid, component='fuzzer')
+        if ready is False:
+            cls.__log.error("The fuzzer is not listening on port {} after {}s".format(port, timeout))
+        elif cls.is_daemon():
+            ready = readiness.wait_for_port(cls.__control_port(), timeout=timeout, pid=cls.__handle.pid,
+                                            component='fuzzer')
+            if ready is False:
+                cls.__log.error("The control channel of the fuzzer is not listening on port {} after {}s".format(
+                    cls.__control_port(), timeout))
+        return ready
     # End def start
 
+    @classmethod
+    def wait_for_completion(cls,
+                            log_dir: Optional[str] = None,
+                            timeout: Optional[float] = None,
+                            abort: Optional[Callable[[], bool]] = None) -> bool:
+        """Wait until the fuzzer has reported a fuzzed packet and the controller has processed it.
+
+        The fuzzer writes its report once the fuzzed packet has been forwarded. In daemon mode, the report is fetched
+        through the control channel and written to the report file instead. The controller is then considered to have
+        processed the packet once its logs have stopped growing for "settle_time" seconds.
+
+        Args:
+            log_dir (str): The log directory of the controller. If None, only the report of the fuzzer is waited for.
+            timeout (float): The maximum time to wait in seconds. Defaults to the "max_wait" option of the fuzzer.
+            abort (Callable): A condition that cuts the wait for the controller short (e.g. the outcome of the test is
+                              already known from the logs). The report of the fuzzer is still waited for.
+
+        Returns:
+            True if the fuzzer has reported a packet before the timeout, False otherwise.
+        """
+        if timeout is None:
+            timeout = float(setup.config().fuzzer.get('max_wait', 5.0))
+        settle_time = float(setup.config().fuzzer.get('settle_time', 0.5))
+        report_path = os.path.expanduser(setup.config().fuzzer.out_path)
+
+        start = timer()
+        reported = readiness.wait_until(
+            predicate=lambda: cls.__fetch_report(report_path) if cls.is_daemon() else os.path.isfile(report_path),
+            timeout=timeout,
+            abort=lambda: not cls.is_running()
+        )
+        if reported is True and log_dir is not None and not (abort is not None and abort()):
+            readiness.wait_for_quiet(log_dir,
+                                     quiet=settle_time,
+                                     timeout=max(timeout - (timer() - start), 0),
+                                     abort=abort)
+        elif reported is False:
+            cls.__log.warning("The fuzzer did not report any fuzzed packet after {:.3f}s".format(timer() - start))
+
+        elapsed = timer() - start
+        readiness.record_wait('completion', elapsed)
+        cls.__log.info("Fuzzer completion waited for {:.3f}s".format(elapsed))
+        return reported
+    # End def wait_for_completion
+
     @classmethod
     def stop(cls, timeout: float = 5.0):
+        """Stop the fuzzer. The fuzzer is killed if it hasn't exited after `timeout` seconds.
+
+        Returns:
+            True if the fuzzer has stopped (or if it was not started), False otherwise.
+        """
+        cls.__close_control()
+        stopped = True
         if cls.__handle is not None:
             cls.__log.info("Stopping Control Flow Fuzzer")
+            stopped = supervisor.stop('fuzzer', timeout=timeout)
             cls.__stdout_pipe.close()
             cls.__stderr_pipe.close()
-            cls.__handle.terminate()
-            # TODO: Make the fuzzer close properly
-            # terminated = False
-            #
-            # t_end = datetime.now() + timedelta(seconds=timeout)
-            # while terminated is not True and datetime.now() < t_end:
-            #     terminated = cls.__handle.poll()
-            # if terminated is not True:
-            #     cls.__log.warning("Fuzzer has failed to terminate under {}s, force killing it".format(timeout))
-            #     cls.__handle.kill()
-            # cls.__handle = None
+            cls.__handle = None
 
-        return True
+        return stopped
     # End def stop
 
-# End def set_fuzzer_instructions
+    @classmethod
+    def is_running(cls) -> bool:
+        """Returns True if the fuzzer started by this driver is running."""
+        return cls.__handle is not None and cls.__handle.poll() is None
+    # End def is_running
+
+    # ===== Private methods ============================================================================================
+
+    @classmethod
+    def __flush_report(cls):
+        """Remove the report of the last test."""
+        path = os.path.expanduser(setup.config().fuzzer.out_path)
+        if os.path.exists(path):
+            cls.__log.debug("Flushing Fuzzer report at \"{}\"".format(path))
+
+            try:
+                os.remove(path)
+                cls.__log.trace("Removed \"{}\"".format(path))
+            except PermissionError:
+                # It is highly probable that privileges are required to delete those files.
+                # If so, try again with the privileged helper or sudo
+                if PrivilegedDriver.run({'op': 'remove', 'path': path}) is not None:
+                    return
+                child = pexpect.spawn("sudo rm {}".format(path))
+                try:
+                    sudo_expect(spawn=child, pattern=[pexpect.EOF], timeout=180)
+                    cls.__log.trace("Removed \"{}\"".format(path))
+                except KeyError:
+                    cls.__log.error("Unable to remove fuzz report \"{}\". Is sudo configured?".format(path))
+                    cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+    # End def __flush_report
+
+    @classmethod
+    def __control_port(cls) -> int:
+        return int(setup.config().fuzzer.get('control_port', 52625))
+    # End def __control_port
+
+    @classmethod
+    def __request(cls, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Send a command to the fuzzer through its control channel.
+
+        The connection is reopened once if it has been closed since the last command.
+
+        Args:
+            command (dict): The command and its arguments (see the ControlServer class of the fuzzer).
+
+        Returns:
+            The response of the fuzzer, or None if it couldn't be reached.
+        """
+        for attempt in range(2):
+            try:
+                if cls.__control is None:
+                    cls.__control = socket.create_connection(('127.0.0.1', cls.__control_port()), timeout=5.0)
+                    cls.__control_file = cls.__control.makefile('r', encoding='utf-8')
+                cls.__control.sendall((json.dumps(command) + '\n').encode('utf-8'))
+                line = cls.__control_file.readline()
+                if not line:
+                    raise ConnectionResetError("The fuzzer closed the control channel")
+                return json.loads(line)
+            except (OSError, ValueError) as e:
+                cls.__close_control()
+                if attempt == 0 and isinstance(e, (BrokenPipeError, ConnectionResetError)):
+                    continue
+                cls.__log.error("Command \"{}\" failed: {}".format(command.get('command'), e))
+                return None
+        return None
+    # End def __request
+
+    @classmethod
+    def __close_control(cls):
+        if cls.__control_file is not None:
+            cls.__control_file.close()
+            cls.__control_file = None
+        if cls.__control is not None:
+            cls.__control.close()
+            cls.__control = None
+    # End def __close_control
+
+    @classmethod
+    def __fetch_report(cls, report_path: str) -> bool:
+        """Fetch the report of the fuzzer through its control channel and write it to the report file.
+
+        Returns:
+            True if the fuzzer has reported a fuzzed packet, False otherwise.
+        """
+        response = cls.__request({'command': 'report'})
+        if response is None or response.get('status') != 'ok':
+            return False
+
+        # The report file is written at once, so that it is never read incomplete
+        tmp_path = report_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(response['report'], f)
+        os.replace(tmp_path, report_path)
+        return True
+    # End def __fetch_report
+# End class FuzzerDriver
@@ -1,15 +1,23 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
 import logging
 import re
 import time
-from typing import Optional, Tuple
+from importlib import resources
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import pexpect
 
+import fuzzsdn.resources.tools.mininet as mininet_tools
+from fuzzsdn.app import setup
 from fuzzsdn.app.analytics.ping_stats import PingStats
+from fuzzsdn.app.drivers import supervisor
+from fuzzsdn.app.drivers.async_mininet_driver import AsyncMininetDriver
 from fuzzsdn.app.drivers.commons import sudo_expect
+from fuzzsdn.app.drivers.privileged_driver import PrivilegedDriver
+from fuzzsdn.app.drivers.privileged_runner import clean_own_script
 from fuzzsdn.common.utils import ExitCode, StrEnum
 
 MININET_PROMPT = "mininet>"
@@ -22,6 +30,62 @@ class MininetDriver:
 
     __log = logging.getLogger(__name__)
     __handle: Optional[pexpect.spawn] = None
+    __prepared = None  # Command and nodes of the running network, when it has been prepared
+    __known_nodes : dict = dict()  # Nodes of the last network built by the driver, removed by the targeted cleanup
+    __detached : Dict[str, List[str]] = dict()  # Controllers of the switches detached from them, until the next reset
+
+    # Sandbox parameters
+    __node_prefix   : str = ''
+    __listen_port   : Optional[int] = None
+
+    # ===== ( Sandbox ) ================================================================================================
+
+    @classmethod
+    def set_sandbox(cls, prefix: str, listen_port: Optional[int] = None):
+        """Isolate the networks started by the driver from the ones of other sandboxes.
+
+        The nodes of the network are prefixed with "prefix", and the nodes can still be referred by their original
+        names (e.g. "h1" for "sb1h1") in the driver methods.
+
+        Args:
+            prefix (str): prefix added to the name of every node of the network. An empty prefix disables the sandbox.
+            listen_port (int): first passive listening port used by the switches of the network.
+        """
+        cls.__node_prefix = prefix
+        cls.__listen_port = listen_port
+    # End def set_sandbox
+
+    @classmethod
+    def _node(cls, name: str) -> str:
+        """Returns the name of a node of the network, prefixed with the sandbox prefix."""
+        if cls.__node_prefix == '' or name.startswith(cls.__node_prefix):
+            return name
+        return cls.__node_prefix + name
+    # End def _node
+
+    @classmethod
+    def __sandboxed_cmd(cls, cmd: str) -> str:
+        """Rewrites a "mn" command so it builds its topology with the nodes prefixed by the sandbox prefix."""
+        if re.search(r'(^|\s)mn(\s|$)', cmd) is None:
+            cls.__log.warning("Cannot isolate a network not started with \"mn\" (cmd: \"{}\")".format(cmd))
+            return cmd
+
+        with resources.path(mininet_tools, "sandbox_topo.py") as path:
+            topo_path = path
+
+        topo = re.search(r'--topo[=\s](\S+)', cmd)
+        topo_arg = "--topo=prefixed,{},{}".format(cls.__node_prefix, topo.group(1) if topo else 'minimal')
+        if topo is not None:
+            cmd = cmd[:topo.start()] + topo_arg + cmd[topo.end():]
+        else:
+            cmd = "{} {}".format(cmd, topo_arg)
+
+        cmd = "{} --custom {}".format(cmd, topo_path)
+        if cls.__listen_port is not None:
+            cmd = "{} --listenport {}".format(cmd, cls.__listen_port)
+
+        return cmd
+    # End def __sandboxed_cmd
 
     # ===== ( Start and Stop Mininet ) =================================================================================
 
@@ -50,29 +114,12 @@ class MininetDriver:
                 if return_code is not None:
                     cls.__handle = None
 
-                # Clean up old networks
-                cls.__log.info("Clearing any residual state or processes")
-                cmd_ = "sudo mn -c"
-
-                child = pexpect.spawn(cmd_)
-                try:
-                    i = sudo_expect(child,
-                                    pattern=[r'Cleanup\scomplete',
-                                             pexpect.EOF,
-                                             pexpect.TIMEOUT],
-                                    timeout=timeout)
-                except KeyError:
-                    cls.__log.error("Unable to start Mininet due to permission issues. Is sudo configured?")
-                    cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
-                    return False
-
-                if i == 0:
-                    cls.__log.info("Cleanup is complete")
-                elif i == 1:
-                    cls.__log.error("Connection is terminated")
-                elif i == 2:  # timeout
-                    cls.__log.error("Something while cleaning Mininet took too long... ")
-                    return False
+                # Clean up the previous network of the driver, leaving the networks of the other sandboxes
+                # untouched. Outside of a sandbox, the global cleanup is the fallback when the resources of the
+                # previous network are unknown or couldn't be removed.
+                if cls.clean_own(timeout=timeout) is False and cls.__node_prefix == '':
+                    if cls.clean(timeout=timeout) is False:
+                        return False
 
                 # Craft the string to start mininet
                 cmd_ = []
@@ -113,11 +160,16 @@ class MininetDriver:
 
                 # Add sudo if the command does not start with sudo
                 if not cmd_.startswith('sudo'):
-                    cmd_ = "sudo {}".format(cmd)
+                    cmd_ = "sudo {}".format(cmd_)
+
+                # Isolate the network from the ones of the other sandboxes
+                if cls.__node_prefix != '':
+                    cmd_ = cls.__sandboxed_cmd(cmd_)
 
                 # Send the command and check if network started
                 cls.__log.info("Sending \"{}\" to Mininet CLI".format(cmd_))
                 child = pexpect.spawn(cmd_)
+                supervisor.track('mininet', child, group=True, privileged=True)
                 start_time = time.time()
                 while True:
                     try:
@@ -170,10 +222,113 @@ class MininetDriver:
             return False
 
     @classmethod
-    def stop(cls, timeout=5, exit_timeout=1000):
+    def clean(cls, timeout=120):
+        """
+        Clears any residual state or processes left by a previous Mininet network ("mn -c").
+
+        Args:
+            timeout:     Timeout in seconds for which we should wait for the cleanup to complete
+
+        Returns:
+             (bool): False if the cleanup couldn't be performed, True otherwise.
+        """
+        cls.__log.info("Clearing any residual state or processes")
+        results = PrivilegedDriver.run({'op': 'mn_clean', 'timeout': timeout})
+        if results is not None:
+            if results[0]['ok'] is True:
+                cls.__log.info("Cleanup is complete")
+            return results[0]['ok']
+
+        child = pexpect.spawn("sudo mn -c")
+        try:
+            i = sudo_expect(child,
+                            pattern=[r'Cleanup\scomplete',
+                                     pexpect.EOF,
+                                     pexpect.TIMEOUT],
+                            timeout=timeout)
+        except KeyError:
+            cls.__log.error("Unable to start Mininet due to permission issues. Is sudo configured?")
+            cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+            return False
+
+        if i == 0:
+            cls.__log.info("Cleanup is complete")
+        elif i == 1:
+            cls.__log.error("Connection is terminated")
+        elif i == 2:  # timeout
+            cls.__log.error("Something while cleaning Mininet took too long... ")
+            return False
+
+        return True
+    # End def clean
+
+    @classmethod
+    def clean_own(cls, timeout=120) -> bool:
+        """
+        Clears the resources left by the networks of the driver only: the shells of its hosts, its switches (OVS
+        bridges) and their links. In a sandbox, the resources are found by the node prefix of the sandbox, otherwise by
+        the names of the nodes of the last network built by the driver.
+
+        Args:
+            timeout:     Timeout in seconds for which we should wait for the cleanup to complete
+
+        Returns:
+             (bool): False if the resources of the driver are unknown or if the cleanup couldn't be performed, True
+                     otherwise.
+        """
+        if cls.__node_prefix != '':
+            # The names in the sandbox are the prefix followed by the original name, which starts with a letter
+            links = "{}[!0-9]*".format(cls.__node_prefix)
+            hosts = "{}[A-Za-z_][A-Za-z0-9_]*".format(cls.__node_prefix)
+        elif len(cls.__known_nodes) > 0:
+            nodes = cls.__known_nodes
+            links = "|".join("{0}|{0}-*".format(n) for n in nodes.keys() if nodes[n]['type'] == 'switch')
+            hosts = "|".join(n for n in nodes.keys() if nodes[n]['type'] == 'host')
+        else:
+            return False
+
+        try:
+            script = clean_own_script(hosts, links)
+        except ValueError:
+            cls.__log.error("Cannot clean the nodes \"{}\" and \"{}\": invalid names".format(hosts, links))
+            return False
+
+        cls.__log.info("Clearing the residual state or processes of the driver")
+        start_time = time.time()
+        results = PrivilegedDriver.run({'op': 'mn_clean_own', 'hosts': hosts, 'links': links, 'timeout': timeout})
+        if results is not None:
+            if results[0]['ok'] is not True:
+                cls.__log.error("The targeted cleanup of Mininet failed")
+                return False
+        else:
+            child = pexpect.spawn("sudo", ["sh", "-c", script])
+            try:
+                i = sudo_expect(child,
+                                pattern=[r'Targeted\scleanup\scomplete',
+                                         pexpect.EOF,
+                                         pexpect.TIMEOUT],
+                                timeout=timeout)
+            except KeyError:
+                cls.__log.error("Unable to clean Mininet due to permission issues. Is sudo configured?")
+                return False
+
+            if i != 0:
+                cls.__log.error("The targeted cleanup of Mininet failed")
+                return False
+
+        cls.__known_nodes = dict()
+        cls.__log.info("Targeted cleanup is complete. Time taken: {}".format(time.time() - start_time))
+        return True
+    # End def clean_own
+
+    @classmethod
+    def stop(cls, timeout=5, exit_timeout=120):
         """
         Stops Mininet.
-        
+
+        Mininet is first asked to exit from its CLI. If it doesn't exit after `exit_timeout` seconds, or if its CLI
+        doesn't answer, it is killed.
+
         :return: True if Mininet successfully stops or if the handle doesn't exists, False otherwise
         """
         if cls.__handle is not None:
@@ -189,46 +344,163 @@ class MininetDriver:
                 if i == 0:
                     cls.__log.info("Exiting mininet..")
                     start_time = time.time()
+                    deadline = start_time + exit_timeout
                     cls.__handle.sendline("exit")
                     exit_return = 1
-                    while exit_return:
+                    while exit_return and time.time() < deadline:
                         exit_return = cls.__handle.expect([pexpect.EOF,
                                                            "Traceback",
                                                            "AssertionError",
                                                            MININET_PROMPT],
-                                                          timeout=exit_timeout)
+                                                          timeout=max(deadline - time.time(), 0))
 
-                    cls.__log.info("Mininet as stopped. Time taken: {}".format(time.time() - start_time))
-                    cls.__handle.sendline("sudo mn -c")
+                    if exit_return == 0:
+                        cls.__log.info("Mininet as stopped. Time taken: {}".format(time.time() - start_time))
+                        supervisor.stop('mininet', timeout=timeout, grace=timeout)  # Reap the process of the CLI
+                        cls.__handle = None
+                        cls.__prepared = None
+                        cls.__detached = dict()
 
-                    cls.__handle.expect(pexpect.EOF)
-                    cls.__handle = None
-                    return True
+                        # Remove what Mininet may have left behind, without touching the networks of other sandboxes
+                        cls.clean_own()
+                        return True
+
+                    cls.__log.error("Mininet did not exit after {}s".format(exit_timeout))
 
                 elif i == 1:
                     cls.__log.error("Something went wrong exiting mininet")
-                    return False
 
                 elif i == 2:  # timeout
                     cls.__log.error("Mininet TIMEOUT while exiting")
-                    return False
 
             except pexpect.TIMEOUT:
                 cls.__log.error("TIMEOUT exception found")
-                cls.__log.error("    " + cls.__handle.before)
-                return False
+                cls.__log.error("    {}".format(cls.__handle.before))
             except pexpect.EOF:
                 cls.__log.error("EOF exception found")
-                cls.__log.error("    " + cls.__handle.before)
-                return False
+                cls.__log.error("    {}".format(cls.__handle.before))
             except Exception:
                 cls.__log.exception("Uncaught exception!")
-                return False
+
+            # Mininet couldn't exit by itself, kill it and remove what it left behind
+            cls.__log.warning("Killing mininet")
+            killed = supervisor.stop('mininet', timeout=timeout)
+            cls.__handle = None
+            cls.__prepared = None
+            cls.__detached = dict()
+            cls.clean_own()
+            return killed
         else:
             cls.__log.warning("Mininet is not started")
             return True
     # End def stop
 
+    @classmethod
+    def is_persistent(cls) -> bool:
+        """Returns True if the network is kept between the tests (option "persistent" of the configuration file)."""
+        try:
+            return setup.config().mininet.get('persistent', False) is True
+        except KeyError:  # Configuration files without a mininet section
+            return False
+    # End def is_persistent
+
+    @classmethod
+    def prepare(cls, topo_file=None, args=None, cmd=None, timeout=120) -> bool:
+        """Prepare a network for a new test.
+
+        In persistent mode, a network that is still running with the same command is only reset (see `reset`). The
+        network is (re)built when it is not running, when it was started with another command, or when it couldn't be
+        reset. The arguments are the same as the ones of `start`.
+
+        Returns:
+            True if the network is ready for a new test, False otherwise.
+        """
+        key = (topo_file, args, cmd)
+        if cls.is_persistent() and cls.__prepared is not None and cls.__prepared[0] == key:
+            if not cls.is_alive()[0]:
+                cls.__log.warning("Mininet is not running anymore, rebuilding the network...")
+            elif cls.reset(timeout=timeout) is True:
+                return True
+            else:
+                cls.__log.warning("The network could not be reset, rebuilding it...")
+
+        cls.__prepared = None
+        cls.__detached = dict()
+        if cls.is_alive()[0]:
+            cls.stop()
+        if cls.start(topo_file=topo_file, args=args, cmd=cmd, timeout=timeout) is not True:
+            return False
+
+        nodes = cls.nodes(timeout=timeout)
+        if nodes is not None:
+            cls.__prepared = (key, nodes)
+        return True
+    # End def prepare
+
+    @classmethod
+    def reset(cls, timeout=120) -> bool:
+        """Reset a running network to the state it had when it was built.
+
+        The flows of the switches and the ARP caches of the hosts are cleared, and the switches are forced to reconnect
+        to their controller. The switches detached by `detach` are connected to their controllers again.
+
+        Returns:
+            True if the network has been reset, False if it is broken (i.e. some of its nodes are missing).
+        """
+        cls.__log.info("Resetting the Mininet network...")
+        built = cls.__prepared[1] if cls.__prepared is not None else dict()
+        nodes = cls.nodes(timeout=timeout)
+        if nodes is None or any(name not in nodes for name in built.keys()):
+            return False
+
+        switches = [name for name in sorted(nodes.keys()) if nodes[name]['type'] == 'switch']
+        hosts = [name for name in sorted(nodes.keys()) if nodes[name]['type'] == 'host']
+        driver = AsyncMininetDriver(nodes)
+        detached, cls.__detached = cls.__detached, dict()
+
+        async def reset_nodes():
+            cleared = await asyncio.gather(*(driver.delete_flow(sw, timeout=timeout) for sw in switches),
+                                           *(driver.flush_arp(host, timeout=timeout) for host in hosts))
+            if not all(cleared):
+                return False
+            return all(await asyncio.gather(*(driver.set_controllers(sw, detached[sw], timeout=timeout)
+                                              if sw in detached else driver.reconnect(sw, timeout=timeout)
+                                              for sw in switches)))
+
+        return asyncio.run(reset_nodes())
+    # End def reset
+
+    @classmethod
+    def detach(cls, timeout=120) -> bool:
+        """Disconnect the switches of a persistent network from their controllers until the network is reset.
+
+        A controller which is reset while the switches of the network are still connected sees them register again
+        as soon as they are removed. The controllers of the switches are kept, and set back by `reset`. Nothing is done
+        if the network is not persistent or not running.
+
+        Returns:
+            True if the switches have been detached (or if there is nothing to detach), False otherwise.
+        """
+        if not cls.is_persistent() or cls.__prepared is None or not cls.is_alive()[0]:
+            return True
+
+        cls.__log.info("Detaching the switches of the Mininet network from their controllers...")
+        nodes = cls.__prepared[1]
+        switches = [name for name in sorted(nodes.keys()) if nodes[name]['type'] == 'switch']
+        driver = AsyncMininetDriver(nodes)
+
+        async def detach_switches():
+            # The switches which are already detached have no controller left to keep
+            attached = [sw for sw in switches if sw not in cls.__detached]
+            controllers = await asyncio.gather(*(driver.get_controllers(sw, timeout=timeout) for sw in attached))
+            if any(ctrl is None for ctrl in controllers):
+                return False
+            cls.__detached.update(zip(attached, controllers))
+            return all(await asyncio.gather(*(driver.set_controllers(sw, [], timeout=timeout) for sw in attached)))
+
+        return asyncio.run(detach_switches())
+    # End def detach
+
     @classmethod
     def is_alive(cls) -> Tuple[bool, Optional[ExitCode]]:
         if cls.__handle is not None:
@@ -320,6 +592,7 @@ class MininetDriver:
                     nodes[m['name']]['pid'] = int(m['pid'])
 
                 # Finally, return the nodes
+                cls.__known_nodes = nodes
                 return nodes
 
             elif i == 1:
@@ -356,7 +629,7 @@ class MininetDriver:
             return False
 
         # Build the flow add command
-        cmd = "sh ovs-ofctl add-flow {} {}".format(sw, flow)
+        cmd = "sh ovs-ofctl add-flow {} {}".format(cls._node(sw), flow)
 
         try:
             cls.__log.info("Sending command \"{}\" to Mininet".format(cmd))
@@ -403,9 +676,9 @@ class MininetDriver:
 
         # Build the flow add command
         if flow is not None:
-            cmd = "sh ovs-ofctl del-flows {} {}".format(sw, flow)
+            cmd = "sh ovs-ofctl del-flows {} {}".format(cls._node(sw), flow)
         else:
-            cmd = "sh ovs-ofctl del-flows {}".format(sw)
+            cmd = "sh ovs-ofctl del-flows {}".format(cls._node(sw))
 
         if strict:
             cmd += " --strict"
@@ -466,7 +739,7 @@ class MininetDriver:
             return None
 
         # Build the ping command
-        cmd = "{} ping {} -c {} -i {} -W {}".format(src, dst, count, interval, wait_timeout)
+        cmd = "{} ping {} -c {} -i {} -W {}".format(cls._node(src), cls._node(dst), count, interval, wait_timeout)
 
         try:
             cls.__log.info("Sending command \"{}\" to Mininet".format(cmd))
@@ -503,4 +776,43 @@ class MininetDriver:
             return None
     # End def ping_host
 
+    @classmethod
+    def ping_all(cls, hosts: Optional[Iterable[str]] = None, count: int = 1, wait_timeout: float = 1.0,
+                 interval: float = 1.0) -> Optional[Dict[Tuple[str, str], Optional[PingStats]]]:
+        """Ping every host from every other host, all at the same time, without going through the Mininet CLI.
+
+        Args:
+            hosts (Iterable[str]): the hosts to ping. Defaults to all the hosts of the network.
+            count (int): the number of ping message to send between each pair of hosts (default to 1).
+            wait_timeout (float): the maximum time allowed (in seconds) between a ping and its response.
+            interval (float): the interval (in seconds) between two ping messages
+
+        Returns:
+            (dict) The PingStats of each (source, destination) pair of hosts, None if the nodes couldn't be listed.
+        """
+        driver = cls.async_driver()
+        if driver is None:
+            cls.__log.warning("Mininet is not started. Cannot ping hosts.")
+            return None
+
+        hosts = [cls._node(host) for host in hosts] if hosts is not None else None
+        return asyncio.run(driver.ping_all(hosts, count=count, wait_timeout=wait_timeout, interval=interval))
+    # End def ping_all
+
+    @classmethod
+    def async_driver(cls, max_concurrency: int = 32) -> Optional[AsyncMininetDriver]:
+        """Returns an asynchronous driver for the nodes of the running network, to run many commands concurrently.
+
+        Args:
+            max_concurrency (int): the maximum number of commands running at the same time.
+
+        Returns:
+            (AsyncMininetDriver) The driver, None if the nodes of the network couldn't be listed.
+        """
+        nodes = cls.__prepared[1] if cls.__prepared is not None and cls.is_alive()[0] else cls.nodes()
+        if nodes is None:
+            return None
+        return AsyncMininetDriver(nodes, max_concurrency=max_concurrency)
+    # End def async_driver
+
 # End class MininetDriver
@@ -4,12 +4,17 @@ import os.path
 import subprocess
 from importlib import resources
 from time import sleep
+from typing import Optional
 
 import pexpect
 
 import fuzzsdn.resources.tools.onos as onos_tools
 from fuzzsdn.app import setup
+from fuzzsdn.app.drivers import readiness, supervisor
 from fuzzsdn.app.drivers.commons import sudo_expect
+from fuzzsdn.app.drivers.mininet_driver import MininetDriver
+from fuzzsdn.app.drivers.onos_rest import OnosRestClient
+from fuzzsdn.app.drivers.privileged_driver import PrivilegedDriver
 
 
 class OnosDriver:
@@ -18,6 +23,11 @@ class OnosDriver:
     """
     __log = logging.getLogger(__name__)
     __timeout = 5
+    __karaf_port = 8101
+    __karaf_prompt = r'karaf@\S+\s?>'
+    __prepared = None  # Applications and log level of the running instance, when it has been prepared
+    __karaf : Optional[pexpect.spawn] = None  # ssh session kept open with the karaf shell
+    __rest : Optional[OnosRestClient] = None
 
     # ===== Install Uninstall ==========================================================================================
 
@@ -95,125 +105,178 @@ class OnosDriver:
     # ===== Start and Stop =============================================================================================
 
     @classmethod
-    def start(cls):
-        """
-        Start an onos application
-        :return:
+    def start(cls, timeout: float = 180.0):
+        """Start ONOS and wait until it is ready (see `is_ready`).
+
+        Args:
+            timeout (float): The maximum time to wait for ONOS to be ready, in seconds.
+
+        Returns:
+            True if ONOS is ready, False otherwise.
         """
         # Call onos service
         cls.__log.info("Starting ONOS...")
-        child = pexpect.spawn("sudo systemctl start onos")
+        if PrivilegedDriver.run({'op': 'systemctl', 'action': 'start', 'unit': 'onos', 'timeout': 180}) is None:
+            child = pexpect.spawn("sudo systemctl start onos")
 
-        try:
-            i = sudo_expect(spawn=child,
-                            pattern=[pexpect.EOF],
-                            timeout=180)
-        except KeyError:
-            cls.__log.error("Unable to start ONOS due to permission issues. Is sudo configured?")
-            cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
-            return False
+            try:
+                i = sudo_expect(spawn=child,
+                                pattern=[pexpect.EOF],
+                                timeout=180)
+            except KeyError:
+                cls.__log.error("Unable to start ONOS due to permission issues. Is sudo configured?")
+                cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+                return False
 
-        if i == 0:
-            # QUESTION: Maybe we should check something here ?
-            pass
-
-        start_level = False
-        app_manager = False
-
-        it = 0
-        while start_level is False and it < 90:
-
-            # connect to the ssh
-            session = pexpect.spawn("ssh -o UserKnownHostsFile=/dev/null -o StrictHostKeyChecking=no "
-                                    + "-p 8101 "
-                                    + "karaf@localhost ")
-
-            resp = session.expect(['Password:', pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
-            if resp == 0:
-                session.sendline(setup.config().onos.karaf_password)
-                resp = session.expect([r'.*>.*',
-                                       r'Connection\sclosed\sby',
-                                       pexpect.EOF,
-                                       pexpect.TIMEOUT]
-                                      , timeout=cls.__timeout)
-                if resp == 0:
-                    session.sendline("bundle:list | grep 'START LEVEL 100'")
-                    resp = session.expect(['START LEVEL 100', pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
-                    if resp == 0:
-                        start_level = True
-                elif resp == 1:
-                    cls.__log.warning("Couldn't establish ssh session with karaf")
+            if i == 0:
+                # QUESTION: Maybe we should check something here ?
+                pass
 
-            session.close()
-            it += 1
+        ready = readiness.wait_until(cls.is_ready, timeout=timeout, component='onos')
+        cls.__track_service()
+        if ready is True:
+            cls.__log.debug("ONOS has started.")
+        else:
+            cls.__log.error("ONOS did not start (northbound API or OpenFlow listener not ready after {}s)".format(
+                timeout))
+        return ready
+    # End def start
 
-        cls.__log.debug("ONOS Start up: start level 100 reached?: {}".format(start_level))
+    @classmethod
+    def stop(cls, timeout: float = 30.0):
+        """Stop the ONOS service and wait for its process to exit. The process is killed if it hasn't exited after
+        `timeout` seconds.
 
-        if start_level is True:
-            it = 0
-            while app_manager is False and it < 30 :
+        Returns:
+            True if ONOS has stopped, False otherwise.
+        """
+        cls.__log.info("Stopping ONOS...")
+        cls.__close_sessions()
 
-                cmd = "grep -E \"ApplicationManager .* Started\" {}".format(os.path.join(setup.config().onos.root_dir, 'karaf', 'data', 'log', "karaf.log"))
-                session = pexpect.spawn(cmd)
-                resp = session.expect(['Started', pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
-                if resp == 0:
-                    app_manager = True
-                else:
-                    sleep(1)
+        # The process of the service is tracked before the service is stopped, in case ONOS was started by another run
+        if supervisor.get('onos') is None:
+            cls.__track_service()
 
-                it += 1
-        cls.__log.debug("ONOS Start up: app manager started?: {}".format(app_manager))
+        if PrivilegedDriver.run({'op': 'systemctl', 'action': 'stop', 'unit': 'onos', 'timeout': timeout}) is None:
+            child = pexpect.spawn("sudo systemctl stop onos")
+            try:
+                sudo_expect(spawn=child, pattern=[pexpect.EOF, pexpect.TIMEOUT], timeout=timeout)
+            except KeyError:
+                cls.__log.error("Unable to stop ONOS due to permission issues. Is sudo configured?")
+                cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+                return False
 
-        if app_manager is True and start_level is True:
-            cls.__log.debug("ONOS has started.")
+        # The service has normally stopped its process already, it is only killed if it is still running
+        if supervisor.stop('onos', timeout=timeout, grace=cls.__timeout) is True:
+            cls.__log.debug("ONOS has stopped.")
             return True
         else:
-            cls.__log.error("ONOS did not start (start level 100: {}, app manager: {})".format(start_level, app_manager))
+            cls.__log.error("ONOS did not stop properly.")
             return False
-    # End def start
+    # End def stop
 
     @classmethod
-    def stop(cls):
-        cls.__log.info("Stopping ONOS...")
-        child = pexpect.spawn("sudo systemctl stop onos")
-
+    def __track_service(cls):
+        """Register the main process of the ONOS service to the supervisor, if the service is running."""
         try:
-            i = sudo_expect(spawn=child, pattern=[pexpect.EOF], timeout=180)
-        except KeyError:
-            cls.__log.error("Unable to stop ONOS due to permission issues. Is sudo configured?")
-            cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
-            return False
+            output = subprocess.run(['systemctl', 'show', '--property=MainPID', '--value', 'onos'],
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL,
+                                    timeout=cls.__timeout).stdout.decode().strip()
+        except (OSError, subprocess.TimeoutExpired) as e:
+            cls.__log.warning("Couldn't get the pid of the ONOS service: {}".format(e))
+            return
+
+        if output.isdigit() and int(output) > 0:
+            supervisor.track('onos', pid=int(output), privileged=True)
+        else:
+            supervisor.untrack('onos')
+    # End def __track_service
+
+    # ===== Persistent mode ============================================================================================
+
+    @classmethod
+    def is_persistent(cls) -> bool:
+        """Returns True if ONOS is kept running between the tests (option "persistent" of the configuration file)."""
+        return setup.config().onos.get('persistent', False) is True
+    # End def is_persistent
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """Returns True if the northbound API of ONOS answers and ONOS accepts switch connections."""
+        return cls.rest().is_ready() and readiness.is_port_listening(int(setup.config().onos.port))
+    # End def is_ready
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """Returns True if ONOS accepts switch connections and karaf commands."""
+        return readiness.is_port_listening(int(setup.config().onos.port)) \
+            and readiness.is_port_listening(cls.__karaf_port)
+    # End def is_running
+
+    @classmethod
+    def prepare(cls, apps=(), log_level=None) -> bool:
+        """Prepare ONOS for a new test.
 
-        if i == 0:
-            # QUESTION: Maybe we should check something here ?
-            pass
+        In persistent mode, an instance that is still running with the same applications and log level is only reset.
+        ONOS is (re)started when it is not running, when it crashed, or when its state couldn't be cleaned.
 
-        it = 0
-        stopped = False
-        while stopped is False and it < 100:
-            cmd = r"ps -ef | egrep \'java .*/onos/.* org\.apache\.karaf\.main\.Main\'"
-            session = pexpect.spawn(cmd)
+        Args:
+            apps (Iterable[str]): The applications to activate.
+            log_level (str): The log level of ONOS. If None, the log level is not changed.
 
-            resp = session.expect(['Started', pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
-            if resp == 0:
-                sleep(0.1)
+        Returns:
+            True if ONOS is ready for a new test, False otherwise.
+        """
+        apps = tuple(apps)
+        if cls.is_persistent() and cls.__prepared == (apps, log_level):
+            if not cls.is_running():
+                cls.__log.warning("ONOS is not running anymore, restarting it...")
+            elif cls.reset() is True:
+                return True
             else:
-                stopped = True
+                cls.__log.warning("ONOS could not be reset, restarting it...")
+
+        cls.__prepared = None
+        success = True
+        success &= cls.flush_logs()
+        success &= cls.stop()
+        success &= cls.start()
+        for app in apps:
+            success &= cls.activate_app(app)
+        if log_level is not None:
+            success &= cls.set_log_level(log_level)
+
+        if success:
+            cls.__prepared = (apps, log_level)
+        return success
+    # End def prepare
 
-        if stopped is True:
-            cls.__log.debug("ONOS has stopped.")
-            return True
-        else:
-            cls.__log.error("ONOS did not stop properly.")
+    @classmethod
+    def reset(cls) -> bool:
+        """Remove the devices, links, hosts and flows known by a running ONOS instance and truncate its logs.
+
+        The switches of a persistent Mininet network are detached from ONOS first, otherwise they would register again
+        during the purge. They are connected again when the network is reset for the next test.
+
+        Returns:
+            True if ONOS has been reset, False if its state is not clean afterwards.
+        """
+        cls.__log.info("Resetting ONOS...")
+        if MininetDriver.detach() is False:
+            cls.__log.error("Couldn't detach the switches of the Mininet network from ONOS")
             return False
-    # End def stop
+        if cls.rest().purge() is False:
+            return False
+        return cls.truncate_logs()
+    # End def reset
 
     # ===== App activation =============================================================================================
 
     @classmethod
     def activate_app(cls, app_name: str, max_try=15):
         """
-        Deactivate the an ONOS Application
+        Activate an ONOS Application
         :param app_name: Name of the application to activate
         :param max_try: Number of attempts to activate the app
         :return: True if the app could be activated after x attempts, else return False
@@ -221,29 +284,18 @@ class OnosDriver:
 
         activated = False
         attempt = 0
-        cmd = " ".join((os.path.join(setup.config().onos.root_dir, 'bin', 'onos-app'), "localhost", "activate", app_name))
         while activated is False and attempt < max_try:
             cls.__log.info("Activating ONOS app \"{}\"... Attempt {}/{}".format(app_name, attempt + 1, max_try))
-            try:
-                child = pexpect.spawn(cmd)
-            except Exception:
-                cls.__log.exception("An exception happened while activating application {} (cmd: {})".format(app_name, cmd))
-                return False
+            result = cls.rest().activate_app(app_name)
 
-            i = child.expect(['ACTIVE',
-                              '404 Not Found',
-                              pexpect.EOF,
-                              pexpect.TIMEOUT],
-                             cls.__timeout)
-
-            if i == 0:
+            if result is True:
                 activated = True
-            elif i == 1:
-                cls.__log.warning("Couldn't find ONOS app \"{}\".".format(app_name))
             else:
-                cls.__log.warning("Failed to activate ONOS app \"{}\".".format(app_name))
-
-            sleep(1)
+                if result is None:
+                    cls.__log.warning("Couldn't find ONOS app \"{}\".".format(app_name))
+                else:
+                    cls.__log.warning("Failed to activate ONOS app \"{}\".".format(app_name))
+                sleep(1)
             attempt += 1
 
         if activated is True:
@@ -257,18 +309,25 @@ class OnosDriver:
     @classmethod
     def deactivate_app(cls, app_name: str):
         """
-        Deactivate the an ONOS Application
-        :param app_name: name of the application to activate
-        :return: True (Always)
+        Deactivate an ONOS Application
+        :param app_name: name of the application to deactivate
+        :return: True if the app has been deactivated, else return False
         """
         cls.__log.info("Deactivating ONOS app \"{}\"...".format(app_name))
-        subprocess.call([os.path.join(setup.config().onos.root_dir, 'bin', 'onos-app'), "localhost", "deactivate", app_name],
-                        stderr=subprocess.DEVNULL,
-                        stdout=subprocess.DEVNULL)
-        cls.__log.info("ONOS app \"{}\" is deactivated.".format(app_name))
-        return True  # onos-app never an error message on that
+        deactivated = cls.rest().deactivate_app(app_name)
+        if deactivated is True:
+            cls.__log.info("ONOS app \"{}\" is deactivated.".format(app_name))
+        else:
+            cls.__log.warning("ONOS app \"{}\" couldn't be deactivated.".format(app_name))
+        return deactivated
     # End def deactivate_app
 
+    @classmethod
+    def log_dir(cls):
+        """Returns the directory where the logs of ONOS are written."""
+        return os.path.join(setup.config().onos.root_dir, 'karaf', 'data', 'log')
+    # End def log_dir
+
     @classmethod
     def flush_logs(cls):
         """Flush the log file generated by ONOS."""
@@ -283,29 +342,71 @@ class OnosDriver:
                 cls.__log.error("Couldn't flush ONOS' logs: ONOS or Karaf may not be installed.")
                 return False
         else:
+            denied = list()
             for item in dir_list:
                 if item.startswith("karaf") and item.endswith(".log"):
                     path = os.path.join(setup.config().onos.root_dir, 'karaf', 'data', 'log', item)
                     cls.__log.debug("Flushing ONOS log at \"{}\"".format(path))
                     try:
                         os.remove(path)
-                    except PermissionError:
-                        # It is highly probable that sudo is required to delete those files.
-                        # If so, try again using sudo
-                        child = pexpect.spawn("sudo rm {}".format(path))
-                        try:
-                            sudo_expect(spawn=child, pattern=[pexpect.EOF], timeout=180)
-                        except KeyError:
-                            cls.__log.error("Unable to remove ONOS log file \"{}\". Is sudo configured?".format(path))
-                            cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
-                            return False
-                    finally:
                         cls.__log.trace("Removed \"{}\"".format(path))
+                    except PermissionError:
+                        # It is highly probable that privileges are required to delete those files.
+                        denied.append(path)
+
+            # The files are removed by the privileged helper in a single request, or with sudo one by one
+            if PrivilegedDriver.run(*({'op': 'remove', 'path': path} for path in denied)) is None:
+                for path in denied:
+                    child = pexpect.spawn("sudo rm {}".format(path))
+                    try:
+                        sudo_expect(spawn=child, pattern=[pexpect.EOF], timeout=180)
+                    except KeyError:
+                        cls.__log.error("Unable to remove ONOS log file \"{}\". Is sudo configured?".format(path))
+                        cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+                        return False
+                    cls.__log.trace("Removed \"{}\"".format(path))
 
         cls.__log.info("ONOS logs have been flushed.")
         return True
     # End def flush_onos_logs
 
+    @classmethod
+    def truncate_logs(cls):
+        """Truncate the log files of a running ONOS instance.
+
+        Unlike `flush_logs`, the files are kept so ONOS keeps writing in the same files.
+        """
+        cls.__log.info("Truncating ONOS logs...")
+        try:
+            dir_list = os.listdir(cls.log_dir())
+        except FileNotFoundError:
+            cls.__log.error("Couldn't truncate ONOS' logs: no log directory at \"{}\"".format(cls.log_dir()))
+            return False
+
+        denied = list()
+        for item in dir_list:
+            if item.startswith("karaf") and item.endswith(".log"):
+                path = os.path.join(cls.log_dir(), item)
+                try:
+                    os.truncate(path, 0)
+                    cls.__log.trace("Truncated \"{}\"".format(path))
+                except PermissionError:
+                    denied.append(path)
+
+        if PrivilegedDriver.run(*({'op': 'truncate', 'path': path} for path in denied)) is None:
+            for path in denied:
+                child = pexpect.spawn("sudo truncate -s 0 {}".format(path))
+                try:
+                    sudo_expect(spawn=child, pattern=[pexpect.EOF], timeout=180)
+                except KeyError:
+                    cls.__log.error("Unable to truncate ONOS log file \"{}\". Is sudo configured?".format(path))
+                    cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+                    return False
+                cls.__log.trace("Truncated \"{}\"".format(path))
+
+        return True
+    # End def truncate_logs
+
     # ===== set log level ====
 
     @classmethod
@@ -320,32 +421,92 @@ class OnosDriver:
             raise AttributeError(
                 "ONOS log level must be either {} or {}, not \"{}\"".format(", ".join(allowed_levels[:-1]),
                                                                             allowed_levels[-1], level))
-        # connect to the ssh
-        log_level_set = False
+        # The northbound API can't change the log level, use the karaf shell which is kept open between the calls
+        log_level_set = cls.__karaf_exec("log:set {}".format(level)) is not None
+        if log_level_set is False:
+            cls.__log.warning("Something wrong happened while setting ONOS log level.")
+        return log_level_set
+    # End def set_log_level
+
+    # ===== Northbound API =============================================================================================
+
+    @classmethod
+    def rest(cls) -> OnosRestClient:
+        """Returns the client of the northbound API of ONOS. The client keeps its connection open between requests."""
+        if cls.__rest is None:
+            cls.__rest = OnosRestClient(host=setup.config().onos.host,
+                                        port=setup.config().onos.get('rest_port', 8181),
+                                        user=setup.config().onos.get('web_user', 'onos'),
+                                        password=setup.config().onos.get('web_password', 'rocks'),
+                                        timeout=cls.__timeout)
+        return cls.__rest
+    # End def rest
+
+    # ===== Karaf commands =============================================================================================
+
+    @classmethod
+    def __karaf_exec(cls, *commands):
+        """Run commands in the karaf shell of ONOS.
+
+        The ssh session is kept open for the next commands, and reopened if it has been closed.
+
+        Returns:
+            The output of the commands, or None if they couldn't be run.
+        """
+        session = cls.__karaf_session()
+        if session is None:
+            return None
+
+        output = str()
+        for command in commands:
+            session.sendline(command)
+            resp = session.expect([cls.__karaf_prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
+            if resp != 0:
+                cls.__log.warning("Karaf command \"{}\" did not complete.".format(command))
+                session.close()
+                cls.__karaf = None
+                return None
+            output += session.before.decode(errors='replace')
+
+        return output
+    # End def __karaf_exec
+
+    @classmethod
+    def __karaf_session(cls) -> Optional[pexpect.spawn]:
+        """Returns an ssh session logged in the karaf shell, or None if the session couldn't be established."""
+        if cls.__karaf is not None and cls.__karaf.isalive():
+            return cls.__karaf
+
         session = pexpect.spawn("ssh -o UserKnownHostsFile=/dev/null -o StrictHostKeyChecking=no "
-                                + "-p 8101 "
+                                + "-p {} ".format(cls.__karaf_port)
                                 + "karaf@localhost ")
-        try:
-            resp = session.expect(['Password:', pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
-            if resp == 0:
-                session.sendline(setup.config().onos.karaf_password)
-                resp = session.expect([r'.*>.*',
-                                       r'Connection\sclosed\sby',
-                                       pexpect.EOF,
-                                       pexpect.TIMEOUT]
-                                      , timeout=cls.__timeout)
-
-                if resp == 0:
-                    session.sendline("log:set {}".format(level))
-                    resp = session.expect([r'.*>.*', pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
-                    if resp == 0:
-                        log_level_set = True  # all good
-                    elif resp > 0:
-                        cls.__log.warning("Something wrong happened while setting ONOS log level.")
-
-                elif resp == 1:
-                    cls.__log.warning("Couldn't establish ssh session with karaf")
-        finally:
+        resp = session.expect(['Password:', pexpect.EOF, pexpect.TIMEOUT], timeout=cls.__timeout)
+        if resp == 0:
+            session.sendline(setup.config().onos.karaf_password)
+            resp = session.expect([cls.__karaf_prompt,
+                                   r'Connection\sclosed\sby',
+                                   pexpect.EOF,
+                                   pexpect.TIMEOUT],
+                                  timeout=cls.__timeout)
+        else:
+            resp = -1
+
+        if resp != 0:
+            cls.__log.warning("Couldn't establish ssh session with karaf")
             session.close()
-            return log_level_set
+            return None
+
+        cls.__karaf = session
+        return session
+    # End def __karaf_session
+
+    @classmethod
+    def __close_sessions(cls):
+        """Close the ssh session with karaf and the connection to the northbound API."""
+        if cls.__karaf is not None:
+            cls.__karaf.close()
+            cls.__karaf = None
+        if cls.__rest is not None:
+            cls.__rest.close()
+    # End def __close_sessions
 # End class OnosDriver
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Client for the northbound REST API of ONOS.
+
+The client keeps a single HTTP connection open to ONOS and reuses it for every request, instead of spawning a new
+process (ssh or onos-app) for each operation.
+"""
+import base64
+import http.client
+import json
+import logging
+import socket
+from typing import Any, Optional, Tuple
+from urllib.parse import quote
+
+# ===== ( Globals definition ) =========================================================================================
+
+API_ROOT = '/onos/v1'
+
+
+# ===== ( Client class ) ===============================================================================================
+
+class OnosRestClient:
+    """A keep-alive client for the northbound REST API of ONOS.
+
+    Args:
+        host (str): The host of ONOS.
+        port (int): The port of the northbound API.
+        user (str): The user name used to connect to the API.
+        password (str): The password used to connect to the API.
+        timeout (float): The timeout of each request, in seconds.
+    """
+
+    __log = logging.getLogger(__name__)
+
+    def __init__(self, host: str, port: int, user: str, password: str, timeout: float = 5.0):
+        self.host       = host
+        self.port       = int(port)
+        self.timeout    = timeout
+
+        self.__conn : Optional[http.client.HTTPConnection] = None
+        self.__headers = {
+            'Authorization' : 'Basic {}'.format(base64.b64encode('{}:{}'.format(user, password).encode()).decode()),
+            'Accept'        : 'application/json',
+            'Connection'    : 'keep-alive'
+        }
+    # End def __init__
+
+    # ===== ( Requests ) ===============================================================================================
+
+    def request(self, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        """Send a request to the API.
+
+        The connection is reopened once if ONOS closed it since the last request.
+
+        Args:
+            method (str): The HTTP method of the request.
+            path (str): The path of the resource, relative to the root of the API.
+            body (Any): An object to send as JSON.
+
+        Returns:
+            The status of the response and its decoded JSON content (None if the response has no content). The status
+            is 0 if ONOS couldn't be reached.
+        """
+        headers = dict(self.__headers)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+
+        for attempt in range(2):
+            try:
+                conn = self.__connection()
+                conn.request(method, API_ROOT + path, body=payload, headers=headers)
+                response = conn.getresponse()
+                content = response.read()
+            except (http.client.HTTPException, ConnectionError, socket.timeout, OSError) as e:
+                self.close()
+                if attempt == 0 and isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError,
+                                                   ConnectionResetError)):
+                    continue  # The kept-alive connection has been closed by ONOS
+                self.__log.trace("Request {} {} failed: {}".format(method, path, e))
+                return 0, None
+
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+            try:
+                return response.status, json.loads(content) if content else None
+            except ValueError:
+                return response.status, None
+        return 0, None
+    # End def request
+
+    def get(self, path: str) -> Tuple[int, Any]:
+        """Send a GET request to the API."""
+        return self.request('GET', path)
+    # End def get
+
+    def post(self, path: str, body: Any = None) -> Tuple[int, Any]:
+        """Send a POST request to the API."""
+        return self.request('POST', path, body)
+    # End def post
+
+    def delete(self, path: str, body: Any = None) -> Tuple[int, Any]:
+        """Send a DELETE request to the API."""
+        return self.request('DELETE', path, body)
+    # End def delete
+
+    def close(self):
+        """Close the connection to ONOS."""
+        if self.__conn is not None:
+            self.__conn.close()
+            self.__conn = None
+    # End def close
+
+    # ===== ( Operations ) =============================================================================================
+
+    def is_ready(self) -> bool:
+        """Returns True if the northbound API of ONOS answers, which may happen before its OpenFlow listener is open."""
+        status, _ = self.get('/applications')
+        return status == 200
+    # End def is_ready
+
+    def activate_app(self, app_name: str) -> Optional[bool]:
+        """Activate an application.
+
+        Returns:
+            True if the application is active, False if it couldn't be activated, and None if it doesn't exist.
+        """
+        status, content = self.post('/applications/{}/active'.format(quote(app_name, safe='')))
+        if status == 404:
+            return None
+        return status == 200 and isinstance(content, dict) and content.get('state') == 'ACTIVE'
+    # End def activate_app
+
+    def deactivate_app(self, app_name: str) -> bool:
+        """Deactivate an application."""
+        status, _ = self.delete('/applications/{}/active'.format(quote(app_name, safe='')))
+        return status in (200, 204)
+    # End def deactivate_app
+
+    def counts(self) -> Optional[Tuple[int, int, int]]:
+        """Returns the number of devices, hosts and flows known by ONOS, or None if they couldn't be read."""
+        counts = list()
+        for resource in ('devices', 'hosts', 'flows'):
+            status, content = self.get('/' + resource)
+            if status != 200 or not isinstance(content, dict):
+                return None
+            counts.append(len(content.get(resource, list())))
+        return counts[0], counts[1], counts[2]
+    # End def counts
+
+    def purge(self) -> bool:
+        """Remove all the devices, hosts and flows known by ONOS.
+
+        Returns:
+            True if ONOS knows no devices, hosts or flows afterwards, False otherwise.
+        """
+        status, content = self.get('/devices')
+        for device in content.get('devices', list()) if status == 200 and content else list():
+            self.delete('/devices/{}'.format(quote(device['id'], safe='')))
+
+        status, content = self.get('/hosts')
+        for host in content.get('hosts', list()) if status == 200 and content else list():
+            self.delete('/hosts/{}/{}'.format(quote(host['mac'], safe=''), quote(str(host['vlan']), safe='')))
+
+        # The flows of the removed devices are removed with them, remove the remaining ones in a single batch
+        status, content = self.get('/flows')
+        flows = content.get('flows', list()) if status == 200 and content else list()
+        if len(flows) > 0:
+            self.delete('/flows', {'flows': [{'deviceId': f['deviceId'], 'flowId': f['id']} for f in flows]})
+
+        counts = self.counts()
+        if counts is None or any(count > 0 for count in counts):
+            self.__log.warning("ONOS state is not clean after the purge (devices, hosts, flows: {})".format(counts))
+            return False
+        return True
+    # End def purge
+
+    # ===== ( Private methods ) ========================================================================================
+
+    def __connection(self) -> http.client.HTTPConnection:
+        if self.__conn is None:
+            self.__conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self.__conn
+    # End def __connection
+# End class OnosRestClient
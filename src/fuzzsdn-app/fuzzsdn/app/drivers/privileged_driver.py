@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import json
+import logging
+import os
+import socket
+import sys
+from typing import List, Optional
+
+import pexpect
+
+from fuzzsdn.app import setup
+from fuzzsdn.app.drivers import privileged_runner, supervisor
+from fuzzsdn.app.drivers.commons import sudo_expect
+from fuzzsdn.common import app_path
+
+
+class PrivilegedDriver:
+    """Driver of the privileged helper, which runs the privileged operations of the other drivers.
+
+    The helper is started once with sudo and serves the operations of privileged_runner.OPERATIONS on a Unix socket, so
+    that the drivers don't spawn and authenticate a sudo process for each privileged operation. When the helper is
+    disabled (option "privileged_helper" of the configuration file) or not running, `run` returns None and the drivers
+    fall back to sudo.
+    """
+
+    __log = logging.getLogger(__name__)
+    __handle : Optional[pexpect.spawn] = None
+    __timeout = 300  # Maximum time in seconds of a request, which may start a service
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """Returns True if the privileged helper should be used (option "privileged_helper" of the configuration)."""
+        return setup.config().general.get('privileged_helper', False) is True
+    # End def is_enabled
+
+    @classmethod
+    def socket_path(cls) -> str:
+        """Returns the path of the Unix socket of the helper."""
+        return os.path.join(app_path.run_dir(), "privileged.sock")
+    # End def socket_path
+
+    @classmethod
+    def start(cls, timeout: float = 30.0) -> bool:
+        """Start the privileged helper with sudo and wait until it is ready.
+
+        Args:
+            timeout (float): The maximum time in seconds to wait for the helper to be ready.
+
+        Returns:
+            True if the helper is ready, False otherwise.
+        """
+        if cls.is_running():
+            return True
+
+        args = [sys.executable, privileged_runner.__file__,
+                '--socket', cls.socket_path(),
+                '--uid', str(os.getuid())]
+        for root in cls.__roots():
+            args += ['--root', root]
+
+        cls.__log.info("Starting the privileged helper...")
+        child = pexpect.spawn('sudo', args)
+        try:
+            i = sudo_expect(spawn=child,
+                            pattern=[privileged_runner.READY_MESSAGE, pexpect.EOF, pexpect.TIMEOUT],
+                            timeout=timeout)
+        except KeyError:
+            cls.__log.error("Unable to start the privileged helper due to permission issues. Is sudo configured?")
+            cls.__log.error("Add fuzzsdn to sudoers or configure sudo password in configuration file")
+            child.close(force=True)
+            return False
+
+        if i != 0:
+            cls.__log.error("The privileged helper did not start: {}".format(
+                child.before.decode('utf-8', errors='replace').strip() if isinstance(child.before, bytes) else ''))
+            child.close(force=True)
+            return False
+
+        cls.__handle = child
+        supervisor.track('privileged_helper', child, privileged=True)
+        cls.__log.info("The privileged helper has started.")
+        return True
+    # End def start
+
+    @classmethod
+    def stop(cls, timeout: float = 5.0) -> bool:
+        """Ask the privileged helper to exit, and kill it if it doesn't exit after `timeout` seconds.
+
+        Returns:
+            True if the helper has stopped, False otherwise.
+        """
+        if cls.__handle is None:
+            return True
+
+        cls.__log.info("Stopping the privileged helper...")
+        cls.__request({'shutdown': True})
+        stopped = supervisor.stop('privileged_helper', timeout=timeout, grace=timeout)
+        if stopped is True:
+            cls.__handle.close(force=True)
+            cls.__handle = None
+        return stopped
+    # End def stop
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """Returns True if the privileged helper answers."""
+        return os.path.exists(cls.socket_path()) and cls.__request({'operations': list()}) is not None
+    # End def is_running
+
+    @classmethod
+    def run(cls, *operations: dict) -> Optional[List[dict]]:
+        """Run privileged operations in a single request to the helper. See privileged_runner for the operations.
+
+        Args:
+            operations (dict): The operations, each with the name of the operation under "op" and its arguments.
+
+        Returns:
+            The result of each operation ("ok" and "output"), or None if the helper is disabled or unavailable, in which
+            case the operations have to be run with sudo.
+        """
+        if len(operations) == 0:
+            return list()
+
+        if os.geteuid() == 0:
+            # Already privileged, no need for the helper
+            return privileged_runner.execute(list(operations), cls.__roots(), os.getuid())
+
+        if not cls.is_enabled():
+            return None
+
+        response = cls.__request({'operations': list(operations)})
+        if response is None:
+            return None
+
+        results = response.get('results')
+        for op, result in zip(operations, results):
+            if result['ok'] is not True:
+                cls.__log.error("Privileged operation \"{}\" failed: {}".format(op.get('op'), result['output'].strip()))
+        return results
+    # End def run
+
+    # ===== ( Private methods ) ========================================================================================
+
+    @classmethod
+    def __request(cls, request: dict) -> Optional[dict]:
+        # A connection is opened for each request: the sandboxes are forked workers which can't share a connection
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(cls.__timeout)
+                sock.connect(cls.socket_path())
+                with sock.makefile('rwb') as f:
+                    f.write((json.dumps(request) + '\n').encode())
+                    f.flush()
+                    line = f.readline()
+        except OSError as e:
+            cls.__log.debug("The privileged helper is unavailable: {}".format(e))
+            return None
+
+        try:
+            response = json.loads(line)
+        except ValueError:
+            cls.__log.error("Malformed response from the privileged helper: {}".format(line))
+            return None
+        if 'error' in response:
+            cls.__log.error("The privileged helper rejected the request: {}".format(response['error']))
+            return None
+        return response
+    # End def __request
+
+    @classmethod
+    def __roots(cls) -> List[str]:
+        """Returns the directories in which the helper may remove and truncate files."""
+        return [os.path.join(setup.config().onos.root_dir, 'karaf', 'data', 'log'),
+                os.path.dirname(os.path.expanduser(setup.config().fuzzer.out_path)),
+                app_path.run_dir()]
+    # End def __roots
+# End class PrivilegedDriver
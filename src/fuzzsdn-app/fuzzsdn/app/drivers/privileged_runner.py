@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Privileged helper started once with sudo, which runs a fixed set of privileged operations for the drivers.
+
+The helper listens on a Unix socket which only the user who started it can connect to. A request is a JSON object on
+one line holding a list of operations, which are run in order; the response holds the result of each operation:
+
+    {"operations": [{"op": "systemctl", "action": "stop", "unit": "onos"}, {"op": "remove", "path": "/x/karaf.log"}]}
+    {"results": [{"ok": true, "output": ""}, {"ok": true, "output": ""}]}
+
+The request {"shutdown": true} stops the helper. Only the operations of OPERATIONS are accepted, and their arguments
+are checked before anything is run: files are only removed or truncated under the allowed directories, signals are only
+sent to the processes of the user who started the helper (or to their descendants) and to the services of UNITS, and
+the Mininet cleanup only removes the nodes whose names start with a given name. The module only depends on the
+standard library, as it runs with the interpreter of root and is started from its file path.
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+from typing import Callable, Dict, List, Tuple
+
+# ===== ( Globals definition ) =========================================================================================
+
+READY_MESSAGE   = "Privileged helper ready"
+UNITS           = ('onos',)                     # Services which can be started and stopped
+SIGNALS         = {'TERM': signal.SIGTERM, 'KILL': signal.SIGKILL}
+CLEAN_PATTERN   = re.compile(r'^[A-Za-z0-9_|*!\[\]\-]*$')  # Shell patterns of the Mininet cleanup, without any quote,
+                                                           # space, substitution or separator
+NODE_NAME       = re.compile(r'^[A-Za-z][A-Za-z0-9_]*')     # Name each alternative of a node pattern starts with
+
+
+# ===== ( Operations ) =================================================================================================
+
+def clean_own_script(hosts: str, links: str) -> str:
+    """Returns the script removing the host shells, switches and links of a Mininet network.
+
+    Args:
+        hosts (str): The pattern (an extended regex alternative) of the names of the hosts.
+        links (str): The pattern (a shell "case" pattern) of the names of the switches and of their links.
+
+    Raises:
+        ValueError: if a pattern contains characters that could be interpreted by the shell, or if one of its
+                    alternatives doesn't start with a literal name (e.g. "*", which would match every node).
+    """
+    for pattern in (hosts, links):
+        if not CLEAN_PATTERN.match(pattern):
+            raise ValueError("Invalid node pattern")
+        if pattern != '' and not all(NODE_NAME.match(alternative) for alternative in pattern.split('|')):
+            raise ValueError("Each alternative of a node pattern must start with a name")
+
+    script = list()
+    if hosts != '':
+        # The shells of the hosts are found by their command line (bash ... mininet:<host>). The brackets stop the
+        # pattern from matching the command line of the script itself.
+        script.append("pkill -9 -f 'mininet[:]({})$'".format(hosts))
+    if links != '':
+        script.append("for br in $(ovs-vsctl list-br); do case $br in {}) ovs-vsctl --if-exists del-br $br;; "
+                      "esac; done".format(links))
+        script.append("for intf in $(ls /sys/class/net); do case $intf in {}) ip link del $intf;; esac; "
+                      "done".format(links))
+    script.append("echo Targeted cleanup complete")
+    return "; ".join(script)
+# End def clean_own_script
+
+
+def _run(args: List[str], timeout: float) -> dict:
+    try:
+        process = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'ok': False, 'output': "Timed out after {}s".format(timeout)}
+    return {'ok': process.returncode == 0, 'output': process.stdout.decode('utf-8', errors='replace')}
+# End def _run
+
+
+def _checked_path(path: str, roots: List[str]) -> str:
+    """Returns the real path of a file if it is a regular file under one of the roots, raise a ValueError otherwise."""
+    real_path = os.path.realpath(path)
+    if not any(os.path.commonpath([real_path, root]) == root for root in roots):
+        raise ValueError("\"{}\" is outside of the allowed directories".format(path))
+    if os.path.exists(real_path) and not os.path.isfile(real_path):
+        raise ValueError("\"{}\" is not a regular file".format(path))
+    return real_path
+# End def _checked_path
+
+
+def _systemctl(op: dict, roots: List[str], owner: int) -> dict:
+    if op.get('action') not in ('start', 'stop', 'restart') or op.get('unit') not in UNITS:
+        raise ValueError("Unsupported systemctl operation")
+    return _run(['systemctl', op['action'], op['unit']], timeout=float(op.get('timeout', 180)))
+# End def _systemctl
+
+
+def _remove(op: dict, roots: List[str], owner: int) -> dict:
+    path = _checked_path(op['path'], roots)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    return {'ok': True, 'output': ''}
+# End def _remove
+
+
+def _truncate(op: dict, roots: List[str], owner: int) -> dict:
+    os.truncate(_checked_path(op['path'], roots), 0)
+    return {'ok': True, 'output': ''}
+# End def _truncate
+
+
+def _proc_status(pid: int) -> Tuple[int, int]:
+    """Returns the real uid and the parent pid of a process, read from /proc."""
+    uid, ppid = None, None
+    with open('/proc/{}/status'.format(pid)) as f:
+        for line in f:
+            if line.startswith('Uid:'):
+                uid = int(line.split()[1])
+            elif line.startswith('PPid:'):
+                ppid = int(line.split()[1])
+    if uid is None or ppid is None:
+        raise ValueError("Couldn't read the status of process {}".format(pid))
+    return uid, ppid
+# End def _proc_status
+
+
+def _unit_pids() -> List[int]:
+    """Returns the main pids of the running services of UNITS."""
+    pids = list()
+    for unit in UNITS:
+        try:
+            output = _run(['systemctl', 'show', '--property=MainPID', '--value', unit], timeout=10)['output'].strip()
+        except OSError:
+            continue  # No systemd, there is no service
+        if output.isdigit() and int(output) > 0:
+            pids.append(int(output))
+    return pids
+# End def _unit_pids
+
+
+def _is_owned(pid: int, owner: int, unit_pids: List[int]) -> bool:
+    """Returns True if a process belongs to the owner of the helper, descends from a process of the owner (e.g. a
+    process started with sudo), or belongs to a service of UNITS."""
+    seen = set()
+    while pid > 1 and pid not in seen:
+        seen.add(pid)
+        if pid in unit_pids:
+            return True
+        try:
+            uid, ppid = _proc_status(pid)
+        except FileNotFoundError:
+            return False  # The chain is broken, the process can't be tied to the owner
+        if uid == owner:
+            return True
+        pid = ppid
+    return False
+# End def _is_owned
+
+
+def _group_members(pgid: int) -> List[int]:
+    """Returns the pids of the processes of a process group."""
+    members = list()
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{}/stat'.format(entry)) as f:
+                # The command name is between parentheses and may contain spaces, the group is the 3rd field after it
+                fields = f.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue  # The process has exited
+        if int(fields[2]) == pgid:
+            members.append(int(entry))
+    return members
+# End def _group_members
+
+
+def _kill(op: dict, roots: List[str], owner: int) -> dict:
+    target = int(op['target'])
+    if target in (0, -1, 1) or op.get('signal') not in SIGNALS:
+        raise ValueError("Unsupported kill operation")
+
+    # Only the processes tied to the owner can be signaled, all of them for a process group
+    unit_pids = _unit_pids()
+    pids = _group_members(-target) if target < 0 else [target]
+    pids = [pid for pid in pids if os.path.exists('/proc/{}'.format(pid))]  # Ignore the processes which have exited
+    if not all(_is_owned(pid, owner, unit_pids) for pid in pids):
+        raise ValueError("Process {} is not tied to the user".format(target))
+    try:
+        if target < 0:
+            os.killpg(-target, SIGNALS[op['signal']])
+        else:
+            os.kill(target, SIGNALS[op['signal']])
+    except ProcessLookupError:
+        pass
+    return {'ok': True, 'output': ''}
+# End def _kill
+
+
+def _mn_clean(op: dict, roots: List[str], owner: int) -> dict:
+    return _run(['mn', '-c'], timeout=float(op.get('timeout', 120)))
+# End def _mn_clean
+
+
+def _mn_clean_own(op: dict, roots: List[str], owner: int) -> dict:
+    script = clean_own_script(op.get('hosts', ''), op.get('links', ''))
+    return _run(['sh', '-c', script], timeout=float(op.get('timeout', 120)))
+# End def _mn_clean_own
+
+
+OPERATIONS : Dict[str, Callable[[dict, List[str], int], dict]] = {
+    'systemctl'     : _systemctl,
+    'remove'        : _remove,
+    'truncate'      : _truncate,
+    'kill'          : _kill,
+    'mn_clean'      : _mn_clean,
+    'mn_clean_own'  : _mn_clean_own,
+}
+
+
+def execute(operations: List[dict], roots: List[str], owner: int) -> List[dict]:
+    """Run a list of operations in order.
+
+    Args:
+        operations (List[dict]): The operations, each with the name of the operation under "op" and its arguments.
+        roots (List[str]): The directories under which files can be removed or truncated.
+        owner (int): The uid of the user the operations are run for, whose processes can be signaled.
+
+    Returns:
+        The result of each operation: whether it succeeded ("ok") and its output or error ("output").
+    """
+    results = list()
+    for op in operations:
+        try:
+            if not isinstance(op, dict) or op.get('op') not in OPERATIONS:
+                raise ValueError("Unknown operation")
+            results.append(OPERATIONS[op['op']](op, roots, owner))
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            results.append({'ok': False, 'output': "{}: {}".format(type(e).__name__, e)})
+    return results
+# End def execute
+
+
+# ===== ( Server ) =====================================================================================================
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        # Only the user who started the helper (and root) may use it
+        creds = self.request.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _, uid, _ = struct.unpack('3i', creds)
+        if uid not in (0, self.server.owner):
+            return
+
+        for line in self.rfile:
+            shutdown = False
+            try:
+                request = json.loads(line)
+                shutdown = request.get('shutdown') is True
+                if shutdown:
+                    response = {'results': list()}
+                else:
+                    response = {'results': execute(list(request['operations']), self.server.roots,
+                                                          self.server.owner)}
+            except (ValueError, KeyError, TypeError, AttributeError):
+                response = {'error': "Malformed request"}
+            self.wfile.write((json.dumps(response) + '\n').encode())
+            self.wfile.flush()
+
+            if shutdown:
+                # Each client is served in its own thread, so the server can be shut down from here
+                self.server.shutdown()
+                return
+    # End def handle
+# End class _RequestHandler
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads  = True
+    owner           = 0
+    roots           : List[str] = list()
+# End class _Server
+
+
+def serve(socket_path: str, owner: int, roots: List[str]):
+    """Serve the requests of a user on a Unix socket until the helper is asked to shut down.
+
+    Args:
+        socket_path (str): The path of the Unix socket.
+        owner (int): The uid of the user allowed to use the helper.
+        roots (List[str]): The directories under which files can be removed or truncated.
+    """
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with _Server(socket_path, _RequestHandler) as server:
+        server.owner = owner
+        server.roots = [os.path.realpath(root) for root in roots]
+        os.chown(socket_path, owner, -1)
+        os.chmod(socket_path, 0o600)
+
+        print(READY_MESSAGE, flush=True)
+        try:
+            server.serve_forever(poll_interval=0.2)
+        finally:
+            os.remove(socket_path)
+# End def serve
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Privileged helper of fuzzsdn")
+    parser.add_argument('--socket', required=True, help="Path of the Unix socket")
+    parser.add_argument('--uid', required=True, type=int, help="uid of the user allowed to use the helper")
+    parser.add_argument('--root', action='append', default=list(),
+                        help="Directory under which files can be removed or truncated")
+    arguments = parser.parse_args()
+
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)  # Keep running when the terminal of the caller is closed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    serve(arguments.socket, arguments.uid, arguments.root)
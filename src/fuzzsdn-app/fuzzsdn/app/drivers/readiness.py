@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Readiness checks used by the drivers to know when a component is ready, instead of waiting for a fixed time.
+
+Every wait is bounded by a timeout and returns as soon as the component is ready. The time spent waiting is recorded
+per component and can be collected with `pop_waits`.
+"""
+import logging
+import os
+import re
+import time
+from timeit import default_timer as timer
+from typing import Callable, Dict, List, Optional, Union
+
+# ===== ( Globals definition ) =========================================================================================
+
+POLL_INTERVAL   = 0.05  # Interval in seconds between two checks
+TCP_LISTEN      = '0A'  # State of a listening socket in /proc/net/tcp
+
+_log = logging.getLogger(__name__)
+_waits : Dict[str, List[float]] = dict()
+
+
+# ===== ( Checks ) =====================================================================================================
+
+def is_port_listening(port: int) -> bool:
+    """Check if a TCP port is listening on the host.
+
+    The check reads the socket tables of the kernel instead of connecting to the port, so that it does not open a
+    connection with the component (a connection to the fuzzer or to a controller would be handled as a switch).
+
+    Args:
+        port (int): The TCP port to check
+
+    Returns:
+        True if a socket is listening on the port, False otherwise.
+    """
+    for table in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(table, 'r') as f:
+                next(f)  # Skip the header
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == TCP_LISTEN and int(fields[1].rsplit(':', 1)[1], 16) == port:
+                        return True
+        except FileNotFoundError:
+            continue
+    return False
+# End def is_port_listening
+
+
+def is_process_alive(pid: int) -> bool:
+    """Check if a process is running (i.e. it exists and it is not a zombie).
+
+    Args:
+        pid (int): The pid of the process
+
+    Returns:
+        True if the process is running, False otherwise.
+    """
+    try:
+        with open('/proc/{}/stat'.format(pid), 'r') as f:
+            # The state follows the name of the process, which is between parenthesis
+            state = f.read().rsplit(')', 1)[1].split()[0]
+    except (FileNotFoundError, IndexError):
+        return False
+    return state not in ('Z', 'X')
+# End def is_process_alive
+
+
+# ===== ( Waits ) ======================================================================================================
+
+def wait_until(predicate: Callable[[], bool],
+               timeout: float,
+               abort: Optional[Callable[[], bool]] = None,
+               component: Optional[str] = None) -> bool:
+    """Wait until a predicate is true.
+
+    Args:
+        predicate (Callable): The condition to wait for.
+        timeout (float): The maximum time to wait in seconds.
+        abort (Callable): A condition that stops the wait early (e.g. the process of the component has exited).
+        component (str): The name of the component to record the wait for.
+
+    Returns:
+        True if the predicate became true before the timeout, False otherwise.
+    """
+    start = timer()
+    ready = predicate()
+    while ready is False and timer() - start < timeout:
+        if abort is not None and abort():
+            break
+        time.sleep(POLL_INTERVAL)
+        ready = predicate()
+
+    elapsed = timer() - start
+    if component is not None:
+        record_wait(component, elapsed)
+        if ready is True:
+            _log.debug("\"{}\" is ready after {:.3f}s".format(component, elapsed))
+        else:
+            _log.warning("\"{}\" is not ready after {:.3f}s".format(component, elapsed))
+    return ready
+# End def wait_until
+
+
+def wait_for_port(port: int,
+                  timeout: float,
+                  listening: bool = True,
+                  pid: Optional[int] = None,
+                  component: Optional[str] = None) -> bool:
+    """Wait until a TCP port is listening (or is released).
+
+    Args:
+        port (int): The TCP port to wait for.
+        timeout (float): The maximum time to wait in seconds.
+        listening (bool): If set to False, wait until the port is no longer listening.
+        pid (int): The pid of the process that should open the port. The wait stops if this process exits.
+        component (str): The name of the component to record the wait for.
+
+    Returns:
+        True if the port reached the expected state before the timeout, False otherwise.
+    """
+    return wait_until(
+        predicate=lambda: is_port_listening(port) is listening,
+        timeout=timeout,
+        abort=(lambda: not is_process_alive(pid)) if pid is not None else None,
+        component=component
+    )
+# End def wait_for_port
+
+
+def wait_for_log(path: str,
+                 pattern: Union[str, re.Pattern],
+                 timeout: float,
+                 offset: int = 0,
+                 pid: Optional[int] = None,
+                 component: Optional[str] = None) -> bool:
+    """Wait until a line matching a pattern is written into a log file.
+
+    Args:
+        path (str): The path to the log file.
+        pattern (str, re.Pattern): The pattern to look for.
+        timeout (float): The maximum time to wait in seconds.
+        offset (int): The position in the file from which the lines are read.
+        pid (int): The pid of the process that writes the log. The wait stops if this process exits.
+        component (str): The name of the component to record the wait for.
+
+    Returns:
+        True if a matching line was found before the timeout, False otherwise.
+    """
+    pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+    position = offset
+    buffer = ''
+
+    def line_written():
+        nonlocal position, buffer
+        if not os.path.isfile(path):
+            return False
+        if os.path.getsize(path) < position:
+            position = 0  # The file has been truncated or rotated
+        with open(path, 'r', errors='replace') as f:
+            f.seek(position)
+            buffer += f.read()
+            position = f.tell()
+        # Keep the last incomplete line for the next read
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+        return any(pattern.search(line) for line in lines)
+
+    return wait_until(
+        predicate=line_written,
+        timeout=timeout,
+        abort=(lambda: not is_process_alive(pid)) if pid is not None else None,
+        component=component
+    )
+# End def wait_for_log
+
+
+def wait_for_quiet(path: str,
+                   quiet: float,
+                   timeout: float,
+                   abort: Optional[Callable[[], bool]] = None,
+                   component: Optional[str] = None) -> bool:
+    """Wait until a log file (or the log files of a directory) stops growing.
+
+    Args:
+        path (str): The path to the log file or to the log directory.
+        quiet (float): The time in seconds without new writes after which the log is considered quiet.
+        timeout (float): The maximum time to wait in seconds.
+        abort (Callable): A condition that stops the wait early (e.g. the outcome of the test is already known).
+        component (str): The name of the component to record the wait for.
+
+    Returns:
+        True if the log was quiet before the timeout, False otherwise.
+    """
+    def snapshot():
+        try:
+            files = [os.path.join(path, f) for f in os.listdir(path)] if os.path.isdir(path) else [path]
+            return tuple((f, os.path.getsize(f)) for f in sorted(files) if os.path.isfile(f))
+        except OSError:  # A log file has been rotated while listing the directory
+            return None
+
+    last = snapshot()
+    last_change = timer()
+
+    def is_quiet():
+        nonlocal last, last_change
+        current = snapshot()
+        if current != last:
+            last, last_change = current, timer()
+        return timer() - last_change >= quiet
+
+    return wait_until(predicate=is_quiet, timeout=timeout, abort=abort, component=component)
+# End def wait_for_quiet
+
+
+def wait_for_process(pid: int, timeout: float, alive: bool = True, component: Optional[str] = None) -> bool:
+    """Wait until a process is up (or has exited).
+
+    Args:
+        pid (int): The pid of the process.
+        timeout (float): The maximum time to wait in seconds.
+        alive (bool): If set to False, wait until the process has exited.
+        component (str): The name of the component to record the wait for.
+
+    Returns:
+        True if the process reached the expected state before the timeout, False otherwise.
+    """
+    return wait_until(
+        predicate=lambda: is_process_alive(pid) is alive,
+        timeout=timeout,
+        component=component
+    )
+# End def wait_for_process
+
+
+# ===== ( Recorded waits ) =============================================================================================
+
+def record_wait(component: str, elapsed: float):
+    """Record the time spent waiting for a component."""
+    _waits.setdefault(component, list()).append(elapsed)
+# End def record_wait
+
+
+def pop_waits() -> Dict[str, List[float]]:
+    """Returns the times spent waiting for each component since the last call, and clear them."""
+    global _waits
+    waits, _waits = _waits, dict()
+    return waits
+# End def pop_waits
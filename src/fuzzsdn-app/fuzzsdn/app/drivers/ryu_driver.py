@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 import logging
+import logging.handlers
+import multiprocessing
 import os.path
 import subprocess
-import time
 from pathlib import Path
+from typing import Optional
 
 from fuzzsdn.app import setup
+from fuzzsdn.app.drivers import readiness, supervisor
+from fuzzsdn.app.drivers.ryu_runner import run_ryu_manager
+from fuzzsdn.common.utils.log import RingBufferHandler
 
 
 class RyuDriver:
@@ -21,24 +26,30 @@ class RyuDriver:
     __save_log      = False
     __start_time    = None
 
+    # In-process mode
+    __log_buffer    : Optional[RingBufferHandler] = None
+    __log_listener  : Optional[logging.handlers.QueueListener] = None
+
     # ===== Start Stop methods =========================================================================================
 
     @classmethod
-    def start(cls, app_name, persist=False, save_log=True):
+    def start(cls, app_name, persist=False, save_log=True, timeout=10.0, in_process=None):
         """
 
         :param app_name: Name of the application to start Ryu with
         :param persist: If set to True, untie RYU from the
         :param save_log:
-        :return:
+        :param timeout: Maximum time to wait for Ryu to listen for the switches, in seconds
+        :param in_process: If set to True, run Ryu's application manager in a child process and keep its logs in memory
+                           (see `log_buffer`). Default to the "in_process" option of the configuration file.
+        :return: True if Ryu is ready, False otherwise
         """
 
         # Get log directory
         cls.__log_dir = os.path.expanduser(setup.config().ryu.log_dir)
 
-        if cls.__ryu_proc is not None:
-            cls.__ryu_proc.terminate()
-            cls.__ryu_proc = None
+        # A previous instance would still listen on the port of Ryu
+        cls.stop(timeout)
 
         if save_log is True:
             cls.__save_log  = True
@@ -62,6 +73,13 @@ class RyuDriver:
             'CRITICAL'  : logging.CRITICAL
         }
         default_log_level = int(level_d.get(setup.config().ryu.log_level, logging.DEBUG))
+
+        if in_process is None:
+            in_process = setup.config().ryu.get('in_process', False) is True
+        if in_process is True:
+            return cls.__start_in_process(app_name, default_log_level, timeout)
+        cls.__log_buffer = None
+
         # Launch Ryu
         if cls.__save_log:
             cmd = ('ryu-manager',
@@ -80,28 +98,58 @@ class RyuDriver:
         cls.__log.trace("Executing command: {}".format(" ".join(cmd)))
         cls.__ryu_proc = subprocess.Popen(cmd,
                                           shell=False,
-                                          preexec_fn=os.setsid() if persist is True else None,
+                                          start_new_session=persist is True,
                                           stdout=subprocess.DEVNULL,
                                           stderr=subprocess.DEVNULL
                                           )
-        time.sleep(3)  # Necessary
+        supervisor.track('ryu', cls.__ryu_proc, group=persist is True)
+        # Wait for Ryu to listen for the switches
+        port = int(setup.config().ryu.port)
+        ready = readiness.wait_for_port(port, timeout=timeout, pid=cls.__ryu_proc.pid, component='ryu')
+        if ready is False:
+            cls.__log.error("ryu-manager is not listening on port {} after {}s".format(port, timeout))
+            return False
+
         cls.__log.debug("Started ryu-manager.")
-        return cls.__ryu_proc is not None
+        return True
     # End def start
 
     @classmethod
-    def stop(cls):
+    def stop(cls, timeout=5.0):
+        """Stop Ryu. Ryu is killed if it hasn't exited after `timeout` seconds.
+
+        :param timeout: Time given to Ryu to exit, and then to release its port, in seconds
+        :return: True if Ryu has stopped (or if it was not started), False otherwise
+        """
+        stopped = True
         if cls.__ryu_proc is not None:
-            cls.__ryu_proc.terminate()
-            subprocess.Popen.wait(cls.__ryu_proc)
+            stopped = supervisor.stop('ryu', timeout=timeout)
+
+            # Wait for the port to be released before Ryu can be started again
+            readiness.wait_for_port(int(setup.config().ryu.port), timeout=timeout, listening=False, component='ryu_stop')
+
+        cls.__stop_log_listener()
+        cls.__ryu_proc = None
 
         if cls.__save_log is True:
             # save the logs
             pass
 
-        return True
+        return stopped
     # End def stop
 
+    @classmethod
+    def log_buffer(cls) -> Optional[RingBufferHandler]:
+        """Returns the in-memory buffer holding the logs of Ryu when it runs in-process, or None otherwise."""
+        return cls.__log_buffer
+    # End def log_buffer
+
+    @classmethod
+    def log_dir(cls):
+        """Returns the directory where the logs of Ryu are written."""
+        return os.path.expanduser(setup.config().ryu.log_dir)
+    # End def log_dir
+
     @classmethod
     def flush_logs(cls):
         """Flush the log file generated by ONOS."""
@@ -125,4 +173,46 @@ class RyuDriver:
         return True
     # End def flush_logs
 
-# End class OnosDriver
+    # ===== In-process mode ============================================================================================
+
+    @classmethod
+    def __start_in_process(cls, app_name, log_level, timeout):
+        """Start Ryu's application manager in a child process, and collect its logs in memory."""
+        # Collect the records sent by Ryu in the ring buffer, and in the log file if the logs are saved
+        cls.__log_buffer = RingBufferHandler(capacity=int(setup.config().ryu.get('log_buffer_size', 10000)))
+        handlers = [cls.__log_buffer]
+        if cls.__save_log is True:
+            handlers.append(logging.FileHandler(cls.__log_file))
+        log_queue = multiprocessing.Queue()
+        cls.__log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+        cls.__log_listener.start()
+
+        port = int(setup.config().ryu.port)
+        cls.__log.trace("Running \"{}\" in-process on port {}".format(app_name, port))
+        cls.__ryu_proc = multiprocessing.Process(target=run_ryu_manager,
+                                                 args=(app_name, port, log_level, log_queue),
+                                                 name='ryu-manager')
+        cls.__ryu_proc.start()
+        supervisor.track('ryu', cls.__ryu_proc)
+
+        # Wait for Ryu to listen for the switches
+        ready = readiness.wait_for_port(port, timeout=timeout, pid=cls.__ryu_proc.pid, component='ryu')
+        if ready is False:
+            cls.__log.error("Ryu is not listening on port {} after {}s".format(port, timeout))
+            return False
+
+        cls.__log.debug("Started Ryu in-process.")
+        return True
+    # End def __start_in_process
+
+    @classmethod
+    def __stop_log_listener(cls):
+        """Stop collecting the logs of Ryu. The records already collected are kept in the buffer."""
+        if cls.__log_listener is not None:
+            cls.__log_listener.stop()
+            for handler in cls.__log_listener.handlers:
+                if isinstance(handler, logging.FileHandler):
+                    handler.close()
+            cls.__log_listener = None
+    # End def __stop_log_listener
+# End class RyuDriver
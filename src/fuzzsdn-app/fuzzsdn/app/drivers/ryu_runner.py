@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Entry point of the child process that runs Ryu's application manager when Ryu is started in-process.
+
+The log records of Ryu are sent back to the parent process through a queue instead of being written to a log file by
+ryu-manager.
+"""
+import logging
+import logging.handlers
+import multiprocessing
+
+
+def run_ryu_manager(app_name: str, port: int, log_level: int, log_queue: multiprocessing.Queue):
+    """Run a Ryu application with the application manager of Ryu, the same way ryu-manager does.
+
+    Args:
+        app_name (str): The name of the application to run (i.e. "ryu.app.simple_switch_14").
+        port (int): The port on which Ryu listens for the switches.
+        log_level (int): The log level of Ryu.
+        log_queue (multiprocessing.Queue): The queue to which the log records are sent.
+    """
+    # Send all the log records to the parent process
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(log_level)
+
+    # Ryu must be imported after the patch of the hub, which is done by ryu-manager before anything else
+    from ryu.lib import hub
+    hub.patch(thread=False)
+
+    from ryu import cfg
+    from ryu.base.app_manager import AppManager
+
+    cfg.CONF(args=['--ofp-tcp-listen-port={}'.format(port)], project='ryu')
+
+    app_mgr = AppManager.get_instance()
+    app_mgr.load_apps([app_name])
+    contexts = app_mgr.create_contexts()
+    services = list()
+    services.extend(app_mgr.instantiate_apps(**contexts))
+    try:
+        hub.joinall(services)
+    finally:
+        app_mgr.close()
+# End def run_ryu_manager
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Supervisor of the processes launched by the drivers (fuzzer, Ryu, Mininet, ONOS service).
+
+Each process is registered under the name of its component with its pid and, optionally, its process group. Stopping a
+component sends SIGTERM, waits for the process to exit, and sends SIGKILL if it didn't exit in time, so that stopping a
+component takes a bounded time and never scans the process table.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import subprocess
+from typing import Any, Dict, Optional
+
+import pexpect
+
+from fuzzsdn.app import setup
+from fuzzsdn.app.drivers import readiness
+
+# ===== ( Globals definition ) =========================================================================================
+
+_log = logging.getLogger(__name__)
+_processes : Dict[str, 'Process'] = dict()
+
+
+# ===== ( Process class ) ==============================================================================================
+
+class Process:
+    """A process launched by a driver.
+
+    Args:
+        name (str): The name of the component run by the process.
+        pid (int): The pid of the process.
+        handle (Any): The object through which the process has been launched (subprocess.Popen, pexpect.spawn or
+                      multiprocessing.Process), used to reap it. None for a process which is not a child of this one.
+        group (bool): If set to True, the signals are sent to the whole process group of the process.
+        privileged (bool): If set to True, the signals are sent with sudo when the process doesn't belong to the user.
+    """
+
+    def __init__(self, name: str, pid: int, handle: Any = None, group: bool = False, privileged: bool = False):
+        self.name       = name
+        self.pid        = pid
+        self.handle     = handle
+        self.privileged = privileged
+        self.owner      = os.getpid()  # Forked workers inherit the registry of their parent
+
+        self.pgid = None
+        if group is True:
+            try:
+                self.pgid = os.getpgid(pid)
+            except ProcessLookupError:
+                pass
+    # End def __init__
+
+    def is_alive(self) -> bool:
+        """Returns True if the process is running. A child process which has exited is reaped."""
+        if isinstance(self.handle, subprocess.Popen):
+            return self.handle.poll() is None
+        if isinstance(self.handle, pexpect.spawn):
+            return self.handle.isalive()
+        if isinstance(self.handle, multiprocessing.Process):
+            return self.handle.is_alive()
+        return readiness.is_process_alive(self.pid)
+    # End def is_alive
+
+    def signal(self, sig: int):
+        """Send a signal to the process, or to its process group."""
+        if self.privileged is True and os.geteuid() != 0:
+            # The process, or some processes of its group, may belong to root
+            self.__sudo_kill(sig)
+        try:
+            if self.pgid is not None:
+                os.killpg(self.pgid, sig)
+            else:
+                os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            if self.privileged is False:
+                _log.error("Not allowed to send {} to \"{}\" (pid: {})".format(signal.Signals(sig).name,
+                                                                               self.name, self.pid))
+    # End def signal
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for the process to exit.
+
+        Returns:
+            True if the process has exited before the timeout, False otherwise.
+        """
+        if isinstance(self.handle, subprocess.Popen):
+            try:
+                self.handle.wait(timeout)
+            except subprocess.TimeoutExpired:
+                return False
+            return True
+        if isinstance(self.handle, multiprocessing.Process):
+            self.handle.join(timeout)
+            return not self.handle.is_alive()
+        return readiness.wait_until(predicate=lambda: not self.is_alive(), timeout=timeout)
+    # End def wait
+
+    def __sudo_kill(self, sig: int):
+        # Imported here as the driver of the helper registers its own process to the supervisor
+        from fuzzsdn.app.drivers.privileged_driver import PrivilegedDriver
+
+        target = '-{}'.format(self.pgid) if self.pgid is not None else str(self.pid)
+        if self.name != 'privileged_helper' and PrivilegedDriver.run({'op': 'kill',
+                                                                      'signal': signal.Signals(sig).name[3:],
+                                                                      'target': int(target)}) is not None:
+            return
+
+        args = ['kill', '-s', signal.Signals(sig).name[3:], '--', target]
+
+        password = setup.config().general.get('sudo_pwd', None)
+        args = ['sudo', '-S', '-p', ''] + args if password else ['sudo', '-n'] + args
+        try:
+            subprocess.run(args,
+                           input="{}\n".format(password).encode() if password else None,
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL,
+                           timeout=5)
+        except subprocess.TimeoutExpired:
+            _log.error("Couldn't send {} to \"{}\" with sudo. Is sudo configured?".format(signal.Signals(sig).name,
+                                                                                         self.name))
+    # End def __sudo_kill
+
+    def __repr__(self):
+        return "Process({}, pid={}, pgid={})".format(self.name, self.pid, self.pgid)
+# End class Process
+
+
+# ===== ( Functions ) ==================================================================================================
+
+def track(name: str, process: Any = None, pid: Optional[int] = None, group: bool = False,
+          privileged: bool = False) -> Process:
+    """Register a process launched for a component. A process already registered under the same name is forgotten.
+
+    Args:
+        name (str): The name of the component run by the process.
+        process (Any): The subprocess.Popen, pexpect.spawn or multiprocessing.Process object of the process.
+        pid (int): The pid of the process, when it is not a child of this process (e.g. a service).
+        group (bool): If set to True, the whole process group of the process is stopped with it.
+        privileged (bool): If set to True, the process may belong to root and is signaled with sudo.
+
+    Returns:
+        The registered process.
+    """
+    if pid is None:
+        pid = process.pid
+    _processes[name] = Process(name, pid, handle=process, group=group, privileged=privileged)
+    _log.trace("Tracking {}".format(_processes[name]))
+    return _processes[name]
+# End def track
+
+
+def untrack(name: str):
+    """Forget the process of a component, without stopping it."""
+    _processes.pop(name, None)
+# End def untrack
+
+
+def get(name: str) -> Optional[Process]:
+    """Returns the process of a component, or None if no process is registered for it."""
+    return _processes.get(name)
+# End def get
+
+
+def is_alive(name: str) -> bool:
+    """Returns True if the process of a component is running."""
+    process = _processes.get(name)
+    return process is not None and process.is_alive()
+# End def is_alive
+
+
+def stop(name: str, timeout: float = 5.0, kill_timeout: float = 2.0, grace: float = 0.0) -> bool:
+    """Stop the process of a component and forget it.
+
+    The process is sent SIGTERM, then SIGKILL if it hasn't exited after `timeout` seconds.
+
+    Args:
+        name (str): The name of the component.
+        timeout (float): The time in seconds given to the process to exit after SIGTERM.
+        kill_timeout (float): The time in seconds given to the process to exit after SIGKILL.
+        grace (float): The time in seconds given to the process to exit by itself before SIGTERM is sent (e.g. when
+                       it has been asked to exit).
+
+    Returns:
+        True if the process has exited (or if no process is registered for the component), False otherwise.
+    """
+    process = _processes.get(name)
+    if process is None:
+        return True
+
+    stopped = True
+    exited = grace > 0 and process.wait(grace)
+    if not exited and process.is_alive():
+        _log.debug("Terminating {}".format(process))
+        process.signal(signal.SIGTERM)
+        if process.wait(timeout) is False:
+            _log.warning("\"{}\" did not exit {}s after SIGTERM, killing it".format(name, timeout))
+            process.signal(signal.SIGKILL)
+            stopped = process.wait(kill_timeout)
+            if stopped is False:
+                _log.error("\"{}\" (pid: {}) did not exit after SIGKILL".format(name, process.pid))
+
+    if stopped is True:
+        _processes.pop(name, None)
+    return stopped
+# End def stop
+
+
+def stop_all(timeout: float = 5.0) -> bool:
+    """Stop all the processes registered by the current process, the most recent first.
+
+    Returns:
+        True if all the processes have exited, False otherwise.
+    """
+    stopped = True
+    for name in reversed(list(_processes.keys())):
+        if _processes[name].owner == os.getpid():
+            stopped &= stop(name, timeout=timeout)
+    return stopped
+# End def stop_all
@@ -1,20 +1,27 @@
 import base64
+import bisect
 import json
 import logging
 import os
 from copy import copy
-from typing import Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
-from pypika import Column, JoinType, Query, Tables
+from pypika import Column, JoinType, Parameter, Query, Tables, functions as fn
 
 from fuzzsdn.common import app_path
 from fuzzsdn.common.utils.database import Database as SqlDb
 from fuzzsdn.app import setup
 from fuzzsdn.app.analytics.log import LogParser, OnosLogParser, RyuLogParser
-from fuzzsdn.app.experiment import RuleSet
+from fuzzsdn.app.experiment import RuleSet, labeling
 
 DB_NAME = "fuzzsdn"
+TIMEOUT = "TIMEOUT"  # Error type of the tests which exceeded their deadline
+
+# Columns of the dataset, besides the fields of the packets
+SAMPLE_COLUMNS  = ('sample_id', 'seq_id', 'iter_id', 'rule_id')
+RULE_COLUMNS    = ('expression', 'classification', 'coverage', 'misclassified')
+LOG_COLUMNS     = ('has_error', 'error_type', 'error_reason', 'error_effect')
 
 
 class Analyzer:
@@ -32,9 +39,17 @@ class Analyzer:
         # Analytics
         self.__controller   : Optional[str] = None
         self.__log_parser   : Optional[LogParser] = None
+        self.__fut          : Optional[str] = None  # Failure under test, which decides when a test can be cut short
+
+        # In-memory copy of the samples and logs tables, by column, to which the samples are appended as they are
+        # recorded, and of the rules table, by rule id
+        self.__sample_columns   : List[str] = list(SAMPLE_COLUMNS)
+        self.__dataset          : Dict[str, list] = {c: list() for c in self.__sample_columns + list(LOG_COLUMNS)}
+        self.__rules            : Dict[int, tuple] = dict()
 
         # Counters
         self.__sample_cnt   = -1  # Counts the samples. Starts at -1 so it's 0 at the first iteration
+        self.__seq_cnt      = -1  # Counts the sequences of samples. Starts at -1 so it's 0 at the first sequence
         self.__it_cnt       = -1  # Counts the framework iteration. Starts at -1 so it's 0 at the first iteration
 
 
@@ -48,10 +63,17 @@ class Analyzer:
         try:
             if not SqlDb.is_init():
                 self.__log.info("Initializing the SQL database...")
-                SqlDb.init(
-                    hostname=setup.config().mysql.host,
-                    username=setup.config().mysql.user,
-                    password=setup.config().mysql.password)
+                if setup.config().general.get('database', 'mysql') == 'sqlite':
+                    # The database is stored with the files of the experiment
+                    SqlDb.init(backend='sqlite', directory=app_path.exp_dir())
+                else:
+                    SqlDb.init(
+                        hostname=setup.config().mysql.host,
+                        username=setup.config().mysql.user,
+                        password=setup.config().mysql.password)
+                SqlDb.set_batching(
+                    batch_size=setup.config().general.get('database_batch_size', 50),
+                    flush_interval=setup.config().general.get('database_flush_interval', 30))
                 self.__log.debug("The SQL database has been initialized successfully")
         finally:
             if SqlDb.is_init() is False:
@@ -87,6 +109,23 @@ class Analyzer:
                 '\"{}\"'.format(c) for c in allowed_controllers)))
     # End def controller.setter
 
+    @property
+    def failure_under_test(self) -> Optional[str]:
+        return self.__fut
+    # End def failure_under_test
+
+    @failure_under_test.setter
+    def failure_under_test(self, fut: Optional[str]):
+        """Sets the failure under test, the tests are only cut short once their label for it is known."""
+        self.__fut = str(fut) if fut is not None else None
+    # End def failure_under_test.setter
+
+    @property
+    def sequence(self) -> int:
+        """The seq_id of the current sequence."""
+        return max(self.__seq_cnt, 0)
+    # End def sequence
+
     @property
     def save_logs(self):
         return self.__save_logs
@@ -101,12 +140,13 @@ class Analyzer:
 
     # ===== ( Getters ) ================================================================================================
 
-    def get_dataset(self, iteration=None, failure_under_test=None, debug=False) -> pd.DataFrame:
+    def get_dataset(self, iteration=None, failure_under_test=None, debug=False, from_iteration=None) -> pd.DataFrame:
         """Outputs the analyzed dataset as a Pandas' dataframe.
 
         Args:
             iteration (int): Output the dataset of a given iteration.
                        If set to None, the whole dataset is output.
+            from_iteration (int): Only output the samples of this iteration and of the following ones.
             failure_under_test (str): Parse the dataset according to the error class.
                          If set to None, no error class is inferred.
             debug (bool): whether to output debug information
@@ -114,52 +154,24 @@ class Analyzer:
         Returns:
             a pd.DataFrame
         """
-        # Get the latest available dataset
-        # query: FROM `samples` SELECT samples.*, log.* JOIN `logs` ON samples.id == log.log_id
-        samples, rules, logs = Tables('samples', 'rules', 'logs')
-        stmt = Query \
-            .from_(samples) \
-            .join(logs, how=JoinType.left) \
-            .on(samples.sample_id == logs.log_id) \
+        # The dataset is derived from its in-memory copy rather than queried from the database, which would scan the
+        # samples of all the iterations: the columns are the ones of "samples LEFT JOIN logs (LEFT JOIN rules)"
+        # The samples are recorded in the order of the iterations
+        start = 0 if from_iteration is None else bisect.bisect_left(self.__dataset['iter_id'], from_iteration)
 
+        columns = {c: self.__dataset[c][start:] for c in self.__sample_columns}
         if debug is True:
-            stmt = stmt.join(rules, how=JoinType.left).on(samples.rule_id == rules.rule_id)
-            stmt = stmt.select(samples.star,
-                               rules.expression,
-                               rules.classification,
-                               rules.coverage,
-                               rules.misclassified,
-                               logs.has_error,
-                               logs.error_type,
-                               logs.error_reason,
-                               logs.error_effect)
-        else:
-            stmt = stmt.select(samples.star,
-                               logs.has_error,
-                               logs.error_type,
-                               logs.error_reason,
-                               logs.error_effect)
-
+            no_rule = (None,) * len(RULE_COLUMNS)
+            rules = [self.__rules.get(rule_id, no_rule) for rule_id in columns['rule_id']]
+            for k, column in enumerate(RULE_COLUMNS):
+                columns[column] = [rule[k] for rule in rules]
+        for column in LOG_COLUMNS:
+            columns[column] = self.__dataset[column][start:]
+
+        # Transform the data to a pandas dataframe and drop the unused columns
+        df = pd.DataFrame(columns)
         if iteration is not None:
-            stmt = stmt.where(samples.iter_id <= iteration)
-
-        try:
-            if not SqlDb.is_connected():
-                SqlDb.connect(DB_NAME)
-
-            SqlDb.execute(stmt.get_sql(quote_char=None))
-            SqlDb.commit()
-
-            # Catch the field names and data
-            field_names = [c[0] for c in SqlDb.get_cursor().description]
-            data = SqlDb.fetchall()
-        except Exception as e:
-            raise e
-        finally:
-            SqlDb.disconnect()
-
-        # Transform the SQL data to a pandas dataframe and drop the unused columns
-        df = pd.DataFrame(data, columns=field_names)
+            df = df[df['iter_id'] <= iteration].reset_index(drop=True)
         if not debug:
             df.drop(
                 [
@@ -174,65 +186,18 @@ class Analyzer:
                 errors='ignore'
             )
 
+        # The outcome of the tests which timed out is unknown, they are left out of the dataset
+        if not debug:
+            df = df[df['error_type'] != TIMEOUT].reset_index(drop=True)
+
         # Transform the has_error column into boolean values
-        df['has_error'] = df['has_error'].apply(lambda x: x == 1)
+        df['has_error'] = df['has_error'] == 1
 
         if failure_under_test is not None:
-            # OFPBAC_BAD_OUT_PORT
-            if failure_under_test == 'OFPBAC_BAD_OUT_PORT':
-                if self.__controller == 'ryu':
-                    df['class'] = df['error_reason'].apply(
-                        lambda row: "FAIL" if row == "OFPBAC_BAD_OUT_PORT" else "PASS")
-
-                elif self.__controller == 'onos':
-                    df['class'] = df.error_reason.apply(
-                        lambda row: "FAIL" if 'BAD_OUT_PORT' in row else "PASS"
-                    )
-
-            # Unknown Reason / Known Reason
-            elif failure_under_test in ('unknown_reason', 'known_reason'):
-                reverse = failure_under_test == 'known_reason'
-                if self.__controller == 'onos':
-                    if reverse is False:
-                        df['class'] = df.apply(
-                            lambda row: 'FAIL' if row.has_error is True and row.error_reason is None else 'PASS',
-                            axis='columns'
-                        )
-                    else:
-                        df['class'] = df.apply(
-                            lambda row: 'PASS' if row.has_error is True and row.error_reason is None else 'FAIL',
-                            axis='columns'
-                        )
-
-                elif self.__controller == 'ryu':
-                    if reverse is False:
-                        df['class'] = df.apply(
-                            lambda row: 'FAIL' if row.error_reason is None else 'PASS',
-                            axis='columns'
-                        )
-                    else:
-                        df['class'] = df.apply(
-                            lambda row: 'PASS' if row.error_reason is None else 'FAIL',
-                            axis='columns'
-                        )
-
-            # Parsing / Non parsing error
-            elif failure_under_test in ('parsing_error', 'non_parsing_error'):
-                if failure_under_test == 'non_parsing_error':
-                    df['class'] = df['error_reason'].apply(
-                        lambda row: "PASS" if row == "PARSING_ERROR" else "FAIL")
-                else:
-                    df['class'] = df['error_reason'].apply(
-                        lambda row: "FAIL" if row == "PARSING_ERROR" else "PASS")
-
-            elif failure_under_test == 'switch_disconnection':
-                df['class'] = df.apply(
-                    lambda row: 'FAIL' if row.has_error is True and row.error_effect == 'SWITCH_DISCONNECTED' else 'PASS',
-                    axis='columns')
-
-            # Unknown Target Error
-            else:
-                raise ValueError("Unknown target error '{}'".format(failure_under_test))
+            # Label the samples with the labeler of the failure under test
+            labels = labeling.label(df, failure_under_test, self.__controller)
+            if labels is not None:
+                df['class'] = labels
 
             # Drop the error-related columns
             if not debug:
@@ -264,29 +229,22 @@ class Analyzer:
             self.__log.warning("Tried to add another ruleset for the current iteration. The instruction was ignored.")
             return
 
-        try:
-            if not SqlDb.is_connected():
-                SqlDb.connect(DB_NAME)
-
-            for rule in ruleset:
-                stmt = Query.into("rules").insert(
-                        rule.id,            # rule_id
-                        self.__it_cnt,      # iter_id
-                        str(rule.expr),     # expr
-                        rule.class_,        # class
-                        rule.coverage,      # coverage
-                        rule.misclassified  # misclassified)
-                    )
-                SqlDb.execute(stmt.get_sql(quote_char=None))
-
-            # Commit all the statements at the same time
+        for rule in ruleset:
+            self.__rules[rule.id] = (str(rule.expr), rule.class_, rule.coverage, rule.misclassified)
+
+        rows = [(rule.id,               # rule_id
+                 self.__it_cnt,         # iter_id
+                 str(rule.expr),        # expr
+                 rule.class_,           # class
+                 rule.coverage,         # coverage
+                 rule.misclassified)    # misclassified
+                for rule in ruleset]
+
+        # Insert all the rules at the same time
+        if len(rows) > 0:
+            SqlDb.ensure_connected(DB_NAME)
+            SqlDb.executemany(self.__insert_query("rules", 6), rows)
             SqlDb.commit()
-
-        except Exception as e:
-            raise e
-
-        finally:
-            SqlDb.disconnect()
     # End def set_ruleset_for_iteration
 
     # ===== ( Analysis ) ===============================================================================================
@@ -298,23 +256,112 @@ class Analyzer:
         self.fuzz_time = list()
     # End def new_iteration
 
+    def new_sequence(self) -> int:
+        """Notifies the analyzer that the next sample starts a new sequence, i.e. it is the first sample tested in a
+        new controller session.
+
+        Returns:
+            The seq_id of the new sequence.
+        """
+        self.__seq_cnt += 1
+        if self.__log_parser is not None:
+            self.__log_parser.clear_marks()
+        return self.__seq_cnt
+    # End def new_sequence
+
+    def mark_logs(self):
+        """Notifies the analyzer that the next sample continues the current sequence. The logs written during the
+        previous samples of the sequence are ignored by the analysis of the next sample."""
+        if self.__log_parser is not None:
+            self.__log_parser.mark()
+    # End def mark_logs
+
+    def follow_logs(self) -> bool:
+        """Read the logs written since the last call and tell whether the outcome of the current test is already known.
+
+        Returns:
+            True if the logs followed so far decide the label of the test for the failure under test, whatever is
+            logged afterwards.
+        """
+        if self.__log_parser is None:
+            return False
+        return labeling.decides(self.__log_parser.follow(), self.__fut)
+    # End def follow_logs
+
     def start_analysis(self):
         self.__sample_cnt += 1
     # End def start_analysis
 
-    def finish_analysis(self):
+    def finish_analysis(self) -> dict:
         """
         Finish the analysis of the current transaction
 
-        :return:
+        :return: the sample that has been recorded
+        """
+        sample = self.collect_sample()
+        self.record_sample(sample)
+        return sample
+    # End def finish_analysis
+
+    def collect_sample(self) -> dict:
+        """Collect the results of the current test, without recording them.
+
+        Returns:
+            A dictionary with the content of the fuzzer report and the results of the log analysis, to be recorded
+            with `record_sample`.
         """
         # TODO: take into account, the fact that there could be many different packets fuzzed
         # Read the fuzzer report
         pkt_struct, pkt_values, pkt_actions, fuzz_time = self.__read_fuzz_report()
 
-        self.fuzz_time.append(float(fuzz_time / 1000.0))  # Add fuzzing time in seconds
+        return {
+            'pkt_struct'    : pkt_struct,
+            'pkt_values'    : pkt_values,
+            'pkt_actions'   : pkt_actions,
+            'fuzz_time'     : fuzz_time,
+            'log'           : self.__log_parser.parse_log()
+        }
+    # End def collect_sample
 
-        log_parse_results = self.__log_parser.parse_log()
+    def timeout_sample(self, phase: str) -> Optional[dict]:
+        """Collect the results of a test which exceeded its deadline. The logs are not analyzed, the outcome of the test
+        is recorded as a timeout, which is left out of the dataset.
+
+        Args:
+            phase (str): The phase of the test which exceeded its deadline.
+
+        Returns:
+            A dictionary to be recorded with `record_sample`, or None if the fuzzer did not report any packet.
+        """
+        try:
+            pkt_struct, pkt_values, pkt_actions, fuzz_time = self.__read_fuzz_report()
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return {
+            'pkt_struct'    : pkt_struct,
+            'pkt_values'    : pkt_values,
+            'pkt_actions'   : pkt_actions,
+            'fuzz_time'     : fuzz_time,
+            'log'           : (False, TIMEOUT, phase.upper(), None, '')
+        }
+    # End def timeout_sample
+
+    def record_sample(self, sample: dict, seq_id: Optional[int] = None):
+        """Record a sample collected with `collect_sample` in the database, under the current sample id.
+
+        Args:
+            sample (dict): The sample to record.
+            seq_id (int): The sequence of the sample, as returned by `new_sequence`. If set to None, the sample belongs
+                          to the current sequence.
+        """
+        pkt_struct          = sample['pkt_struct']
+        pkt_values          = sample['pkt_values']
+        pkt_actions         = sample['pkt_actions']
+        log_parse_results   = sample['log']
+
+        self.last_list_of_fields = pkt_struct
+        self.fuzz_time.append(float(sample['fuzz_time'] / 1000.0))  # Add fuzzing time in seconds
 
         # Save the log_trace if required:
         if self.save_logs is True:
@@ -331,50 +378,152 @@ class Analyzer:
         if self.__rules_table_created is False:
             self.__create_rules_table()
 
-        # Insert the table result into the database
-        try:
-            if not SqlDb.is_connected():
-                SqlDb.connect(DB_NAME)
-
-            # Determine if a rule should be added
-            rule_id = None
-            for pkt_action in pkt_actions:
-                if pkt_action['action']['intent'] == 'mutate_packet_rule':
-                    rule_id = int(pkt_action['action']['ruleID'])
-                    break  # break out of the loop
-
-            # First add the samples
-            # NOTE: For now, the seq_id is equal to the sample_id but it is planned in the future that a seq_id could be
-            #       given to several samples part of a same sequence
-            stmt_1 = Query.into("samples").insert(
-                self.__sample_cnt,                                      # sample_id
-                self.__sample_cnt,                                      # seq_id
-                self.__it_cnt,                                          # iter_id
-                rule_id,                                                # rule_id
-                *(pkt_values.get(k, None) for k in pkt_values.keys())   # fields_data
-            )
+        # Determine if a rule should be added
+        rule_id = None
+        for pkt_action in pkt_actions:
+            if pkt_action['action']['intent'] == 'mutate_packet_rule':
+                rule_id = int(pkt_action['action']['ruleID'])
+                break  # break out of the loop
+
+        # First add the samples
+        # NOTE: Samples tested in the same controller session share the same seq_id
+        sample_row = (self.__sample_cnt,                                        # sample_id
+                      max(self.__seq_cnt if seq_id is None else seq_id, 0),     # seq_id
+                      self.__it_cnt,                                            # iter_id
+                      rule_id,                                                  # rule_id
+                      *(pkt_values.get(k, None) for k in pkt_values.keys()))    # fields_data
+
+        # Then add the logs
+        # NOTE: For now, the log_id has the same value as the sample_count, but this should be different.
+        log_row = (self.__sample_cnt,                           # log_id
+                   self.__it_cnt,                               # iter_id
+                   1 if log_parse_results[0] is True else 0,    # has_error
+                   log_parse_results[1],                        # error_type
+                   log_parse_results[2],                        # error_reason
+                   log_parse_results[3])                        # error_effect
+
+        if len(sample_row) != len(self.__sample_columns):
+            raise ValueError("The sample has {} values while the samples table has {} columns".format(
+                len(sample_row), len(self.__sample_columns)))
+
+        # Buffer the two rows, they are written with the next batch
+        SqlDb.ensure_connected(DB_NAME)
+        SqlDb.insert(self.__insert_query("samples", len(sample_row)), sample_row)
+        SqlDb.insert(self.__insert_query("logs", len(log_row)), log_row)
+
+        # Append the sample to the in-memory dataset
+        for column, value in zip(self.__sample_columns, sample_row):
+            self.__dataset[column].append(value)
+        for column, value in zip(LOG_COLUMNS, log_row[2:]):
+            self.__dataset[column].append(value)
+    # End def record_sample
+
+    # ===== ( Checkpoint ) =============================================================================================
+
+    def state(self) -> dict:
+        """Returns the counters of the analyzer, to be saved in a checkpoint."""
+        return {
+            'sample_cnt'            : self.__sample_cnt,
+            'seq_cnt'               : self.__seq_cnt,
+            'it_cnt'                : self.__it_cnt,
+            'sample_table_created'  : self.__sample_table_created,
+            'log_table_created'     : self.__log_table_created,
+            'rules_table_created'   : self.__rules_table_created,
+            'current_it_has_ruleset': self.__current_it_has_ruleset,
+            'fuzz_time'             : list(self.fuzz_time),
+            'last_list_of_fields'   : self.last_list_of_fields,
+        }
+    # End def state
+
+    def restore(self, state: dict):
+        """Restore the counters of the analyzer from a checkpoint.
+
+        The tables are kept, and the rows recorded after the checkpoint are removed, so that the samples which were not
+        saved in the checkpoint can be recorded again under the same ids.
 
-            # Then add the logs
-            # NOTE: For now, the log_id has the same value as the sample_count, but this should be different.
-            stmt_2 = Query.into("logs").insert(self.__sample_cnt,                           # log_id
-                                               self.__it_cnt,                               # iter_id
-                                               1 if log_parse_results[0] is True else 0,    # has_error
-                                               log_parse_results[1],                        # error_type
-                                               log_parse_results[2],                        # error_reason
-                                               log_parse_results[3])                        # error_effect
-
-            # Execute the two queries
-            SqlDb.execute(stmt_1.get_sql(quote_char=None))
-            SqlDb.execute(stmt_2.get_sql(quote_char=None))
-            SqlDb.commit()
-        except Exception as e:
-            raise e
-        finally:
-            SqlDb.disconnect()
-    # End def finish_analysis
+        Args:
+            state (dict): The counters, as returned by `state`.
+
+        Raises:
+            ValueError: if the tables don't hold the samples recorded up to the checkpoint, e.g. when they have been
+                        overwritten by another experiment since.
+        """
+        self.__sample_cnt               = state['sample_cnt']
+        self.__seq_cnt                  = state['seq_cnt']
+        self.__it_cnt                   = state['it_cnt']
+        self.__sample_table_created     = state['sample_table_created']
+        self.__log_table_created        = state['log_table_created']
+        self.__rules_table_created      = state['rules_table_created']
+        self.__current_it_has_ruleset   = state['current_it_has_ruleset']
+        self.fuzz_time                  = list(state['fuzz_time'])
+        self.last_list_of_fields        = state['last_list_of_fields']
+
+        samples, logs, rules = Tables('samples', 'logs', 'rules')
+        stmts = list()
+        if self.__sample_table_created is True:
+            stmts.append(Query.from_(samples).delete().where((samples.sample_id > self.__sample_cnt)
+                                                             | (samples.iter_id > self.__it_cnt)))
+        if self.__log_table_created is True:
+            stmts.append(Query.from_(logs).delete().where(logs.log_id > self.__sample_cnt))
+        if self.__rules_table_created is True:
+            stmts.append(Query.from_(rules).delete().where(rules.iter_id > self.__it_cnt))
+
+        SqlDb.ensure_connected(DB_NAME)
+        for stmt in stmts:
+            SqlDb.execute(stmt.get_sql(quote_char=None))
+        SqlDb.commit()
+
+        # The samples are numbered from 0, the tables must hold all of them up to the checkpoint
+        expected = self.__sample_cnt + 1
+        for table, created in ((samples, self.__sample_table_created), (logs, self.__log_table_created)):
+            if created is True and expected > 0:
+                SqlDb.execute(Query.from_(table).select(fn.Count('*')).get_sql(quote_char=None))
+                count = SqlDb.fetchone()[0]
+                if count != expected:
+                    raise ValueError("The table \"{}\" holds {} rows while the checkpoint has {} samples, the database "
+                                     "doesn't hold the samples of this experiment".format(table.get_table_name(),
+                                                                                          count, expected))
+
+        self.__load_dataset()
+        self.__log.info("Analyzer restored at sample {} of iteration {}".format(self.__sample_cnt, self.__it_cnt))
+    # End def restore
 
     # ===== ( Private Methods ) ========================================================================================
 
+    def __load_dataset(self):
+        """Load the in-memory dataset from the database, once, when the analyzer is restored."""
+        samples, logs, rules = Tables('samples', 'logs', 'rules')
+        SqlDb.ensure_connected(DB_NAME)
+
+        if self.__sample_table_created is True:
+            stmt = Query \
+                .from_(samples) \
+                .join(logs, how=JoinType.left) \
+                .on(samples.sample_id == logs.log_id) \
+                .select(samples.star, logs.has_error, logs.error_type, logs.error_reason, logs.error_effect) \
+                .orderby(samples.sample_id)
+            SqlDb.execute(stmt.get_sql(quote_char=None))
+            field_names = [c[0] for c in SqlDb.get_cursor().description]
+            data = SqlDb.fetchall()
+
+            self.__sample_columns = field_names[:-len(LOG_COLUMNS)]
+            self.__dataset = {c: [row[i] for row in data] for i, c in enumerate(field_names)}
+
+        if self.__rules_table_created is True:
+            stmt = Query \
+                .from_(rules) \
+                .select(rules.rule_id, rules.expression, rules.classification, rules.coverage, rules.misclassified)
+            SqlDb.execute(stmt.get_sql(quote_char=None))
+            self.__rules = {row[0]: tuple(row[1:]) for row in SqlDb.fetchall()}
+    # End def __load_dataset
+
+    @staticmethod
+    def __insert_query(table: str, count: int) -> str:
+        """Returns the parameterized query inserting a row of `count` values in a table."""
+        placeholder = SqlDb.placeholder()
+        return Query.into(table).insert(*(Parameter(placeholder) for _ in range(count))).get_sql(quote_char=None)
+    # End def __insert_query
+
     # TODO: Parse actions and the mutations
     def __read_fuzz_report(self):
 
@@ -447,19 +596,18 @@ class Analyzer:
             .unique("sample_id", "iter_id") \
             .primary_key("sample_id")
 
-        try:
-            if not SqlDb.is_connected():
-                SqlDb.connect(DB_NAME)
+        SqlDb.ensure_connected(DB_NAME)
 
-            # Clear
-            SqlDb.execute('DROP TABLE IF EXISTS `samples`')  # Drop the table if it exists
-            SqlDb.execute(stmt.get_sql(quote_char=None))  # Create the table
-            SqlDb.commit()
-            self.__log.debug("SQL database has been cleaned.")
-            self.__sample_table_created = True
+        # Clear
+        SqlDb.execute('DROP TABLE IF EXISTS `samples`')  # Drop the table if it exists
+        SqlDb.execute(stmt.get_sql(quote_char=None))  # Create the table
+        SqlDb.commit()
+        self.__log.debug("SQL database has been cleaned.")
+        self.__sample_table_created = True
 
-        finally:
-            SqlDb.disconnect()
+        # Start the in-memory dataset with the columns of the new table
+        self.__sample_columns = list(SAMPLE_COLUMNS) + [field for field, _ in pkt_fields_length]
+        self.__dataset = {c: list() for c in self.__sample_columns + list(LOG_COLUMNS)}
     # End def __create_sample_table_from_packet_strut
 
     def __create_logs_table(self):
@@ -478,22 +626,17 @@ class Analyzer:
             .unique("log_id") \
             .primary_key("log_id")
 
-        try:
-            if not SqlDb.is_connected():
-                SqlDb.connect(DB_NAME)
+        SqlDb.ensure_connected(DB_NAME)
 
-            self.__log.info("Clearing the SQL database...")
-
-            # Clear
-            SqlDb.execute('DROP TABLE IF EXISTS `logs`')  # Drop the table if it exists
-            SqlDb.execute(stmt.get_sql(quote_char=None))  # Create the table
-            SqlDb.commit()
+        self.__log.info("Clearing the SQL database...")
 
-            self.__log.debug("SQL database has been cleaned.")
-            self.__log_table_created = True
+        # Clear
+        SqlDb.execute('DROP TABLE IF EXISTS `logs`')  # Drop the table if it exists
+        SqlDb.execute(stmt.get_sql(quote_char=None))  # Create the table
+        SqlDb.commit()
 
-        finally:
-            SqlDb.disconnect()
+        self.__log.debug("SQL database has been cleaned.")
+        self.__log_table_created = True
     # End def __create_log_table
 
     def __create_rules_table(self):
@@ -512,22 +655,18 @@ class Analyzer:
             .unique("rule_id") \
             .primary_key("rule_id")
 
-        try:
-            if not SqlDb.is_connected():
-                SqlDb.connect(DB_NAME)
+        SqlDb.ensure_connected(DB_NAME)
 
-            self.__log.info("Clearing the SQL database...")
+        self.__log.info("Clearing the SQL database...")
 
-            # Clear
-            SqlDb.execute('DROP TABLE IF EXISTS `rules`')  # Drop the table if it exists
-            SqlDb.execute(stmt.get_sql(quote_char=None))  # Create the table
-            SqlDb.commit()
+        # Clear
+        SqlDb.execute('DROP TABLE IF EXISTS `rules`')  # Drop the table if it exists
+        SqlDb.execute(stmt.get_sql(quote_char=None))  # Create the table
+        SqlDb.commit()
 
-            self.__log.debug("SQL database has been cleaned.")
-            self.__rules_table_created = True
-
-        finally:
-            SqlDb.disconnect()
+        self.__log.debug("SQL database has been cleaned.")
+        self.__rules_table_created = True
+        self.__rules = dict()
     # End def __create_rules_table
 
 # End class Analyzer
@@ -4,23 +4,30 @@
 import importlib.util
 import json
 import logging
+import multiprocessing
 import os
+import queue
 import random
 import re
+import signal
+import sys
 from enum import Enum, auto
 from importlib import resources
 from timeit import default_timer as timer
-from typing import Optional, Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
 from iteround import saferound
 
 import fuzzsdn.resources.criteria
-from fuzzsdn.app import setup
+from fuzzsdn.app import setup, verdict, watchdog
+from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, OnosDriver, RyuDriver, readiness
 from fuzzsdn.app.experiment import Analyzer, RuleSet, strategy
+from fuzzsdn.app.sandbox import Sandbox
 from fuzzsdn.common.utils.terminal import progress_bar
 
 # TODO: Set MAX_RETRY as configuration parameter
 MAX_RETRY = 3
+RESULTS_POLL_INTERVAL = 5.0  # Interval in seconds at which the sandbox workers are checked while waiting for results
 
 # noinspection PyArgumentList
 class Method(Enum):
@@ -42,6 +49,12 @@ class Experimenter:
 
         self.__log = logging.getLogger(__name__)
         self.samples_per_iteration = 150
+        self.workers = 1  # Number of sandboxes running tests at the same time
+        self.sequence_length = 1  # Number of tests run in the same controller session
+        self.pipeline = False  # Prepare the next test in a second sandbox while the current test is analyzed
+        self.deadline : Optional[float] = None  # Time (as given by timer()) by which the tests must be over
+        self.deadline_reached = False  # Whether the last run stopped before its last test to meet the deadline
+        self.on_progress : Optional[Callable[[], None]] = None  # Called after each completed test, e.g. to checkpoint
 
         self.__scenario         = None
         self.__scenario_name    = None
@@ -50,6 +63,7 @@ class Experimenter:
             'has_init'      : bool(),
             'has_before'    : bool(),
             'has_after'     : bool(),
+            'has_between'   : bool(),
             'has_term'      : bool()
         }
         self.__criterion        = dict()
@@ -63,6 +77,24 @@ class Experimenter:
 
         # statistics
         self.run_time           = list()
+        self.wait_time          = dict()  # Time spent waiting for each component to be ready
+        self.completion_time    = list()  # Time spent waiting for the fuzzer to complete each test
+        self.timeouts           = dict()  # Number of timeouts of each phase of the tests
+
+        # Length of the current sequence of tests
+        self.__seq_len          = 0
+
+        # Total duration and number of the tests run so far, to estimate the duration of the next test
+        self.__test_time        = 0.0
+        self.__test_count       = 0
+
+        # Lock held while running a test, when the tests of several sandboxes must not run at the same time
+        self.__test_lock        = None
+
+        # Instructions of the current run and indexes of the instructions already tested
+        self.__instructions     : Optional[list] = None
+        self.__done             = set()
+        self.__restored         = False
     # End def __init__
 
     # ===== ( Properties ) =============================================================================================
@@ -119,6 +151,7 @@ class Experimenter:
             self.__scenario_ctx['has_term']   = hasattr(self.__scenario, "terminate") and hasattr(self.__scenario.terminate, '__call__')
             self.__scenario_ctx['has_before'] = hasattr(self.__scenario, "before_each") and hasattr(self.__scenario.before_each, '__call__')
             self.__scenario_ctx['has_after']  = hasattr(self.__scenario, "after_each") and hasattr(self.__scenario.after_each, '__call__')
+            self.__scenario_ctx['has_between'] = hasattr(self.__scenario, "between_each") and hasattr(self.__scenario.between_each, '__call__')
 
             # Check if the scenario as a test function
             if not hasattr(self.__scenario, "test") or not hasattr(self.__scenario.test, '__call__'):
@@ -221,107 +254,496 @@ class Experimenter:
             length=100
         )
 
-        # Build the fuzzer instruction
-        fuzz_instr = self.__build_fuzzer_instruction(count=self.samples_per_iteration)
+        # Build the fuzzer instruction, unless the run resumes from a checkpoint
+        if self.__restored is True:
+            self.__restored = False
+            self.__log.info("Resuming the tests after {} tests out of {}".format(len(self.__done),
+                                                                             len(self.__instructions)))
+        else:
+            self.__instructions = self.__build_fuzzer_instruction(count=self.samples_per_iteration)
+            self.__done = set()
+
+            # Reset the timing counters
+            self.run_time = list()
+            self.wait_time = dict()
+            self.completion_time = list()
+            self.timeouts = dict()
+        fuzz_instr = self.__instructions
+        readiness.pop_waits()
+        watchdog.pop_timeouts()
+        if self.workers > 1 and self.__scenario_name.startswith('onos') is True:
+            self.__log.warning("ONOS runs as a single service, the tests of scenario \"{}\" can't run in several "
+                               "sandboxes. Using 1 worker instead of {}.".format(self.__scenario_name, self.workers))
+            self.workers = 1
+
+        if self.pipeline is True and self.__scenario_name.startswith('onos') is True:
+            self.__log.warning("ONOS runs as a single service, the next test of scenario \"{}\" can't be prepared in "
+                               "a second sandbox. Running the tests without pipelining.".format(self.__scenario_name))
+            self.pipeline = False
+        elif self.pipeline is True and self.workers > 1:
+            self.__log.warning("The tests of the {} sandboxes already overlap, pipelining is "
+                               "ignored.".format(self.workers))
+            self.pipeline = False
+
+        if self.sequence_length > 1 and self.__scenario_ctx['has_between'] is False:
+            self.__log.warning("Scenario \"{}\" does not define a \"between_each\" function, its tests can't be run in "
+                               "sequences. Using sequences of 1 test instead of {}.".format(self.__scenario_name,
+                                                                                          self.sequence_length))
+            self.sequence_length = 1
+
+        if self.workers > 1 or self.pipeline is True:
+            self.__run_parallel(fuzz_instr)
+        else:
+            for i in range(self.samples_per_iteration):
+                if i in self.__done:
+                    continue
+
+                # Stop generating samples when the next test is not expected to complete before the deadline
+                if not self.__has_time_for_test():
+                    break
+
+                # Start a time
+                start_time = timer()
+                self.__run_test(fuzz_instr[i])
+
+                # Stop the timer
+                stop_time = timer()
+                self.__on_test_completed(i, stop_time - start_time, readiness.pop_waits(), watchdog.pop_timeouts())
+
+            # Close the last session of the iteration
+            self.__end_sequence()
+            if MininetDriver.is_persistent():
+                MininetDriver.stop()
+            if FuzzerDriver.is_daemon():
+                FuzzerDriver.stop()
+
+        self.deadline_reached = len(self.run_time) < self.samples_per_iteration
+        if self.deadline_reached is True:
+            self.__log.warning("Sample generation stopped after {} tests out of {} to meet the "
+                               "deadline".format(len(self.run_time), self.samples_per_iteration))
 
-        # Reset the timing counter
-        self.run_time = list()
-        for i in range(self.samples_per_iteration):
-            trial = 0
-            completed = False
-            # Start a time
-            start_time = timer()
-            while completed is not True:
-                try:
-                    # ===== BEFORE EACH ========================================================================================
-                    # Try to run the 'before_each' function
-                    if self.__scenario_ctx['has_before'] is True:
-                        try:
-                            self.__log.debug("Running \"{}#before_each\"".format(self.__scenario.__name__))
+        # ===== TERMINATE ==============================================================================================
+        # If it's the last experiment, run the function on_last_instance
+        if self.__scenario_ctx['has_term'] is True:
+            try:
+                self.__log.debug("Running \"{}#terminate\"".format(self.__scenario.__name__))
+                self.__scenario.terminate()
+            except Exception as e:
+                self.__log.exception("An exception occurred while running \"{}#terminate\"".format(self.__scenario.__name__))
+                raise e
+    # End def run
+
+    # ===== ( Checkpoint ) =============================================================================================
+
+    def state(self) -> Optional[dict]:
+        """Returns the progress of the current run, to be saved in a checkpoint, or None if no run is in progress."""
+        if self.__instructions is None:
+            return None
+
+        return {
+            'instructions'      : list(self.__instructions),
+            'done'              : sorted(self.__done),
+            'run_time'          : list(self.run_time),
+            'wait_time'         : dict(self.wait_time),
+            'completion_time'   : list(self.completion_time),
+            'timeouts'          : dict(self.timeouts),
+            'test_time'         : self.__test_time,
+            'test_count'        : self.__test_count,
+        }
+    # End def state
+
+    def restore(self, state: dict):
+        """Restore the progress of a run from a checkpoint. The next run tests the instructions of the checkpoint which
+        were not tested yet, instead of building new instructions.
+
+        Args:
+            state (dict): The progress of the run, as returned by `state`.
+        """
+        self.__instructions     = list(state['instructions'])
+        self.__done             = set(state['done'])
+        self.run_time           = list(state['run_time'])
+        self.wait_time          = dict(state['wait_time'])
+        self.completion_time    = list(state['completion_time'])
+        self.timeouts           = dict(state['timeouts'])
+        self.__test_time        = state['test_time']
+        self.__test_count       = state['test_count']
+        self.__restored         = True
+    # End def restore
+
+    def end_run(self):
+        """Notifies the experimenter that the results of the current run have been processed, so that it is no longer
+        saved in the checkpoints."""
+        self.__instructions = None
+        self.__done = set()
+    # End def end_run
+
+    # ===== ( Private methods ) ========================================================================================
+
+    def __run_test(self, instruction, collect_only=False) -> Optional[dict]:
+        """Run a test of the scenario for one fuzzer instruction, retrying it if the fuzzer did not output anything.
+
+        When the sequence length is greater than 1, the controller session opened by "before_each" is kept for the
+        next tests, until a failure is observed or the sequence is complete.
+
+        Args:
+            instruction (str): The fuzzer instruction for the test
+            collect_only (bool): If set to True, the results of the test are collected by the analyzer but not
+                                 recorded, so they can be recorded by another process.
+
+        Returns:
+            The sample collected by the analyzer, None if there is no analyzer.
+        """
+        trial = 0
+        sample = None
+        completed = False
+        while completed is not True:
+            try:
+                new_sequence = self.__seq_len == 0
+
+                # ===== BEFORE EACH ========================================================================================
+                # Try to run the 'before_each' function at the beginning of each sequence
+                if new_sequence is True and self.__scenario_ctx['has_before'] is True:
+                    try:
+                        self.__log.debug("Running \"{}#before_each\"".format(self.__scenario.__name__))
+                        with watchdog.phase('before_each'):
                             self.__scenario.before_each()
-                        except Exception as e:
-                            self.__log.exception("An exception occurred while running \"{}#before_each\"".format(self.__scenario.__name__))
-                            raise e
+                    except Exception as e:
+                        self.__log.exception("An exception occurred while running \"{}#before_each\"".format(self.__scenario.__name__))
+                        raise e
 
-                    # ===== TEST ===============================================================================================
-                    # Start the analysis before the core test
-                    if self.__analyzer is not None:
+                # ===== TEST ===============================================================================================
+                # Start the analysis before the core test
+                if self.__analyzer is not None:
+                    if new_sequence is True:
+                        self.__analyzer.new_sequence()
+                    else:
+                        self.__analyzer.mark_logs()
+                    if collect_only is False:
                         self.__analyzer.start_analysis()
 
-                    # Try to run the 'test' function
+                # Follow the logs during the test, so that it can be cut short once its outcome is known
+                if self.__analyzer is not None and setup.config().general.get('early_verdict', False) is True:
+                    verdict.follow(self.__analyzer.follow_logs,
+                                   interval=float(setup.config().general.get('verdict_interval', 0.1)))
+
+                # Try to run the 'test' function
+                if self.__test_lock is not None:
+                    self.__test_lock.acquire()
+                try:
+                    self.__log.debug("Running \"{}#test\"".format(self.__scenario.__name__))
+                    with watchdog.phase('test'):
+                        self.__scenario.test(instruction=instruction, **self.__scenario_options)
+                except IndexError as e:
+                    self.__log.error("An exception occurred while running \"{}#test\"".format(self.__scenario.__name__))
+                    raise e  # Re-raise the exception so that it is handled at a higher level
+                except Exception as e:
+                    self.__log.exception("An exception occurred while running \"{}#test\"".format(self.__scenario.__name__))
+                    raise e
+                finally:
+                    verdict.stop_following()
+                    if self.__test_lock is not None:
+                        self.__test_lock.release()
+
+                # Finish the analysis after the core test. Only the collection of the sample has a deadline: a timeout
+                # raised while the sample is written to the database would lose the batch being written.
+                if self.__analyzer is not None:
+                    with watchdog.phase('finish_analysis'):
+                        sample = self.__analyzer.collect_sample()
+                    if collect_only is False:
+                        self.__analyzer.record_sample(sample)
+                    sample['new_sequence'] = new_sequence
+
+                # ===== AFTER EACH =========================================================================================
+                # Keep the session for the next test, unless a failure was observed or the sequence is complete
+                self.__seq_len += 1
+                failed = sample is not None and sample['log'][0] is True
+                if failed is True or self.__seq_len >= self.sequence_length:
+                    self.__end_sequence()
+                else:
                     try:
-                        self.__log.debug("Running \"{}#test\"".format(self.__scenario.__name__))
-                        self.__scenario.test(instruction=fuzz_instr[i], **self.__scenario_options)
-                    except IndexError as e:
-                        self.__log.error("An exception occurred while running \"{}#test\"".format(self.__scenario.__name__))
-                        # self.__log.debug("There might be an issue with the number of instructions... Printing the instructions:")
-                        # for j in range(len(fuzz_instr)):
-                        #     self.__log.debug("Instruction {}: {}".format(j, fuzz_instr[j]))
-                        raise e  # Re-raise the exception so that it is handled at a higher level
+                        self.__log.debug("Running \"{}#between_each\"".format(self.__scenario.__name__))
+                        with watchdog.phase('after_each'):
+                            self.__scenario.between_each()
                     except Exception as e:
-                        self.__log.exception("An exception occurred while running \"{}#test\"".format(self.__scenario.__name__))
+                        self.__log.exception("An exception occurred while running \"{}#between_each\"".format(self.__scenario.__name__))
                         raise e
 
-                    # Finish the analysis after the core test
-                    if self.__analyzer is not None:
-                        self.__analyzer.finish_analysis()
-
-                    # ===== AFTER EACH =========================================================================================
-                    # Try to run the 'after_each' function
-                    if self.__scenario_ctx['has_after'] is True:
-                        try:
-                            self.__log.debug("Running \"{}#after_each\"".format(self.__scenario.__name__))
-                            self.__scenario.after_each()
-                        except Exception as e:
-                            self.__log.exception("An exception occurred while running \"{}#after_each\"".format(self.__scenario.__name__))
-                            raise e
-
-                # Handling of some known exceptions
-                except FileNotFoundError as e:
-                    # If the fuzzer hasn't output anything, retry
-                    if os.path.expanduser(setup.config().fuzzer.out_path) in e.strerror:
-                        self.__log.error("The fuzzer did not output any instruction file (trial {}/{})".format(trial, MAX_RETRY))
-                        if trial < MAX_RETRY:
-                            self.__log.warning("The fuzzer did not output any instruction file")
-                            trial += 1
-                        else:  # Re-Raise the exception to trigger an exit
-                            raise e from None
-                    else:  # Unknown error, re-raise to trigger an exit
+            # A phase of the test hung: the sandbox is reset and the test is recorded as a timeout
+            except watchdog.PhaseTimeout as e:
+                verdict.stop_following()
+                sample = self.__on_phase_timeout(e.phase, sample, new_sequence, collect_only)
+                completed = True
+
+            # Handling of some known exceptions
+            except FileNotFoundError as e:
+                # If the fuzzer hasn't output anything, retry
+                if os.path.expanduser(setup.config().fuzzer.out_path) in e.strerror:
+                    self.__log.error("The fuzzer did not output any instruction file (trial {}/{})".format(trial, MAX_RETRY))
+                    if trial < MAX_RETRY:
+                        self.__log.warning("The fuzzer did not output any instruction file")
+                        self.__seq_len = 0  # Restart the session on retry
+                        trial += 1
+                    else:  # Re-Raise the exception to trigger an exit
                         raise e from None
-                else:
-                    completed = True
-            # End of the while loop
-
-            # Stop the timer
-            stop_time = timer()
-            self.run_time.append(stop_time - start_time)
-
-            # Print log information
-            self.__log.info("Test {} out of {} of scenario \"{}\" completed in {}s.".format(i + 1,
-                                                                                            self.samples_per_iteration,
-                                                                                            self.__scenario.__name__,
-                                                                                            stop_time - start_time))
-            # Increment the progress bar
-            progress_bar(
-                i + 1,
-                self.samples_per_iteration,
-                prefix='Progress:',
-                suffix='Complete ({}/{})'.format(i + 1, self.samples_per_iteration),
-                length=100
-            )
-
-        # ===== TERMINATE ==============================================================================================
-        # If it's the last experiment, run the function on_last_instance
-        if self.__scenario_ctx['has_term'] is True:
+                else:  # Unknown error, re-raise to trigger an exit
+                    raise e from None
+            else:
+                completed = True
+        # End of the while loop
+
+        return sample
+    # End def __run_test
+
+    def __end_sequence(self):
+        """Close the current controller session by running the 'after_each' function of the scenario."""
+        if self.__seq_len > 0 and self.__scenario_ctx['has_after'] is True:
             try:
-                self.__log.debug("Running \"{}#terminate\"".format(self.__scenario.__name__))
-                self.__scenario.terminate()
+                self.__log.debug("Running \"{}#after_each\"".format(self.__scenario.__name__))
+                with watchdog.phase('after_each'):
+                    self.__scenario.after_each()
+            except watchdog.PhaseTimeout:
+                self.__force_reset()
             except Exception as e:
-                self.__log.exception("An exception occurred while running \"{}#terminate\"".format(self.__scenario.__name__))
+                self.__log.exception("An exception occurred while running \"{}#after_each\"".format(self.__scenario.__name__))
                 raise e
-    # End def run
+        self.__seq_len = 0
+    # End def __end_sequence
 
-    # ===== ( Private methods ) ========================================================================================
+    def __on_phase_timeout(self, phase, sample, new_sequence, collect_only=False) -> Optional[dict]:
+        """Reset the sandbox after a phase of a test exceeded its deadline and get the sample of the test.
+
+        Args:
+            phase (str): The phase which exceeded its deadline.
+            sample (dict): The sample collected before the timeout, if any.
+            new_sequence (bool): Whether the test started a new sequence.
+            collect_only (bool): If set to True, the sample is not recorded, so it can be recorded by another process.
+
+        Returns:
+            The sample of the test. When the test or its analysis hung, the sample records a timeout outcome, or is
+            None if the fuzzer did not report any packet.
+        """
+        self.__force_reset()
+
+        if phase in ('test', 'finish_analysis') and self.__analyzer is not None:
+            sample = self.__analyzer.timeout_sample(phase)
+            if sample is None:
+                self.__log.warning("No packet was fuzzed before the timeout, the test is not recorded")
+            else:
+                sample['new_sequence'] = new_sequence
+                if collect_only is False:
+                    self.__analyzer.record_sample(sample)
+        elif phase == 'before_each':
+            sample = None
+
+        return sample
+    # End def __on_phase_timeout
+
+    def __force_reset(self):
+        """Stop the fuzzer, the network and the controller of the sandbox after a phase hung, so that the next test
+        starts from a clean environment."""
+        self.__log.warning("Resetting the sandbox of scenario \"{}\"".format(self.__scenario_name))
+        self.__seq_len = 0
+        try:
+            FuzzerDriver.stop()
+            MininetDriver.stop()
+            if self.__scenario_name.startswith('onos'):
+                OnosDriver.stop()
+            elif self.__scenario_name.startswith('ryu'):
+                RyuDriver.stop()
+        except Exception:
+            self.__log.exception("An exception occurred while resetting the sandbox")
+    # End def __force_reset
+
+    def __on_test_completed(self, i, run_time, waits, timeouts):
+        """Register the run time of the i-th test of the iteration, the time spent waiting for the components and the
+        timeouts of the phases during the test, then display the progress."""
+        self.run_time.append(run_time)
+        for component, elapsed in waits.items():
+            self.wait_time[component] = self.wait_time.get(component, 0.0) + sum(elapsed)
+        for phase, count in timeouts.items():
+            self.timeouts[phase] = self.timeouts.get(phase, 0) + count
+        self.__test_time += run_time
+        self.__test_count += 1
+        self.completion_time.append(sum(waits.get('completion', [])))
+        self.__done.add(i)
+
+        # Print log information
+        self.__log.info("Test {} out of {} of scenario \"{}\" completed in {}s.".format(i + 1,
+                                                                                        self.samples_per_iteration,
+                                                                                        self.__scenario.__name__,
+                                                                                        run_time))
+        # Increment the progress bar
+        progress_bar(
+            len(self.run_time),
+            self.samples_per_iteration,
+            prefix='Progress:',
+            suffix='Complete ({}/{})'.format(len(self.run_time), self.samples_per_iteration),
+            length=100
+        )
+
+        if self.on_progress is not None:
+            self.on_progress()
+    # End def __on_test_completed
+
+    def __has_time_for_test(self) -> bool:
+        """Returns True if there is no deadline or if the next test is expected to complete before it, judged from the
+        mean duration of the tests run so far."""
+        if self.deadline is None:
+            return True
+
+        expected = self.__test_time / self.__test_count if self.__test_count > 0 else 0.0
+        if timer() + expected <= self.deadline:
+            return True
+
+        self.__log.info("{:.1f}s left before the deadline, not enough for another test (~{:.1f}s)".format(
+            max(self.deadline - timer(), 0.0), expected))
+        return False
+    # End def __has_time_for_test
+
+    def __run_parallel(self, fuzz_instr):
+        """Run the tests in several sandboxes at the same time.
+
+        Each sandbox runs in its own process and collects the results of its tests, which are then recorded by the
+        analyzer of this process in the order in which they complete. The samples are tagged by their sandbox with the
+        key of their sequence in the sandbox, which is given a seq_id by this process the first time it is received, so
+        that the sequences of the sandboxes don't mix whatever the order of the results.
+
+        When pipelining, two sandboxes take turns: only one of them runs a test at a time, while the other one analyzes
+        its last test, tears it down and prepares the environment of its next test.
+        """
+        controller = self.__scenario_name.split("_")[0]
+        nb_of_sandboxes = 2 if self.pipeline is True else self.workers
+        if self.pipeline is True:
+            self.__log.info("Running {} tests in 2 alternating sandboxes".format(self.samples_per_iteration))
+        else:
+            self.__log.info("Running {} tests in {} sandboxes".format(self.samples_per_iteration, self.workers))
+
+        # Clear the residual networks once, as the sandboxes only clean their own network
+        MininetDriver.clean()
+
+        ctx = multiprocessing.get_context('fork')
+        tasks = ctx.Queue()
+        results = ctx.Queue()
+        test_lock = ctx.Lock() if self.pipeline is True else None
+        for i in range(self.samples_per_iteration):
+            if i not in self.__done:
+                tasks.put((i, fuzz_instr[i]))
+
+        workers = list()
+        for index in range(nb_of_sandboxes):
+            tasks.put(None)  # One sentinel per worker
+            worker = ctx.Process(target=self.__sandbox_worker,
+                                 args=(Sandbox(index, controller), tasks, results, test_lock),
+                                 name="sandbox-{}".format(index))
+            worker.start()
+            workers.append(worker)
+
+        try:
+            # Each sandbox sends its index once it stops, which may be before the tasks are all done to meet the deadline
+            seq_ids = dict()  # seq_id of the sequences of the sandboxes, by (sandbox index, sequence in the sandbox)
+            stopped = set()
+            exited = set()  # Sandboxes whose process has exited before they were seen stopping
+            dead = set()
+            while len(stopped) < nb_of_sandboxes:
+                try:
+                    result = results.get(timeout=RESULTS_POLL_INTERVAL)
+                except queue.Empty:
+                    # A sandbox killed (SIGKILL, OOM killer, crash) never sends its index. A sandbox which stopped
+                    # normally sends it before exiting, so it arrives within one poll after the exit
+                    for index, worker in enumerate(workers):
+                        if index in stopped or worker.exitcode is None:
+                            continue
+                        if index in exited:
+                            self.__log.error("Sandbox worker \"{}\" died (exit code: {})".format(worker.name,
+                                                                                              worker.exitcode))
+                            stopped.add(index)
+                            dead.add(index)
+                        else:
+                            exited.add(index)
+                    continue
+
+                if isinstance(result, int):
+                    stopped.add(result)
+                    continue
+
+                i, sample, run_time, waits, timeouts, error = result
+                if error is not None:
+                    raise RuntimeError("Test {} failed in its sandbox: {}".format(i + 1, error))
+
+                # There is no sample when a test timed out before the fuzzer reported a packet
+                if self.__analyzer is not None and sample is not None:
+                    if sample['sequence'] not in seq_ids:
+                        seq_ids[sample['sequence']] = self.__analyzer.new_sequence()
+                    self.__analyzer.start_analysis()
+                    self.__analyzer.record_sample(sample, seq_id=seq_ids[sample['sequence']])
+
+                self.__on_test_completed(i, run_time, waits, timeouts)
+
+            # The test a dead sandbox was running is lost, and the tests left are only run if a sandbox is still alive
+            if len(dead) > 0:
+                unfinished = [i + 1 for i in range(self.samples_per_iteration) if i not in self.__done]
+                if len(dead) == nb_of_sandboxes and len(unfinished) > 0:
+                    raise RuntimeError("All the sandboxes died, tests {} were not run".format(unfinished))
+                if len(unfinished) > 0:
+                    self.__log.error("{} sandbox(es) died, tests {} were not run".format(len(dead), unfinished))
+        finally:
+            tasks.cancel_join_thread()  # The tasks left when the deadline is met are dropped
+            for worker in workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    self.__log.warning("Terminating sandbox worker \"{}\"".format(worker.name))
+                    worker.terminate()
+    # End def __run_parallel
+
+    def __sandbox_worker(self, sandbox, tasks, results, test_lock=None):
+        """Main loop of a sandbox process: run the tests received on the tasks queue and send the collected samples
+        on the results queue. If a test lock is given, the tests are only run while holding it."""
+        # Interruptions are handled by the main process, which terminates the sandboxes
+        def on_terminate(*_):
+            sandbox.release()
+            sys.exit(1)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, on_terminate)
+
+        sandbox.apply()
+        self.__test_lock = test_lock
+
+        # Re-create the log parser so it reads the logs of the sandbox
+        if self.__analyzer is not None:
+            self.__analyzer.controller = self.__analyzer.controller
+
+        try:
+            # Each sandbox judges from the duration of its own tests whether it can run another test before the deadline
+            while self.__has_time_for_test():
+                task = tasks.get()
+                if task is None:
+                    break
+
+                i, instruction = task
+                start_time = timer()
+                try:
+                    sample = self.__run_test(instruction, collect_only=True)
+                except Exception as e:
+                    results.put((i, None, timer() - start_time, readiness.pop_waits(), watchdog.pop_timeouts(),
+                                 repr(e)))
+                    break
+                else:
+                    run_time = timer() - start_time
+                    if sample is not None:
+                        sample['sequence'] = (sandbox.index, self.__analyzer.sequence)
+                    results.put((i, sample, run_time, readiness.pop_waits(), watchdog.pop_timeouts(), None))
+                    self.__test_time += run_time
+                    self.__test_count += 1
+
+            # Close the last session of the sandbox
+            self.__end_sequence()
+            if MininetDriver.is_persistent():
+                MininetDriver.stop()
+            if FuzzerDriver.is_daemon():
+                FuzzerDriver.stop()
+        finally:
+            results.put(sandbox.index)
+    # End def __sandbox_worker
 
     def __build_fuzzer_instruction(self, count=1):
         """
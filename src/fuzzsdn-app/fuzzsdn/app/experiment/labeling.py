@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Labeling of the samples according to the failure under test.
+
+A labeler is registered for each failure under test (see arguments.FailureToTestType). It computes, with vectorized
+operations on the columns of the dataset, a boolean mask of the samples which exhibit the failure, which are labeled
+"FAIL", the other samples being labeled "PASS". A new failure under test only needs a new labeler in this module:
+
+    @register('my_failure')
+    def _my_failure(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+        return df['error_type'] == 'MY_ERROR'
+
+A labeler returns None when the failure can't be labeled for the controller, in which case the samples are not
+labeled. The labelers which read the effect of the error are registered with `effect=True`: the effect is only logged
+after the error, so the label of a test can't be decided from its logs before the effect is known (see `decides`).
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from fuzzsdn.arguments import FailureToTestType as Fut
+
+# ===== ( Globals definition ) =========================================================================================
+
+TARGET_CLASS    = 'FAIL'
+OTHER_CLASS     = 'PASS'
+
+Labeler = Callable[[pd.DataFrame, Optional[str]], Optional[pd.Series]]
+_labelers : Dict[str, Labeler] = dict()
+_effect_labelers : Set[str] = set()  # Failures under test whose label depends on the effect of the error
+
+
+# ===== ( Registry ) ===================================================================================================
+
+def register(*names: str, effect: bool = False) -> Callable[[Labeler], Labeler]:
+    """Decorator registering a labeler under the names of one or more failures under test.
+
+    Args:
+        *names (str): The names of the failures under test.
+        effect (bool): Set to True if the labeler reads the column "error_effect".
+    """
+
+    def decorator(labeler: Labeler) -> Labeler:
+        for name in names:
+            _labelers[str(name)] = labeler
+            if effect is True:
+                _effect_labelers.add(str(name))
+        return labeler
+
+    return decorator
+# End def register
+
+
+def names() -> List[str]:
+    """Returns the names of the failures under test which can be labeled."""
+    return list(_labelers.keys())
+# End def names
+
+
+def decides(verdict: Any, failure_under_test: Optional[str]) -> bool:
+    """Tell whether the verdict on the logs of a running test decides its label, so that the test can be cut short
+    without changing its label.
+
+    Args:
+        verdict (LogVerdict): The verdict on the logs followed so far.
+        failure_under_test (str): The failure under test. If unknown, the label is assumed to depend on the effect of
+                                  the error.
+
+    Returns:
+        True if the verdict is final and, when the label depends on it, the effect of the error is known.
+    """
+    if verdict.final is not True:
+        return False
+    fut = str(failure_under_test) if failure_under_test is not None else None
+    if fut not in _labelers or fut in _effect_labelers:
+        return verdict.error_effect is not None
+    return True
+# End def decides
+
+
+# ===== ( Labeling ) ===================================================================================================
+
+def label(df: pd.DataFrame, failure_under_test: str, controller: Optional[str]) -> Optional[pd.Series]:
+    """Label the samples of a dataset according to a failure under test.
+
+    Args:
+        df (pd.DataFrame): The dataset, with the columns "has_error", "error_type", "error_reason" and "error_effect".
+        failure_under_test (str): The failure under test.
+        controller (str): The controller tested, either 'onos' or 'ryu'.
+
+    Returns:
+        The class ("FAIL" or "PASS") of each sample, or None if the failure can't be labeled for the controller.
+
+    Raises:
+        ValueError: if no labeler is registered for the failure under test.
+    """
+    return label_all(df, [failure_under_test], controller).get(failure_under_test)
+# End def label
+
+
+def label_all(df: pd.DataFrame, failures_under_test: Iterable[str], controller: Optional[str]) -> pd.DataFrame:
+    """Label the samples of a dataset according to several failures under test at once. The columns used by the
+    labelers are prepared once for all of them.
+
+    Args:
+        df (pd.DataFrame): The dataset, with the columns "has_error", "error_type", "error_reason" and "error_effect".
+        failures_under_test (Iterable[str]): The failures under test.
+        controller (str): The controller tested, either 'onos' or 'ryu'.
+
+    Returns:
+        A dataframe with the classes of the samples for each failure under test, in a column named after it. The
+        failures which can't be labeled for the controller have no column.
+
+    Raises:
+        ValueError: if no labeler is registered for one of the failures under test.
+    """
+    failures_under_test = [str(fut) for fut in failures_under_test]
+    for fut in failures_under_test:
+        if fut not in _labelers:
+            raise ValueError("Unknown target error '{}'".format(fut))
+
+    columns = pd.DataFrame({
+        'has_error'     : df['has_error'].fillna(False).astype(bool),
+        'error_type'    : df['error_type'],
+        'error_reason'  : df['error_reason'],
+        'error_effect'  : df['error_effect'],
+    }, index=df.index)
+
+    labels = pd.DataFrame(index=df.index)
+    for fut in failures_under_test:
+        mask = _labelers[fut](columns, controller)
+        if mask is not None:
+            labels[fut] = np.where(mask.to_numpy(dtype=bool), TARGET_CLASS, OTHER_CLASS)
+    return labels
+# End def label_all
+
+
+# ===== ( Labelers ) ===================================================================================================
+
+def _contains(column: pd.Series, text: str) -> pd.Series:
+    """Returns whether each value of a column contains a text, missing values containing nothing."""
+    return column.fillna('').astype(str).str.contains(text, regex=False)
+# End def _contains
+
+
+@register(Fut.UNKNOWN_REASON)
+def _unknown_reason(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+    if controller == 'onos':
+        return df['has_error'] & df['error_reason'].isna()
+    if controller == 'ryu':
+        return df['error_reason'].isna()
+    return None
+# End def _unknown_reason
+
+
+@register(Fut.KNOWN_REASON)
+def _known_reason(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+    mask = _unknown_reason(df, controller)
+    return ~mask if mask is not None else None
+# End def _known_reason
+
+
+@register(Fut.PARSING_ERROR)
+def _parsing_error(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+    return df['error_reason'] == 'PARSING_ERROR'
+# End def _parsing_error
+
+
+@register(Fut.NON_PARSING_ERROR)
+def _non_parsing_error(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+    return ~_parsing_error(df, controller)
+# End def _non_parsing_error
+
+
+@register(Fut.SWITCH_DISCONNECTION, effect=True)
+def _switch_disconnection(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+    return df['has_error'] & (df['error_effect'] == 'SWITCH_DISCONNECTED')
+# End def _switch_disconnection
+
+
+@register(Fut.SWITCH_STATE_ERROR)
+def _switch_state_error(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+    return df['error_type'] == 'SWITCH_STATE_ERROR'
+# End def _switch_state_error
+
+
+@register(Fut.OFP_BAD_OUT_PORT, 'OFPBAC_BAD_OUT_PORT')
+def _ofp_bad_out_port(df: pd.DataFrame, controller: Optional[str]) -> Optional[pd.Series]:
+    if controller == 'ryu':
+        return df['error_reason'] == 'OFPBAC_BAD_OUT_PORT'
+    if controller == 'onos':
+        return _contains(df['error_reason'], 'BAD_OUT_PORT')
+    return None
+# End def _ofp_bad_out_port
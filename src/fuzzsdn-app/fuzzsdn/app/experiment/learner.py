@@ -4,6 +4,7 @@ import logging
 import os
 import re
 from copy import copy
+from timeit import default_timer as timer
 from typing import Dict, NamedTuple, Optional, Tuple
 
 from weka.classifiers import Classifier, Evaluation, FilteredClassifier
@@ -266,6 +267,10 @@ class Learner:
         self._seed          : Optional[int] = None
         self._cv_folds      : int = 10
 
+        # Time (as given by timer()) by which the learning must be over, and last time taken to build a classifier
+        self.deadline       : Optional[float] = None
+        self._build_time    : Optional[float] = None
+
         # Dataset
         self.dataset        : Optional[Instances] = None
 
@@ -463,12 +468,14 @@ class Learner:
         # Sets the seed for this learning iteration
         self.log.debug("Building the classifier...")
         seed = self._seed if self._seed is not None else int.from_bytes(os.urandom(7), 'big')
-        evaluator.crossvalidate_model(classifier, self.dataset, self._cv_folds, Random(seed))
+        evaluator.crossvalidate_model(classifier, self.dataset, self.__cv_folds_for_deadline(), Random(seed))
         self.log.trace("Done. Evaluator:\n{}\n{}".format(evaluator.summary(), evaluator.class_details("Statistics:")))
 
         # Build the classifier
         self.log.debug("Building the classifier...")
+        start_of_build = timer()
         classifier.build_classifier(self.dataset)
+        self._build_time = timer() - start_of_build
         self.log.trace("Done. Classifier:\n{}".format(classifier))
 
         # Create the model
@@ -484,6 +491,23 @@ class Learner:
 
     # ===== ( Private Functions ) ======================================================================================
 
+    def __cv_folds_for_deadline(self) -> int:
+        """Returns the number of cross-validation folds which lets the learning complete before the deadline.
+
+        Cross-validating on k folds and building the final classifier takes about k times the time taken to build a
+        classifier, as measured by the previous learning. The number of folds is never lower than 2.
+        """
+        if self.deadline is None or not self._build_time:
+            return self._cv_folds
+
+        affordable = int((self.deadline - timer()) / self._build_time)
+        folds = max(2, min(self._cv_folds, affordable))
+        if folds < self._cv_folds:
+            self.log.warning("Cross-validating on {} folds instead of {} to meet the deadline".format(folds,
+                                                                                                    self._cv_folds))
+        return folds
+    # End def __cv_folds_for_deadline
+
     def __build_pp_filters(self):
         """
         Perform some preprocessing on the data depending on the strategy defined.
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar store of the datasets of an experiment.
+
+The samples of each iteration are written once, at the end of the iteration, to their own Parquet partition
+("store/it_<i>.parquet" in the data directory of the experiment), with all the columns of the debug dataset and the
+class of the samples. The dataset of an iteration is the concatenation of the partitions of the iterations up to it,
+from which the views are derived:
+
+    - "debug":   all the columns, including the ids, the rules and the tests which timed out
+    - "raw":     the fields of the packets and the outcome of the tests
+    - "labeled": the fields of the packets and the class of the samples
+
+The per-iteration files of the views (it_<i>.csv, it_<i>_raw.csv, it_<i>_debug.csv and it_<i>.arff) are only generated
+on demand by `export`. The experiments recorded before the store existed are read from these files.
+"""
+import glob
+import logging
+import os
+import re
+from os.path import join
+from typing import List, Optional
+
+import pandas as pd
+
+from fuzzsdn.app.experiment.analyzer import LOG_COLUMNS, RULE_COLUMNS, SAMPLE_COLUMNS, TIMEOUT
+from fuzzsdn.common.utils import csv_ops
+
+# ===== ( Globals definition ) =========================================================================================
+
+STORE_DIR = 'store'
+VIEWS = ('raw', 'labeled', 'debug')
+FILE_NAMES = {
+    'raw'       : 'it_{}_raw.csv',
+    'labeled'   : 'it_{}.csv',
+    'debug'     : 'it_{}_debug.csv',
+    'arff'      : 'it_{}.arff',
+}
+
+_log = logging.getLogger(__name__)
+_PARTITION_RE = re.compile(r'^it_(\d+)\.parquet$')
+
+
+# ===== ( Functions ) ==================================================================================================
+
+def partition_path(data_dir: str, iteration: int) -> str:
+    """Returns the path of the partition of an iteration."""
+    return join(data_dir, STORE_DIR, 'it_{}.parquet'.format(iteration))
+# End def partition_path
+
+
+def iterations(data_dir: str) -> List[int]:
+    """Returns the iterations stored in the data directory of an experiment, in order."""
+    found = (_PARTITION_RE.match(os.path.basename(p)) for p in glob.glob(join(data_dir, STORE_DIR, '*.parquet')))
+    return sorted(int(m.group(1)) for m in found if m is not None)
+# End def iterations
+
+
+def append(data_dir: str, iteration: int, df: pd.DataFrame):
+    """Write the samples of an iteration to its partition. A partition written by an interrupted run of the iteration
+    is replaced.
+
+    Args:
+        data_dir (str): The data directory of the experiment.
+        iteration (int): The iteration of the samples.
+        df (pd.DataFrame): The debug dataset of the samples of the iteration, as given by Analyzer.get_dataset.
+    """
+    path = partition_path(data_dir, iteration)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    _log.debug("Stored {} samples of iteration {} under \"{}\"".format(len(df.index), iteration, path))
+# End def append
+
+
+def load(data_dir: str, iteration: Optional[int] = None) -> pd.DataFrame:
+    """Load the debug dataset of an iteration from the store.
+
+    Args:
+        data_dir (str): The data directory of the experiment.
+        iteration (int): The iteration. If set to None, the dataset of the last stored iteration is loaded.
+
+    Raises:
+        FileNotFoundError: if no iteration up to `iteration` is stored.
+    """
+    stored = [i for i in iterations(data_dir) if iteration is None or i <= iteration]
+    if len(stored) == 0:
+        raise FileNotFoundError("No dataset stored under \"{}\"".format(join(data_dir, STORE_DIR)))
+
+    return pd.concat([pd.read_parquet(partition_path(data_dir, i)) for i in stored], ignore_index=True)
+# End def load
+
+
+def view(df: pd.DataFrame, name: str = 'labeled') -> pd.DataFrame:
+    """Derive a view from a debug dataset.
+
+    Args:
+        df (pd.DataFrame): The debug dataset.
+        name (str): The name of the view, either 'raw', 'labeled' or 'debug'.
+    """
+    if name not in VIEWS:
+        raise ValueError("Unknown view '{}'. Available views are: {}".format(name, ", ".join(VIEWS)))
+    if name == 'debug':
+        return df
+
+    # The outcome of the tests which timed out is unknown, they are left out of the dataset
+    df = df[df['error_type'] != TIMEOUT].reset_index(drop=True)
+    dropped = list(SAMPLE_COLUMNS) + ['log_id'] + list(RULE_COLUMNS)
+    dropped += ['class'] if name == 'raw' else list(LOG_COLUMNS)
+    return df.drop(dropped, axis='columns', errors='ignore')
+# End def view
+
+
+def read(data_dir: str, iteration: int, name: str = 'labeled') -> pd.DataFrame:
+    """Read a view of the dataset of an iteration.
+
+    Args:
+        data_dir (str): The data directory of the experiment.
+        iteration (int): The iteration.
+        name (str): The name of the view, either 'raw', 'labeled' or 'debug'.
+    """
+    if len(iterations(data_dir)) == 0:
+        # Experiment recorded before the store existed
+        return pd.read_csv(join(data_dir, FILE_NAMES[name].format(iteration)))
+    return view(load(data_dir, iteration), name)
+# End def read
+
+
+def export(data_dir: str, iteration: int, name: str = 'labeled') -> str:
+    """Write the file of a view of the dataset of an iteration, if it doesn't exist yet.
+
+    Args:
+        data_dir (str): The data directory of the experiment.
+        iteration (int): The iteration.
+        name (str): The name of the view, either 'raw', 'labeled', 'debug', or 'arff' for the labeled view as an arff
+                    file.
+
+    Returns:
+        The path of the file.
+    """
+    path = join(data_dir, FILE_NAMES[name].format(iteration))
+    if not os.path.exists(path):
+        if name == 'arff':
+            csv_ops.to_arff(
+                csv_path=export(data_dir, iteration, 'labeled'),
+                arff_path=path,
+                csv_sep=',',
+                relation='dataset_iteration_{}'.format(iteration)
+            )
+        else:
+            read(data_dir, iteration, name).to_csv(path, index=False, encoding='utf-8')
+    return path
+# End def export
@@ -12,15 +12,16 @@ from os.path import join
 from typing import Iterable, Optional, Union
 
 import grp
+import itertools
 import math
 from scipy.stats import rankdata
 from timeit import default_timer as timer
 from weka.core import jvm, packages
 
 from fuzzsdn import __app_name__, arguments
-from fuzzsdn.app import setup
-from fuzzsdn.app.drivers import FuzzerDriver, OnosDriver, RyuDriver
-from fuzzsdn.app.experiment import Analyzer, Experimenter, Learner, Method, Model, RuleSet
+from fuzzsdn.app import checkpoint, setup
+from fuzzsdn.app.drivers import FuzzerDriver, OnosDriver, PrivilegedDriver, RyuDriver, supervisor
+from fuzzsdn.app.experiment import Analyzer, Experimenter, Learner, Method, Model, Rule, RuleSet, store
 from fuzzsdn.app.stats import Stats
 from fuzzsdn.arguments import Limit
 from fuzzsdn.common import app_path
@@ -50,6 +51,9 @@ _context = {
     "nb_of_samples"         : int(),
     "it_limit"              : None,
     "time_limit"            : None,
+    "workers"               : int(),
+    "sequence_length"       : int(),
+    "pipeline"              : bool(),
 
     # Machine Learning
     "filter"                : str(),
@@ -83,6 +87,9 @@ def run(
     criterion_kwargs : Optional[dict] = None,
     scenario_options : Optional[dict] = None,
     limit : Optional[Iterable] = None,
+    workers : int = 1,
+    sequence_length : int = 1,
+    pipeline : bool = False
 ):
 
     global _context
@@ -98,6 +105,7 @@ def run(
     precision = 0  # Algorithm precision
     recall = 0  # Algorithm recall
     it = 0  # iteration index
+    state : Optional[dict] = None  # State of the experiment to resume
 
     # Setup for new mode
     if mode == 'new':
@@ -120,6 +128,9 @@ def run(
             'nb_of_samples'     : samples,
             'it_limit'          : int(limit[1]) if limit and limit[0] == Limit.ITERATION else None,
             'time_limit'        : int(limit[1]) if limit and limit[0] == Limit.TIME else None,
+            'workers'           : workers,
+            'sequence_length'   : sequence_length,
+            'pipeline'          : pipeline,
 
             # Machine Learning
             'algorithm'         : ml_algorithm ,
@@ -140,7 +151,22 @@ def run(
         rule_set.other_class    = 'PASS'  # and '''PASS'''
 
     elif mode == 'resume':
-        raise NotImplementedError("Resume function is not yet implemented")
+        _log.info("Loading the checkpoint of the experiment...")
+        state = checkpoint.load()
+        if state is None:
+            raise FileNotFoundError("No checkpoint to resume the experiment from at \"{}\"".format(checkpoint.path()))
+        if state['finished'] is True:
+            _log.info("The experiment is already complete, there is nothing to resume.")
+            return
+
+        _context    = state['context']
+        it          = state['iteration']
+        precision   = state['precision']
+        recall      = state['recall']
+        rule_set    = state['ruleset']
+        Rule.new_id = itertools.count(state['next_rule_id'])  # The rules of the next iterations get new ids
+        Stats.restore(state['stats'])
+        _log.info("Experiment context loaded. Resuming at iteration {}".format(it + 1))
 
     ## Get the scenario kwargs string
     if len(_context['scenario_options']) > 0:
@@ -174,10 +200,21 @@ def run(
         print(Style.BOLD, "*** Time Limit: {}".format(str(datetime.timedelta(seconds=_context['time_limit']))), Style.RESET)
     if _context['it_limit'] is not None:
         print(Style.BOLD, "*** Iteration Limit: {}".format(_context['it_limit']), Style.RESET)
+    if _context['workers'] > 1:
+        print(Style.BOLD, "*** Workers: {}".format(_context['workers']), Style.RESET)
+    if _context['sequence_length'] > 1:
+        print(Style.BOLD, "*** Sequence Length: {}".format(_context['sequence_length']), Style.RESET)
+    if _context['pipeline'] is True:
+        print(Style.BOLD, "*** Pipelined Sandboxes: Yes", Style.RESET)
+
+    # Start the privileged helper, the privileged operations of the drivers fall back to sudo if it doesn't start
+    if PrivilegedDriver.is_enabled() and PrivilegedDriver.start() is False:
+        _log.warning("The privileged helper couldn't be started, privileged operations will be run with sudo")
 
     # Set up the Analyzer
     analyzer = Analyzer()
     analyzer.save_logs = False
+    analyzer.failure_under_test = _context['fut']
 
     # Set up the experimenter
     experimenter = Experimenter()
@@ -185,6 +222,9 @@ def run(
     experimenter.scenario               = _context['scenario'], _context['scenario_options']
     experimenter.criterion              = _context['criterion']['name'], _context['criterion']['kwargs']
     experimenter.samples_per_iteration  = _context['nb_of_samples']
+    experimenter.workers                = _context['workers']
+    experimenter.sequence_length        = _context['sequence_length']
+    experimenter.pipeline               = _context['pipeline']
     experimenter.analyzer               = analyzer
 
     # Setup the Learner
@@ -202,11 +242,58 @@ def run(
     start_timestamp = timer()
     keep_running = True
 
+    # Time kept before the time limit to export the datasets and learn from them, measured at each iteration
+    reserve = float(setup.config().general.get('time_limit_reserve', 120))
+
+    # Resume where the experiment stopped: the time already spent counts towards the time limit, and the tests of an
+    # interrupted iteration are carried on rather than started again
+    resumed_tests = False
+    if state is not None:
+        start_timestamp -= state['elapsed']
+        reserve = state['reserve']
+        analyzer.restore(state['analyzer'])
+        if state['tests'] is not None:
+            experimenter.restore(state['tests'])
+            resumed_tests = True
+
+    def save_checkpoint(finished: bool = False):
+        # Only the samples written to the database can be resumed, write the samples still buffered
+        SqlDb.flush()
+        # Read the next rule id without using it up, the checkpoints must not change the ids of the rules
+        next_rule_id = next(Rule.new_id)
+        Rule.new_id = itertools.count(next_rule_id)
+        checkpoint.save({
+            'context'       : _context,
+            'iteration'     : it,
+            'precision'     : precision,
+            'recall'        : recall,
+            'ruleset'       : rule_set,
+            'next_rule_id'  : next_rule_id,
+            'stats'         : Stats.state(),
+            'analyzer'      : analyzer.state(),
+            'tests'         : experimenter.state(),
+            'elapsed'       : timer() - start_timestamp,
+            'reserve'       : reserve,
+            'finished'      : finished
+        })
+    # End def save_checkpoint
+
+    def save_progress():
+        # The progress is saved once the batch of the last samples has been written, flushing the samples after each
+        # test would defeat the batching
+        if not SqlDb.has_pending():
+            save_checkpoint()
+    # End def save_progress
+
+    # Save the progress of the experiment after the tests
+    experimenter.on_progress = save_progress
+
     while keep_running:
 
         # Register timestamp at the beginning of the iteration and set a new iteration for the analyzer
         start_of_it = timer()
-        analyzer.new_iteration()
+        if resumed_tests is False:
+            analyzer.new_iteration()
 
         # Write headers
         print(Style.BOLD, "*** Iteration {}".format(it + 1), Style.RESET)
@@ -215,14 +302,15 @@ def run(
 
         # 0. Configure the experiment depending on the ML model and Fuzz Mode
         if _context['method'] == arguments.Method.DEFAULT:
-            if ml_model is None or not ml_model.has_rules:
+            if not rule_set.has_rules():
                 _log.info("No rules in set of rule. Generating random samples")
                 experimenter.method = Method.RANDOM
                 experimenter.ruleset = None
             else:
                 experimenter.method = Method.RULE
-                experimenter.ruleset = ml_model.ruleset
-                analyzer.set_ruleset_for_iteration(ml_model.ruleset)
+                experimenter.ruleset = rule_set
+                if resumed_tests is False:  # The rules of the interrupted iteration are already recorded
+                    analyzer.set_ruleset_for_iteration(rule_set)
 
         elif _context['method'] == arguments.Method.DELTA:
             experimenter.method = Method.DELTA
@@ -232,25 +320,25 @@ def run(
             experimenter.method = Method.BEADS
             experimenter.ruleset = None
 
-        # 1. Run the experiment
+        # 1. Run the experiment, stopping the tests in time for the last learning when the time is limited
+        if _context['time_limit'] is not None:
+            learner.deadline = start_timestamp + _context['time_limit']
+            experimenter.deadline = learner.deadline - reserve
         experimenter.run()
+        end_of_tests = timer()
+        resumed_tests = False
 
-        # 2. Create the datasets
-        data = experimenter.analyzer.get_dataset()
-        data.to_csv(join(app_path.exp_dir('data'), "it_{}_raw.csv".format(it)), index=False, encoding='utf-8')
+        # 2. Store the samples of the iteration, the files of the datasets of the iterations are generated from the
+        #    store on demand by the report (fuzzsdn experiment report --export-datasets)
+        data = experimenter.analyzer.get_dataset(failure_under_test=_context['fut'], debug=True, from_iteration=it)
+        store.append(app_path.exp_dir('data'), it, data)
 
-        # Write the formatted data to the file
+        # Write the dataset to learn from to a temporary arff file
         data = experimenter.analyzer.get_dataset(failure_under_test=_context['fut'])
-        data.to_csv(join(app_path.exp_dir('data'), "it_{}.csv".format(it)), index=False, encoding='utf-8')
-
-        # Write the debug dataset to the file
-        data = experimenter.analyzer.get_dataset(failure_under_test=_context['fut'], debug=True)
-        data.to_csv(join(app_path.exp_dir('data'), "it_{}_debug.csv".format(it)), index=False, encoding='utf-8')
-
-        # Convert the set to an arff file
+        data.to_csv(join(app_path.tmp_dir(), "dataset.csv"), index=False, encoding='utf-8')
         csv_ops.to_arff(
-            csv_path=join(app_path.exp_dir('data'), "it_{}.csv".format(it)),
-            arff_path=join(app_path.exp_dir('data'), "it_{}.arff".format(it)),
+            csv_path=join(app_path.tmp_dir(), "dataset.csv"),
+            arff_path=join(app_path.tmp_dir(), "dataset.arff"),
             csv_sep=',',
             relation='dataset_iteration_{}'.format(it)
         )
@@ -258,7 +346,7 @@ def run(
         # 3. Perform machine learning algorithms
         start_of_ml = timer()
         try:
-            learner.load_data(join(app_path.exp_dir('data'), "it_{}.arff".format(it)))
+            learner.load_data(join(app_path.tmp_dir(), "dataset.arff"))
             ml_model = learner.learn()
         except Exception:
             _log.exception("An exception occurred while trying to create a models")
@@ -299,8 +387,12 @@ def run(
             recall = 0.0
         end_of_plan = timer()  # End of planning measurement
 
+        # The rules of the model, with their budgets, are used by the next iteration
+        rule_set = ml_model.ruleset if ml_model is not None else RuleSet()
+
         # End of iteration total time
         end_of_it = timer()
+        reserve = end_of_it - end_of_tests
 
         # Update the timing statistics and classifier statistics and save them to a file
         Stats.add_iteration_statistics(
@@ -310,7 +402,10 @@ def run(
             planning_time=(end_of_plan - st_of_plan),
             iteration_time=end_of_it - start_of_it,
             learner=learner,
-            model=ml_model
+            model=ml_model,
+            wait_time=experimenter.wait_time,
+            completion_time=experimenter.completion_time,
+            timeouts=experimenter.timeouts
         )
         Stats.save(join(app_path.exp_dir(), 'stats.json'), pretty=True)
 
@@ -322,8 +417,13 @@ def run(
             if it >= _context['it_limit']:
                 keep_running = False
         if _context['time_limit'] is not None:
-            if timer() - start_timestamp >= _context['time_limit']:
+            # The tests stopped early for the last learning to complete in time, there is no time left for another
+            if timer() - start_timestamp >= _context['time_limit'] or experimenter.deadline_reached is True:
                 keep_running = False
+
+        # Save the end of the iteration, the tests of the next one start from scratch
+        experimenter.end_run()
+        save_checkpoint(finished=not keep_running)
     # End of main loop
 # End def run
 
@@ -549,6 +649,10 @@ def cleanup(*args):
             FuzzerDriver.stop()
             OnosDriver.stop()
             RyuDriver.stop()
+            PrivilegedDriver.stop()
+
+            # Stop what the drivers may have left running
+            supervisor.stop_all()
 
         except Exception:
             _log.exception("An exception occurred while stopping the SDN controllers...")
@@ -600,24 +704,32 @@ def cleanup(*args):
 
 # TODO: Check for sudo permissions otherwise ask for password
 def main(
-        scenario,
-        criterion,
-        failure_under_test,
-        samples,
-        method,
-        budget,
-        ml_algorithm,
-        ml_filter,
-        ml_cv_folds,
-        mutation_rate,
+        scenario=None,
+        criterion=None,
+        failure_under_test=None,
+        samples=None,
+        method=None,
+        budget=None,
+        ml_algorithm=None,
+        ml_filter=None,
+        ml_cv_folds=None,
+        mutation_rate=None,
         scenario_options : Optional[dict] = None,
         criterion_kwargs : Optional[dict] = None,
         limit : Optional[Iterable] = None,
-        reference : Optional[Union[str, int, float]] = None
+        reference : Optional[Union[str, int, float]] = None,
+        workers : int = 1,
+        sequence_length : int = 1,
+        pipeline : bool = False,
+        mode : str = 'new'
 ) -> None:
 
     global _crashed
 
+    # An experiment is resumed from the checkpoint saved in its directory
+    if mode == 'resume' and reference is None:
+        raise ValueError("The reference of the experiment to resume is required")
+
     # Create cleanup signal
     for sig in (signal.SIGABRT, signal.SIGILL, signal.SIGINT, signal.SIGSEGV, signal.SIGTERM, signal.SIGQUIT):
         signal.signal(sig, cleanup)
@@ -652,7 +764,7 @@ def main(
 
         # Launch run function
         run(
-            mode='new',
+            mode=mode,
             scenario=scenario,
             criterion=criterion,
             failure_under_test=failure_under_test,
@@ -665,7 +777,10 @@ def main(
             mutation_rate=mutation_rate,
             scenario_options=scenario_options,
             criterion_kwargs=criterion_kwargs,
-            limit=limit
+            limit=limit,
+            workers=workers,
+            sequence_length=sequence_length,
+            pipeline=pipeline
         )
 
     except KeyboardInterrupt:
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Module to run several SDN test environments side by side on the same host.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from fuzzsdn.app import setup
+from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, RyuDriver
+from fuzzsdn.common import app_path
+
+# ===== ( Globals definition ) =========================================================================================
+
+MININET_LISTEN_PORT = 6654  # First passive listening port used by the Mininet switches
+LISTEN_PORT_RANGE   = 100   # Number of listening ports reserved to the switches of each sandbox
+
+_log = logging.getLogger(__name__)
+_CURRENT : Optional['Sandbox'] = None
+
+
+# ===== ( Sandbox class ) ==============================================================================================
+
+class Sandbox:
+    """An isolated SDN test environment (controller, fuzzer and Mininet network).
+
+    Each sandbox has its own controller port, fuzzer port, fuzzer instruction and report files, log directory and
+    Mininet node names, so several sandboxes can run tests at the same time.
+
+    Args:
+        index (int): index of the sandbox. The ports of the sandbox are offset by this index.
+        controller (str): name of the controller used by the sandbox ('onos' or 'ryu').
+    """
+
+    def __init__(self, index: int, controller: str):
+        self.index      = index
+        self.name       = "sb{}".format(index)
+        self.controller = controller
+
+        # Ports
+        self.controller_port    = int(setup.config()[controller].port) + index
+        self.fuzzer_port        = int(setup.config().fuzzer.port) + index
+        self.control_port       = int(setup.config().fuzzer.get('control_port', 52625)) + index
+        self.listen_port        = MININET_LISTEN_PORT + LISTEN_PORT_RANGE * (index + 1)
+
+        # Paths
+        self.root_dir       = os.path.join(app_path.run_dir(), 'sandboxes', self.name)
+        self.log_dir        = os.path.join(self.root_dir, 'log')
+        self.instr_path     = os.path.join(self.root_dir, 'fuzzer_instr.json')
+        self.report_path    = os.path.join(self.root_dir, 'fuzz_report.json')
+    # End def __init__
+
+    def apply(self):
+        """Configure the current process to run its tests in the sandbox."""
+        global _CURRENT
+
+        _log.info("Entering sandbox \"{}\" (controller port: {}, fuzzer port: {})".format(self.name,
+                                                                                          self.controller_port,
+                                                                                          self.fuzzer_port))
+        Path(self.log_dir).mkdir(parents=True, exist_ok=True)
+
+        # Override the configuration of the application
+        setup.config()[self.controller].set('port', self.controller_port)
+        if self.controller == 'ryu':
+            setup.config().ryu.set('log_dir', self.log_dir)
+        setup.config().fuzzer.set('port', self.fuzzer_port)
+        setup.config().fuzzer.set('control_port', self.control_port)
+        setup.config().fuzzer.set('instr_path', self.instr_path)
+        setup.config().fuzzer.set('out_path', self.report_path)
+
+        # Configure the drivers
+        FuzzerDriver.set_jvm_properties({
+            'SDNSwitchPort'             : self.fuzzer_port,
+            'SDNControllerOpenflowPort' : self.controller_port,
+            'InstructionsPath'          : self.instr_path,
+            'ReportPath'                : self.report_path
+        })
+        MininetDriver.set_sandbox(prefix=self.name, listen_port=self.listen_port)
+
+        _CURRENT = self
+    # End def apply
+
+    def release(self):
+        """Stop the fuzzer, the controller and the network started by the current process in the sandbox."""
+        _log.info("Releasing sandbox \"{}\"".format(self.name))
+        try:
+            MininetDriver.stop()
+            FuzzerDriver.stop()
+            if self.controller == 'ryu':
+                RyuDriver.stop()
+        except Exception:
+            _log.exception("An exception occurred while releasing sandbox \"{}\"".format(self.name))
+    # End def release
+
+    def __repr__(self):
+        return "Sandbox({})".format(self.name)
+# End class Sandbox
+
+
+# ===== ( Functions ) ==================================================================================================
+
+def current() -> Optional[Sandbox]:
+    """Returns the sandbox the current process runs in, or None if it does not run in a sandbox."""
+    return _CURRENT
+# End def current
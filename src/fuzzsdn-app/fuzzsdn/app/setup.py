@@ -51,6 +51,20 @@ class ConfigurationSection(object):
         return self.__parser.options(self.__name)
 
     # End def __getattr__
+
+    def get(self, option, fallback=None):
+        """Returns the value of an option, or fallback if the option is not in the configuration file."""
+        try:
+            return self.__getattr__(option)
+        except KeyError:
+            return fallback
+    # End def get
+
+    def set(self, option, value):
+        """Override the value of an option for the current process. Changes are not saved in the configuration file."""
+        self.__parser.set(self.__name, option, str(value))
+        self.__cache.pop(option, None)
+    # End def set
 # End class ConfigurationSection
 
 
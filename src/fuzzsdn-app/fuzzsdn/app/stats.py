@@ -1,3 +1,4 @@
+import copy
 import json
 from typing import Optional
 
@@ -22,8 +23,23 @@ class Stats:
         cls._stats['context']['time_limit']             = context['time_limit']
         cls._stats['context']['samples_per_iteration']  = context['nb_of_samples']
         cls._stats['context']['mutation_rate']          = context['mutation_rate']
+        cls._stats['context']['workers']                = context['workers']
+        cls._stats['context']['sequence_length']        = context['sequence_length']
+        cls._stats['context']['pipeline']               = context['pipeline']
     # End def __init__
 
+    @classmethod
+    def state(cls) -> dict:
+        """Returns the statistics, to be saved in a checkpoint."""
+        return copy.deepcopy(cls._stats)
+    # End def state
+
+    @classmethod
+    def restore(cls, state: dict):
+        """Restore the statistics from a checkpoint."""
+        cls._stats = copy.deepcopy(state)
+    # End def restore
+
     @classmethod
     def save(cls, path: str, pretty : bool = False):
         """
@@ -49,7 +65,10 @@ class Stats:
             planning_time,
             iteration_time,
             learner : Learner,
-            model: Optional[Model]
+            model: Optional[Model],
+            wait_time : Optional[dict] = None,
+            completion_time : Optional[list] = None,
+            timeouts : Optional[dict] = None
     ):
         # List the classes
         target_class, other_class = cls._stats["context"]["target_class"], cls._stats["context"]["other_class"]
@@ -63,6 +82,9 @@ class Stats:
         cls._stats['timing']['testing']     += [float(testing_time)]
         cls._stats['timing']['planning']    += [float(planning_time)]
         cls._stats['timing']['fuzzing']     += [float(fuzzing_time)]
+        cls._stats['timing']['readiness']   += [dict(wait_time) if wait_time is not None else dict()]
+        cls._stats['timing']['completion']  += [list(completion_time) if completion_time is not None else list()]
+        cls._stats['timing']['timeouts']    += [dict(timeouts) if timeouts is not None else dict()]
 
         # Add the information about the data
         count = learner.get_instances_count()
@@ -148,6 +170,9 @@ class Stats:
         stats['context']['criterion']['kwargs']         = dict()
         stats['context']['it_limit']                    = None
         stats['context']['time_limit']                  = None
+        stats['context']['workers']                     = 1
+        stats['context']['sequence_length']             = 1
+        stats['context']['pipeline']                    = False
         stats['context']['iterations']                  = int()
         stats['context']['algorithm']                   = str()
         stats['context']['filter']                      = str()
@@ -161,6 +186,9 @@ class Stats:
         stats['timing']['planning']                     = list()
         stats['timing']['learning']                     = list()
         stats['timing']['iteration']                    = list()
+        stats['timing']['readiness']                    = list()  # Time spent waiting for each component
+        stats['timing']['completion']                   = list()  # Time spent waiting for the fuzzer, per sample
+        stats['timing']['timeouts']                     = list()  # Number of timeouts of each phase of the tests
 
         # Information on the data
         stats['data']                                   = dict()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Module to know the outcome of a test while it runs.
+
+The logs of the controller are followed in the background during the test. Once they decide its outcome, the waits of
+the scenario (pings, settle time of the controller) can be cut short.
+"""
+import logging
+import threading
+from typing import Callable, Optional
+
+# ===== ( Globals definition ) =========================================================================================
+
+_log = logging.getLogger(__name__)
+_CURRENT : Optional['VerdictFollower'] = None
+
+
+# ===== ( VerdictFollower class ) ======================================================================================
+
+class VerdictFollower:
+    """Polls a verdict function in a background thread until it reports a final verdict or it is stopped.
+
+    Args:
+        poll (Callable): Function that reads the new logs and returns True when the outcome of the test is final.
+        interval (float): Interval in seconds between two polls.
+    """
+
+    def __init__(self, poll: Callable[[], bool], interval: float = 0.1):
+        self.interval   = interval
+
+        self.__poll     = poll
+        self.__final    = threading.Event()
+        self.__stopped  = threading.Event()
+        self.__thread   = threading.Thread(target=self.__run, name="verdict-follower", daemon=True)
+    # End def __init__
+
+    def start(self):
+        """Start following the logs."""
+        self.__thread.start()
+    # End def start
+
+    def stop(self):
+        """Stop following the logs and wait for the last poll to end."""
+        self.__stopped.set()
+        if self.__thread.is_alive():
+            self.__thread.join()
+    # End def stop
+
+    def is_final(self) -> bool:
+        """Returns True if the outcome of the test is final."""
+        return self.__final.is_set()
+    # End def is_final
+
+    def __run(self):
+        while not self.__stopped.is_set():
+            try:
+                if self.__poll() is True:
+                    _log.debug("The outcome of the test is final, the remaining waits are cut short")
+                    self.__final.set()
+                    return
+            except Exception:
+                # Following the logs is only an optimization, the logs are still analyzed after the test
+                _log.exception("An exception occurred while following the logs, the test won't be cut short")
+                return
+            self.__stopped.wait(self.interval)
+    # End def __run
+# End class VerdictFollower
+
+
+# ===== ( Functions ) ==================================================================================================
+
+def follow(poll: Callable[[], bool], interval: float = 0.1):
+    """Start following the outcome of the current test.
+
+    Args:
+        poll (Callable): Function that reads the new logs and returns True when the outcome of the test is final.
+        interval (float): Interval in seconds between two polls.
+    """
+    global _CURRENT
+    stop_following()
+    _CURRENT = VerdictFollower(poll, interval)
+    _CURRENT.start()
+# End def follow
+
+
+def stop_following():
+    """Stop following the outcome of the current test."""
+    global _CURRENT
+    if _CURRENT is not None:
+        _CURRENT.stop()
+        _CURRENT = None
+# End def stop_following
+
+
+def is_final() -> bool:
+    """Returns True if the outcome of the current test is already known. Always False when no test is followed."""
+    follower = _CURRENT
+    return follower is not None and follower.is_final()
+# End def is_final
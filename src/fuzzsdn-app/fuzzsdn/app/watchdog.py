@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Module to cap the time taken by each phase of a test.
+
+Each phase of a test (before_each, test, finish_analysis, after_each) is given a deadline, set by the options
+"timeout_<phase>" of the configuration file. When a phase exceeds its deadline, a PhaseTimeout is raised in the main
+thread by SIGALRM, which interrupts the blocking call in progress (pexpect, subprocess, socket, sleep), so that the
+experimenter can reset the sandbox and move on to the next test.
+"""
+import contextlib
+import logging
+import signal
+import threading
+from timeit import default_timer as timer
+from typing import Dict
+
+from fuzzsdn.app import setup
+
+# ===== ( Globals definition ) =========================================================================================
+
+PHASES = ('before_each', 'test', 'finish_analysis', 'after_each')
+DEFAULT_DEADLINES = {
+    'before_each'       : 600.0,
+    'test'              : 300.0,
+    'finish_analysis'   : 120.0,
+    'after_each'        : 300.0,
+}
+
+_log = logging.getLogger(__name__)
+_timeouts : Dict[str, int] = dict()
+
+
+# ===== ( PhaseTimeout exception ) =====================================================================================
+
+class PhaseTimeout(BaseException):
+    """Raised when a phase of a test exceeds its deadline.
+
+    It derives from BaseException, like KeyboardInterrupt, so that the "except Exception" clauses of the drivers and of
+    the scenarios don't swallow it and resume the phase.
+
+    Args:
+        phase (str): The phase which exceeded its deadline.
+        deadline (float): The deadline of the phase, in seconds.
+    """
+
+    def __init__(self, phase: str, deadline: float):
+        super().__init__("Phase \"{}\" exceeded its deadline of {}s".format(phase, deadline))
+        self.phase      = phase
+        self.deadline   = deadline
+    # End def __init__
+# End class PhaseTimeout
+
+
+# ===== ( Functions ) ==================================================================================================
+
+def deadline(name: str) -> float:
+    """Returns the deadline in seconds of a phase. A deadline of 0 means that the phase has no deadline."""
+    return float(setup.config().general.get('timeout_{}'.format(name), DEFAULT_DEADLINES.get(name, 0)) or 0)
+# End def deadline
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """Context in which a phase of a test runs. A PhaseTimeout is raised in the context when the phase exceeds its
+    deadline, and the timeout is counted.
+
+    The deadline is only enforced in the main thread, where the signals are handled. Phases can be nested, the deadline
+    of the outer phase still applies in the inner one.
+
+    Args:
+        name (str): The name of the phase.
+    """
+    seconds = deadline(name)
+    if seconds <= 0 or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_alarm(*_):
+        raise PhaseTimeout(name, seconds)
+
+    start = timer()
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    previous_delay, _ = signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    except PhaseTimeout as e:
+        if e.phase == name:
+            _log.error(str(e))
+            _timeouts[name] = _timeouts.get(name, 0) + 1
+        raise
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if previous_delay > 0:
+            # Give back the remaining time of the outer phase, which expires right away if it is already over
+            signal.setitimer(signal.ITIMER_REAL, max(previous_delay - (timer() - start), 0.001))
+# End def phase
+
+
+def pop_timeouts() -> Dict[str, int]:
+    """Returns the number of timeouts of each phase since the last call, and reset them."""
+    timeouts = dict(_timeouts)
+    _timeouts.clear()
+    return timeouts
+# End def pop_timeouts
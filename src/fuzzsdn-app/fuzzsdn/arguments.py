@@ -53,6 +53,7 @@ class ExperimentCommand(StrEnum):
     # Nodes main command
     LIST       = 'list',
     REPORT     = 'report',
+    RESUME     = 'resume',
     RUN        = 'run',
     STATUS     = 'status'
 
@@ -463,6 +464,54 @@ def parse(args: Optional[Iterable] = None):
         help="Override the number of samples. (default: %(default)s)"
     )
 
+    # Argument to choose the number of tests to run at the same time
+    expt_run_cmd.add_argument(
+        '-w',
+        '--workers',
+        metavar='',
+        type=int,
+        default=1,
+        choices=ArgRange(1, math.inf),
+        dest='workers',
+        help="Number of sandboxes running tests at the same time. (default: %(default)s)"
+    )
+
+    # Argument to choose the number of tests run in the same controller session
+    expt_run_cmd.add_argument(
+        '--sequence-length',
+        metavar='',
+        type=int,
+        default=1,
+        choices=ArgRange(1, math.inf),
+        dest='sequence_length',
+        help="Number of fuzzed packets tested in the same controller session. The session is restarted earlier if a "
+             "failure is observed. (default: %(default)s)"
+    )
+
+    # Argument to prepare the environment of the next test while the current test is analyzed
+    expt_run_cmd.add_argument(
+        '--pipeline',
+        action='store_true',
+        default=False,
+        dest='pipeline',
+        help="Alternate the tests between two sandboxes, so that the environment of the next test is prepared while "
+             "the current test is analyzed and torn down. The tests themselves still run one at a time."
+    )
+
+    # ===== ( EXPERIMENT RESUME Command ) ======
+
+    expt_resume_cmd = expt_cmd_parser.add_parser(
+        name=ExperimentCommand.RESUME,
+        help='Resume an interrupted experiment from its last checkpoint.'
+    )
+
+    expt_resume_cmd.add_argument(
+        'reference',
+        metavar='REFERENCE',
+        type=str,
+        help="Reference of the experiment to resume"
+    )
+
     # ===== ( EXPERIMENT LIST Command ) ======
 
     expt_list_cmd = expt_cmd_parser.add_parser(
@@ -522,6 +571,20 @@ def parse(args: Optional[Iterable] = None):
     )
     dl_cmd_group.set_defaults(download=True)
 
+    # Write the per-iteration files of the datasets from the dataset store of the experiment
+    expt_rpt_cmd.add_argument(
+        '-e',
+        '--export-datasets',
+        nargs='*',
+        choices=('raw', 'labeled', 'debug', 'arff'),
+        default=None,
+        dest='export_datasets',
+        metavar='VIEW',
+        help="Write the files of the datasets of each iteration (it_<i>_raw.csv, it_<i>.csv, it_<i>_debug.csv or "
+             "it_<i>.arff) to the data folder of the report, for the tools which read them. Available views are "
+             "'raw', 'labeled', 'debug' and 'arff'. All of them are written if none is given."
+    )
+
     expt_rpt_cmd.add_argument(
         '-t',
         '--test-on-data',
@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 """
 A class to manipulate all operations with a database
+
+The connection is kept open between the operations. Rows inserted with `Database.insert` are buffered and written with
+one executemany per statement, in a single transaction, when the buffer holds `batch_size` rows or when its oldest row
+is older than `flush_interval` seconds. The buffer is flushed before any other statement runs and before disconnecting,
+so that reads always see the buffered rows.
+
+Two backends are supported: "mysql", which connects to a MySQL server, and "sqlite", which stores each database in a
+file "<name>.db" of a directory, in WAL mode, and needs no server.
 """
 
 import copy
 import logging
-from typing import Optional, Tuple
+import os
+import sqlite3
+from timeit import default_timer as timer
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import mysql.connector
 from mysql.connector import MySQLConnection
@@ -16,6 +27,21 @@ from mysql.connector import MySQLConnection
 
 logger : logging.Logger = logging.getLogger(__name__)
 
+BACKENDS = ('mysql', 'sqlite')
+_SQLITE_INT_RANGE = range(-2 ** 63, 2 ** 63)  # Range of the integers of SQLite
+
+
+def _sqlite_adapt_int(value: int):
+    # SQLite integers are signed 64-bit integers, the unsigned 64-bit values of the packet fields which don't fit are
+    # stored as blobs, which are not converted by the column affinity, and read back by _sqlite_convert_int
+    return value if value in _SQLITE_INT_RANGE else str(value).encode()
+# End def _sqlite_adapt_int
+
+
+def _sqlite_convert_int(value: bytes) -> int:
+    return int(value)
+# End def _sqlite_convert_int
+
 # ======================================================================================================================
 # Class Database
 # ======================================================================================================================
@@ -32,21 +58,33 @@ class Database:
     __user     : Optional[str] = None
     __password : Optional[str] = None
     __database : Optional[str] = None
+    __backend  : str = 'mysql'
+    __directory: Optional[str] = None  # Directory of the SQLite databases
 
-    # Connection and cursor used by MySQLdb
-    __db_connection : Optional[MySQLConnection] = None
-    __db_cursor     : Optional[MySQLConnection.cursor] = None
+    # Connection and cursor used by MySQLdb or sqlite3
+    __db_connection : Optional[Union[MySQLConnection, sqlite3.Connection]] = None
+    __db_cursor     : Optional[Union[MySQLConnection.cursor, sqlite3.Cursor]] = None
 
     # Internals
     __is_init      : bool = False
     __is_connected : bool = False
+    __owner        : Optional[int] = None  # pid of the process which opened the connection
+    __inherited    : list = list()  # Connections inherited from the parent process
+
+    # Buffered inserts, by statement
+    __pending       : Dict[str, List[tuple]] = dict()
+    __pending_rows  : int = 0
+    __pending_since : Optional[float] = None
+    __batch_size    : int = 1
+    __flush_interval: float = 0.0
 
     # ------------------------------------------------------------------------------------------------------------------
     # Initialization
     # ------------------------------------------------------------------------------------------------------------------
 
     @classmethod
-    def init(cls, hostname : str, username : str, password : str, force : bool = False) -> None:
+    def init(cls, hostname : Optional[str] = None, username : Optional[str] = None, password : Optional[str] = None,
+             force : bool = False, backend : str = 'mysql', directory : Optional[str] = None) -> None:
         """
         Initialize the database.
 
@@ -60,7 +98,18 @@ class Database:
             force:
                 Force the initialization even if the class is already initialized.
                 Defaults to False.
+            backend:
+                Engine of the database, either 'mysql' or 'sqlite'. The hostname, username and password are only
+                used by 'mysql'. Defaults to 'mysql'.
+            directory:
+                Directory of the files of the databases, used by 'sqlite'.
         """
+        if backend not in BACKENDS:
+            raise ValueError("Unknown database backend '{}'. Available backends are: {}".format(backend,
+                                                                                               ", ".join(BACKENDS)))
+        if backend == 'sqlite' and directory is None:
+            raise ValueError("The 'sqlite' backend requires a directory")
+
         if cls.__is_connected is True:
             if force is True:
                 cls.disconnect()
@@ -70,6 +119,8 @@ class Database:
         cls.__host = hostname
         cls.__user = username
         cls.__password = password
+        cls.__backend = backend
+        cls.__directory = directory
 
         cls.__log = logging.getLogger(__name__)
         cls.__is_init = True
@@ -90,12 +141,16 @@ class Database:
             cls.init(hostname=cls.__host,
                      password=cls.__password,
                      username=cls.__user,
-                     force=True)
+                     force=True,
+                     backend=cls.__backend,
+                     directory=cls.__directory)
             cls.connect(db)
         else:
             cls.init(hostname=cls.__host,
                      password=cls.__password,
-                     username=cls.__user)
+                     username=cls.__user,
+                     backend=cls.__backend,
+                     directory=cls.__directory)
     # End def init
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -109,23 +164,26 @@ class Database:
 
         db -- Parameter specifying the database
         """
-        if cls.__is_connected is True:
+        if cls.is_connected() is True:
             cls.disconnect()
 
         cls.__database = db
-        try:
-            cls.__db_connection = mysql.connector.connect(host=cls.__host,
-                                                          user=cls.__user,
-                                                          password=cls.__password,
-                                                          database=cls.__database)
-        except Exception as e:
-            logger.exception("Exception '{}' happened while connecting:".format(e))
-            raise RuntimeError("Can't connect to the database")
-        else:
-            cls.__db_cursor = cls.__db_connection.cursor(buffered=True)
-            cls.__is_connected = True
+        cls.__db_connection, cls.__db_cursor = cls.__open(db)
+        cls.__is_connected = True
+        cls.__owner = os.getpid()
     # End def connect
 
+    @classmethod
+    def ensure_connected(cls, db):
+        """
+        Connect to the database, unless the connection to it is already open.
+
+        db -- Parameter specifying the database
+        """
+        if cls.is_connected() is False or cls.__database != db:
+            cls.connect(db)
+    # End def ensure_connected
+
     @classmethod
     def get_connection(cls, db):
         """
@@ -138,16 +196,32 @@ class Database:
             cls.disconnect()
 
         cls.__database = db
+        return cls.__open(db)
+
+    @classmethod
+    def __open(cls, db):
+        """Open a connection to a database with the backend, and returns it with its cursor."""
         try:
+            if cls.__backend == 'sqlite':
+                sqlite3.register_adapter(int, _sqlite_adapt_int)
+                sqlite3.register_converter('BIGINT', _sqlite_convert_int)
+                connection = sqlite3.connect(os.path.join(cls.__directory, "{}.db".format(db)),
+                                             detect_types=sqlite3.PARSE_DECLTYPES)
+                # Readers don't block the writer, and the commits are not synced until the checkpoints of the WAL
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute('PRAGMA synchronous=NORMAL')
+                return connection, connection.cursor()
+
             connection = mysql.connector.connect(host=cls.__host,
                                                  user=cls.__user,
                                                  password=cls.__password,
-                                                 database=cls.__database)
+                                                 database=db)
         except Exception as e:
             logger.exception("Exception '{}' happened while connecting:".format(e))
             raise RuntimeError("Can't connect to the database")
         else:
             return connection, connection.cursor(buffered=True)
+    # End def __open
 
     @classmethod
     def get_cursor(cls) -> Tuple[MySQLConnection, MySQLConnection.cursor]:
@@ -159,9 +233,10 @@ class Database:
     @classmethod
     def disconnect(cls):
         """
-        Disconnect from the database.
+        Disconnect from the database. The buffered rows are written beforehand.
         """
-        if cls.__is_connected is True:
+        if cls.is_connected() is True:
+            cls.flush()
             if cls.__db_cursor is not None:
                 cls.__db_cursor.close()
                 cls.__db_cursor = None
@@ -175,6 +250,16 @@ class Database:
         """
         Get the connection status of the db.
         """
+        if cls.__is_connected is True and cls.__owner != os.getpid():
+            # A forked process inherits the connection of its parent, which it must neither use nor close, as both would
+            # break the connection for the parent. It forgets it, and the rows buffered by the parent with it. The
+            # connection is kept referenced, so that it is not closed when it is garbage collected either.
+            cls.__inherited.append((cls.__db_connection, cls.__db_cursor))
+            cls.__db_connection = None
+            cls.__db_cursor = None
+            cls.__is_connected = False
+            cls.__clear_pending()
+
         # We send a copy so the status can't be modified without actually disconnecting
         return copy.copy(cls.__is_connected)
 
@@ -190,10 +275,24 @@ class Database:
         if cls.__is_connected is False:
             raise RuntimeError("Not connected to any database")
 
+        cls.flush()
         cls.__db_cursor.execute(query, parameters or ())
         logger.debug("SQL Command: {} {}".format(query, parameters if not None else ''))
     # End def execute
 
+    @classmethod
+    def executemany(cls, query, seq_of_parameters: Sequence[tuple]):
+        """
+        Execute a parameterized query once for each set of parameters.
+        """
+        if cls.__is_connected is False:
+            raise RuntimeError("Not connected to any database")
+
+        cls.flush()
+        cls.__db_cursor.executemany(query, seq_of_parameters)
+        logger.debug("SQL Command: {} ({} rows)".format(query, len(seq_of_parameters)))
+    # End def executemany
+
     @classmethod
     def query(cls, query, parameters=None):
         """
@@ -202,6 +301,7 @@ class Database:
         if cls.__is_connected is False:
             raise RuntimeError("Not connected to any database")
 
+        cls.flush()
         cls.__db_cursor.execute(query, parameters or ())
         logger.debug("SQL Command: {} {}".format(query, parameters if not None else ''))
         cls.commit()
@@ -257,10 +357,97 @@ class Database:
         return cls.__db_cursor.fetchmany(size=size)
     # End def fetchone
 
+    # ------------------------------------------------------------------------------------------------------------------
+    # Batched inserts
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @classmethod
+    def set_batching(cls, batch_size : int = 1, flush_interval : float = 0.0):
+        """
+        Set when the buffered rows are written.
+
+        Args:
+            batch_size:
+                Number of buffered rows which triggers a flush. 1 writes each row when it is inserted.
+            flush_interval:
+                Age in seconds of the oldest buffered row which triggers a flush, checked when a row is inserted.
+                0 disables the time limit.
+        """
+        cls.__batch_size = max(int(batch_size), 1)
+        cls.__flush_interval = max(float(flush_interval), 0.0)
+    # End def set_batching
+
+    @classmethod
+    def insert(cls, query, parameters : tuple):
+        """
+        Buffer a row to be inserted with a parameterized query. The buffer is flushed when it is full or too old.
+        """
+        if cls.__is_connected is False:
+            raise RuntimeError("Not connected to any database")
+
+        if cls.__pending_rows == 0:
+            cls.__pending_since = timer()
+        cls.__pending.setdefault(query, list()).append(tuple(parameters))
+        cls.__pending_rows += 1
+
+        if cls.__pending_rows >= cls.__batch_size or \
+                (cls.__flush_interval > 0 and timer() - cls.__pending_since >= cls.__flush_interval):
+            cls.flush()
+    # End def insert
+
+    @classmethod
+    def flush(cls):
+        """
+        Write the buffered rows in a single transaction.
+        """
+        if cls.__pending_rows == 0 or cls.__is_connected is False:
+            return
+
+        pending = cls.__pending
+        cls.__clear_pending()
+        try:
+            for query, rows in pending.items():
+                cls.__db_cursor.executemany(query, rows)
+                logger.debug("SQL Command: {} ({} rows)".format(query, len(rows)))
+            cls.__db_connection.commit()
+        except Exception:
+            cls.__db_connection.rollback()
+            raise
+    # End def flush
+
+    @classmethod
+    def has_pending(cls) -> bool:
+        """
+        Return True if some rows are buffered and not written yet.
+        """
+        return cls.__pending_rows > 0
+    # End def has_pending
+
+    @classmethod
+    def __clear_pending(cls):
+        cls.__pending = dict()
+        cls.__pending_rows = 0
+        cls.__pending_since = None
+    # End def __clear_pending
+
     # ------------------------------------------------------------------------------------------------------------------
     # Database management
     # ------------------------------------------------------------------------------------------------------------------
 
+    @classmethod
+    def get_backend(cls) -> str:
+        """
+        Get the engine of the database.
+        """
+        return cls.__backend
+
+    @classmethod
+    def placeholder(cls) -> str:
+        """
+        Get the placeholder of the parameters of the queries for the backend.
+        """
+        return '?' if cls.__backend == 'sqlite' else '%s'
+
     @classmethod
     def get_database(cls):
         """
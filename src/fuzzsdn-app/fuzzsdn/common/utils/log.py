@@ -3,6 +3,8 @@
 import logging
 import os
 import threading
+from collections import deque
+from typing import List
 
 
 # ====== ( Utility classes ) ===========================================================================================
@@ -43,6 +45,58 @@ class LogPipe(threading.Thread):
     # End def close()
 # End class LogPipe
 
+
+class RingBufferHandler(logging.Handler):
+    """A logging handler that keeps the last formatted records in memory.
+
+    Each record gets a position, which keeps increasing when the oldest records are dropped from the buffer, so that a
+    reader can mark a position and later read only the records emitted after it.
+    """
+
+    def __init__(self, capacity: int = 10000, level=logging.NOTSET):
+        """Set up the handler with the maximum number of records to keep."""
+        logging.Handler.__init__(self, level)
+        self.__records = deque(maxlen=capacity)
+        self.__position = 0
+    # End def __init__
+
+    def emit(self, record):
+        """Format a record and add it to the buffer."""
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self.__records.append(msg)
+        self.__position += 1
+    # End def emit
+
+    def position(self) -> int:
+        """Return the position of the next record to be emitted."""
+        with self.lock:
+            return self.__position
+    # End def position
+
+    def lines(self, since: int = 0) -> List[str]:
+        """Return the records emitted since a position which are still in the buffer."""
+        with self.lock:
+            first = self.__position - len(self.__records)
+            return list(self.__records)[max(since - first, 0):]
+    # End def lines
+
+    def text(self, since: int = 0) -> str:
+        """Return the records emitted since a position as a single text, one record per line."""
+        lines = self.lines(since)
+        return "\n".join(lines) + "\n" if len(lines) > 0 else ""
+    # End def text
+
+    def clear(self):
+        """Remove all the records from the buffer."""
+        with self.lock:
+            self.__records.clear()
+    # End def clear
+# End class RingBufferHandler
+
 # ====== ( Utility functions ) =========================================================================================
 
 
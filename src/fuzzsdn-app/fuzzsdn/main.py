@@ -41,7 +41,8 @@ def main():
                 node=args.node,
                 ignore_existing=not args.force_download,
                 disable_fetching=not args.download,
-                test_on_data=args.test_on_data
+                test_on_data=args.test_on_data,
+                export_datasets=args.export_datasets
             )
 
         # List the available experiments
@@ -60,9 +61,16 @@ def main():
                 mutation_rate=args.mutation_rate,
                 criterion_kwargs=args.criterion_kwargs,
                 limit=args.limit,
-                reference=args.reference
+                reference=args.reference,
+                workers=args.workers,
+                sequence_length=args.sequence_length,
+                pipeline=args.pipeline
             )
 
+        # Resume an interrupted experiment
+        elif args.expt_cmd == ExperimentCommand.RESUME:
+            app_main(mode='resume', reference=args.reference)
+
         # List the Re experiments
         elif args.expt_cmd == ExperimentCommand.LIST:
             list_available_experiments(node=args.node)
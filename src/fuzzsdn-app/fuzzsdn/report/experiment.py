@@ -12,7 +12,7 @@ from concurrent.futures import ThreadPoolExecutor
 from os.path import join
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Optional
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
@@ -26,7 +26,7 @@ from fuzzsdn.common import app_path
 from fuzzsdn.common.metrics import density, fraction_of_borderline_points, geometric_diversity, imbalance_ratio, standard_deviation
 from fuzzsdn.common.utils import terminal
 from fuzzsdn.common.utils.terminal import progress_bar
-from fuzzsdn.app.experiment import Model
+from fuzzsdn.app.experiment import Model, store
 
 print_evl_data  = True
 display_graphs  = False
@@ -55,11 +55,11 @@ def calculate_metrics(experiment, compute_n1=True, compute_ir=True, compute_dens
 
     # Create the parameters
     for i in range(iterations):
-        param_ir        = (i, ir      , join(paths.data, 'it_{}.csv'.format(i)))
-        param_gd        = (i, gd      , join(paths.data, 'it_{}.csv'.format(i)))
-        param_n1        = (i, n1      , join(paths.data, 'it_{}.csv'.format(i)))
-        param_density   = (i, density_, join(paths.data, 'it_{}.csv'.format(i)))
-        param_std       = (i, std_    , join(paths.data, 'it_{}.csv'.format(i)))
+        param_ir        = (i, ir      )
+        param_gd        = (i, gd      )
+        param_n1        = (i, n1      )
+        param_density   = (i, density_)
+        param_std       = (i, std_    )
 
         ir_map += [param_ir]
         gd_map += [param_gd]
@@ -69,29 +69,29 @@ def calculate_metrics(experiment, compute_n1=True, compute_ir=True, compute_dens
 
     # Create the calculation functions for parallelize the jobs
     def calculate_ir(item):
-        df = pd.read_csv(join(item[2]))
+        df = store.read(paths.data, item[0], 'labeled')
         y = df['class'].values
         item[1][item[0]] = imbalance_ratio(y)
 
     def calculate_gd(item):
-        df = pd.read_csv(join(item[2]))
+        df = store.read(paths.data, item[0], 'labeled')
         X = df.drop(columns=['class']).values
         item[1][item[0]] = geometric_diversity(X)
 
     def calculate_n1(item):
-        df = pd.read_csv(join(item[2]))
+        df = store.read(paths.data, item[0], 'labeled')
         X = df.drop(columns=['class']).values
         y = df['class'].values
         item[1][item[0]] = fraction_of_borderline_points(X, y)
 
     def calculate_density(item):
-        df = pd.read_csv(join(item[2]))
+        df = store.read(paths.data, item[0], 'labeled')
         X = df.drop(columns=['class']).values
         y = df['class'].values
         item[1][item[0]] = density(X, y)
 
     def calculate_std(item):
-        df = pd.read_csv(join(item[2]))
+        df = store.read(paths.data, item[0], 'labeled')
         X = df.drop(columns=['class']).values
         item[1][item[0]] = standard_deviation(X, normalize=True)
 
@@ -233,16 +233,18 @@ def calculate_generation_accuracy_per_rule(experiment):
     # Get the root path of the folder
     it_count = expt_info["context"]["iterations"]
 
-    # Load the last debug file if it exists
-    dataset = os.path.join(paths.data, "it_{}_debug.csv".format(it_count-1))
+    # Load the last debug dataset if it exists
+    try:
+        df = store.read(paths.data, it_count - 1, 'debug')
+    except FileNotFoundError:
+        df = None
     rule_perf = dict()
 
-    if os.path.exists(dataset):
+    if df is not None:
         expt_info["context"]["has_rule_gen_info"] = True  # Put a flag to notify other functions that this data exists
-        df = pd.read_csv(dataset)
         added_count = 0
         for _, row in df.iterrows():
-            if not math.isnan(row["rule_id"]):
+            if not pd.isna(row["rule_id"]):
                 added_count += 1
                 rule_id = int(row["rule_id"])
                 class_match_gen = row["classification"] == row["class"]
@@ -310,6 +312,28 @@ def create_folder_structure(experiment, test_data : str = None):
 # End def _create_folder_structure
 
 
+def export_datasets(experiment, names : Optional[List[str]] = None) -> List[str]:
+    """Write the files of the datasets of each iteration of an experiment from its dataset store, for the tools which
+    read them. The files which already exist are kept.
+
+    Args:
+        experiment (str): The reference of the experiment.
+        names (List[str]): The views to write, among 'raw', 'labeled', 'debug' and 'arff'. All of them if set to None.
+
+    Returns:
+        The paths of the files.
+    """
+    paths = get_paths(experiment)
+    names = list(store.FILE_NAMES.keys()) if names is None else names
+
+    written = list()
+    for i in store.iterations(paths.data):
+        for name in names:
+            written.append(store.export(paths.data, i, name))
+    return written
+# End def export_datasets
+
+
 def fetch_experiment_data(hostname, port, username, password, experiment, ignore_existing=False, quiet=False):
 
     dest_root = join(app_path.report_dir(), experiment)
@@ -320,6 +344,7 @@ def fetch_experiment_data(hostname, port, username, password, experiment, ignore
     Path(dest_root).mkdir(parents=True, exist_ok=True)
     Path(dest_models).mkdir(parents=True, exist_ok=True)
     Path(dest_data).mkdir(parents=True, exist_ok=True)
+    Path(join(dest_data, store.STORE_DIR)).mkdir(parents=True, exist_ok=True)
 
     # Create the ssh connection
     if quiet is not True:
@@ -354,10 +379,17 @@ def fetch_experiment_data(hostname, port, username, password, experiment, ignore
                 os.path.join(dest_root, "stats.json")
             )
 
-            # Listing all the file in the data directory
+            # Listing all the file in the data directory, and in its dataset store
             data_list = sftp.listdir(
                 os.path.join(remote_exp_dir, experiment, "data")
             )
+            try:
+                data_list.remove(store.STORE_DIR)
+                data_list += [join(store.STORE_DIR, p) for p in sftp.listdir(
+                    os.path.join(remote_exp_dir, experiment, "data", store.STORE_DIR)
+                )]
+            except ValueError:
+                pass  # Experiment recorded before the store existed
 
             # Listing all the files in the model directory
             try:
@@ -369,7 +401,8 @@ def fetch_experiment_data(hostname, port, username, password, experiment, ignore
                 model_list = []
 
     #
-    local_data      = os.listdir(dest_data)
+    local_data      = os.listdir(dest_data) + [join(store.STORE_DIR, p)
+                                               for p in os.listdir(join(dest_data, store.STORE_DIR))]
     local_models    = os.listdir(dest_models)
 
     # Create a list of files to download
@@ -9,7 +9,7 @@ import os
 import sys
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from weka.core import jvm
 
@@ -18,7 +18,8 @@ from fuzzsdn.common.utils import ExitCode
 from fuzzsdn.report import experiment
 
 
-def main(expt, node : Optional[str] = None, disable_fetching : bool = False, ignore_existing : bool = False, test_on_data : Optional[str] = None):
+def main(expt, node : Optional[str] = None, disable_fetching : bool = False, ignore_existing : bool = False, test_on_data : Optional[str] = None,
+         export_datasets : Optional[List[str]] = None):
 
     if node is not None:
         # First check if the node is the known hosts
@@ -94,6 +95,11 @@ def main(expt, node : Optional[str] = None, disable_fetching : bool = False, ign
     else:
         raise ValueError('There is no report folder for \"{}\" found locally'.format(expt))
 
+    # Write the files of the datasets requested from the dataset store
+    if export_datasets is not None:
+        print("Exporting the datasets...")
+        experiment.export_datasets(expt, export_datasets if len(export_datasets) > 0 else None)
+
     # Calculate the prediction accuracy of the rules
     try:
         experiment.calculate_generation_accuracy_per_rule(expt)
@@ -1,15 +1,10 @@
 #!/usr/bin/env python3
 # coding: utf-8
 import logging
-import os
-import signal
-import subprocess
-import sys
 import time
 
-from fuzzsdn.app import setup
+from fuzzsdn.app import setup, verdict
 from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, OnosDriver
-from fuzzsdn.common.utils.database import Database as SqlDb
 
 # ===== ( Parameters ) =================================================================================================
 
@@ -37,43 +32,48 @@ def initialize(**opts):
 def before_each(**opts):
     """Job before after each test."""
 
-    success = True
-
-    # Flush the logs of ONOS
-    success &= OnosDriver.flush_logs()
-
-    # Stop running instances of onos
-    success &= OnosDriver.stop()
-
-    # Start onos
-    success &= OnosDriver.start()
-    success &= OnosDriver.activate_app("org.onosproject.fwd")
-    success &= OnosDriver.set_log_level("INFO")
-
-    return success
+    # Start a clean instance of ONOS. In persistent mode, a running instance is only reset.
+    return OnosDriver.prepare(apps=("org.onosproject.fwd",), log_level="INFO")
 # End def before_each
 
 
 def after_each(**opts):
     """Job executed after each test."""
 
-    if SqlDb.is_connected():
-        logger.info("Disconnecting from the database...")
-        SqlDb.disconnect()
-        logger.info("Database is disconnected")
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
+
+    # In persistent mode, ONOS is kept running until the end of the series of tests
+    if not OnosDriver.is_persistent():
+        OnosDriver.stop()
+        logger.debug("done")
+# End def after_each
 
-    # Clean mininet
-    logger.info("Stopping Mininet")
-    MininetDriver.stop()
-    logger.debug("Done")
 
-    logger.info("Stopping Control Flow Fuzzer")
-    FuzzerDriver.stop(5)
-    logger.debug("Done")
+def between_each(**opts):
+    """Job executed between two tests of the same sequence. The controller is kept running."""
 
-    OnosDriver.stop()
-    logger.debug("done")
-# End def after_each
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
+# End def between_each
 
 
 def terminate(**opts):
@@ -97,18 +97,12 @@ def test(instruction=None, **opts):
     if instruction is not None:
         FuzzerDriver.set_instructions(instruction)
 
-    logger.info("Closing all previous instances on control flow fuzzer")
-
-    # TODO: Use the FuzzerDriver instead
-    for pid in get_pid("fuzzsdn-fuzzer.jar"):
-        os.kill(pid, signal.SIGKILL)
-
     logger.info("Starting Control Flow Fuzzer")
     FuzzerDriver.start()
 
     logger.info("Starting Mininet network")
 
-    MininetDriver.start(
+    MininetDriver.prepare(
         cmd='mn --controller=remote,ip={},port={},protocols=OpenFlow14 --topo=single,2'.format(setup.config().onos.host,
                                                                                                setup.config().fuzzer.port)
     )
@@ -122,22 +116,7 @@ def test(instruction=None, **opts):
     logger.info("Removing all flows from s1.")
     MininetDriver.delete_flow(sw='s1', strict=False)
 
-    # TODO: Synchronize with fuzzer instead
-    time.sleep(5)
+    # Wait for the fuzzer to report the fuzzed packet and for the controller to process it
+    FuzzerDriver.wait_for_completion(log_dir=OnosDriver.log_dir(), abort=verdict.is_final)
 
 # End def test
-
-
-# ===== ( Utility Functions ) ==========================================================================================
-
-def get_pid(name: str):
-    """ Search the PID of a program by its partial name"""
-    processes = subprocess.check_output(["ps", "-fea"]).decode(
-        sys.stdout.encoding).split('\n')
-    for p in processes:
-        args = p.split()
-        for part in args:
-            if name in part:
-                yield int(args[1])
-                break
-# End def get_pid
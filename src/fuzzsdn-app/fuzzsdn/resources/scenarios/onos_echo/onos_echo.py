@@ -1,15 +1,9 @@
 #!/usr/bin/env python3
 # coding: utf-8
 import logging
-import os
-import signal
-import subprocess
-import sys
-import time
 
-from fuzzsdn.app import setup
+from fuzzsdn.app import setup, verdict
 from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, OnosDriver
-from fuzzsdn.common.utils.database import Database as SqlDb
 
 # ===== ( Parameters ) =================================================================================================
 
@@ -37,43 +31,48 @@ def initialize(**opts):
 def before_each(**opts):
     """Job before after each test."""
 
-    success = True
-
-    # Flush the logs of ONOS
-    success &= OnosDriver.flush_logs()
-
-    # Stop running instances of onos
-    success &= OnosDriver.stop()
-
-    # Start onos
-    success &= OnosDriver.start()
-    success &= OnosDriver.activate_app("org.onosproject.fwd")
-    success &= OnosDriver.set_log_level("DEBUG")
-
-    return success
+    # Start a clean instance of ONOS. In persistent mode, a running instance is only reset.
+    return OnosDriver.prepare(apps=("org.onosproject.fwd",), log_level="DEBUG")
 # End def before_each
 
 
 def after_each(**opts):
     """Job executed after each test."""
 
-    if SqlDb.is_connected():
-        logger.info("Disconnecting from the database...")
-        SqlDb.disconnect()
-        logger.info("Database is disconnected")
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
+
+    # In persistent mode, ONOS is kept running until the end of the series of tests
+    if not OnosDriver.is_persistent():
+        OnosDriver.stop()
+        logger.debug("done")
+# End def after_each
 
-    # Clean mininet
-    logger.info("Stopping Mininet")
-    MininetDriver.stop()
-    logger.debug("Done")
 
-    logger.info("Stopping Control Flow Fuzzer")
-    FuzzerDriver.stop(5)
-    logger.debug("Done")
+def between_each(**opts):
+    """Job executed between two tests of the same sequence. The controller is kept running."""
 
-    OnosDriver.stop()
-    logger.debug("done")
-# End def after_each
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
+# End def between_each
 
 
 def terminate(**opts):
@@ -97,57 +96,16 @@ def test(instruction=None, **opts):
     if instruction is not None:
         FuzzerDriver.set_instructions(instruction)
 
-    logger.info("Closing all previous instances on control flow fuzzer")
-
-    # TODO: Use the FuzzerDriver instead
-    for pid in get_pid("PacketFuzzer.jar"):
-        os.kill(pid, signal.SIGKILL)
-
     logger.info("Starting Control Flow Fuzzer")
     FuzzerDriver.start()
 
     logger.info("Starting Mininet network")
 
-    MininetDriver.start(
+    MininetDriver.prepare(
         cmd='mn --controller=remote,ip={},port={},protocols=OpenFlow14 --topo=single,0'.format(setup.config().onos.host,
                                                                                                setup.config().fuzzer.port)
     )
-    # Just wait 10s. An echo should be sent
+    # Wait up to 30s for an echo to be sent and fuzzed
     # TODO: Wait for echo time depending on onos config
-    time.sleep(30)
-    # TODO: Synchronize with fuzzer
+    FuzzerDriver.wait_for_completion(log_dir=OnosDriver.log_dir(), timeout=30, abort=verdict.is_final)
 # End def test
-
-
-# ===== ( Utility Functions ) ==========================================================================================
-
-def count_db_entries():
-
-    count = 0
-    try:
-        if not SqlDb.is_connected():
-            SqlDb.connect("control_flow_fuzzer")
-        # Storing a new log message stating that onos crashed
-        SqlDb.execute("SELECT COUNT(*) FROM fuzzed_of_message")
-        SqlDb.commit()
-        count = SqlDb.fetchone()[0]
-    except (Exception,):
-        logger.exception("An exception happened while recording mininet crash:")
-    finally:
-        SqlDb.disconnect()
-
-    return count
-# End def count_db_entries
-
-
-def get_pid(name: str):
-    """ Search the PID of a program by its partial name"""
-    processes = subprocess.check_output(["ps", "-fea"]).decode(
-        sys.stdout.encoding).split('\n')
-    for p in processes:
-        args = p.split()
-        for part in args:
-            if name in part:
-                yield int(args[1])
-                break
-# End def get_pid
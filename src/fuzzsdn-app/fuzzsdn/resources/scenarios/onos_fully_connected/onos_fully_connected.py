@@ -4,16 +4,11 @@
 import importlib
 import json
 import logging
-import os
-import signal
-import subprocess
-import sys
 import time
 import random
 
-from fuzzsdn.app import setup
+from fuzzsdn.app import setup, verdict
 from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, OnosDriver
-from fuzzsdn.common.utils.database import Database as SqlDb
 
 # ===== ( Parameters ) =================================================================================================
 
@@ -43,47 +38,54 @@ def initialize(**opts):
 def before_each(**opts):
     """Job before after each test."""
 
-    success = True
+    # Start a clean instance of ONOS. In persistent mode, a running instance is only reset.
+    return OnosDriver.prepare(apps=("org.onosproject.fwd",), log_level="INFO")
 
-    # Flush the logs of ONOS
-    success &= OnosDriver.flush_logs()
 
-    # Stop running instances of onos
-    success &= OnosDriver.stop()
+# End def before_each
 
-    # Start onos
-    success &= OnosDriver.start()
-    success &= OnosDriver.activate_app("org.onosproject.fwd")
-    success &= OnosDriver.set_log_level("INFO")
 
-    return success
+def after_each(**opts):
+    """Job executed after each test."""
 
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
 
-# End def before_each
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
 
+    # In persistent mode, ONOS is kept running until the end of the series of tests
+    if not OnosDriver.is_persistent():
+        OnosDriver.stop()
+        logger.debug("done")
 
-def after_each(**opts):
-    """Job executed after each test."""
 
-    if SqlDb.is_connected():
-        logger.info("Disconnecting from the database...")
-        SqlDb.disconnect()
-        logger.info("Database is disconnected")
+# End def after_each
+
 
-    # Clean mininet
-    logger.info("Stopping Mininet")
-    MininetDriver.stop()
-    logger.debug("Done")
+def between_each(**opts):
+    """Job executed between two tests of the same sequence. The controller is kept running."""
 
-    logger.info("Stopping Control Flow Fuzzer")
-    FuzzerDriver.stop(5)
-    logger.debug("Done")
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
 
-    OnosDriver.stop()
-    logger.debug("done")
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
 
 
-# End def after_each
+# End def between_each
 
 
 def terminate(**opts):
@@ -109,12 +111,6 @@ def test(instruction=None, **opts):
     if instruction is not None:
         FuzzerDriver.set_instructions(instruction)
 
-    logger.info("Closing all previous instances on control flow fuzzer")
-
-    # TODO: Use the FuzzerDriver instead
-    for pid in get_pid("PacketFuzzer.jar"):
-        os.kill(pid, signal.SIGKILL)
-
     logger.info("Starting Control Flow Fuzzer")
     FuzzerDriver.start()
 
@@ -130,7 +126,7 @@ def test(instruction=None, **opts):
     if 'topo' in opts:
         topo = opts.get('topo', None)
 
-    MininetDriver.start(
+    MininetDriver.prepare(
         cmd="mn --custom {}".format(topo_path.as_posix())
             + " --topo={}".format(topo)
             + " --controller=remote,ip={},port={},protocols=OpenFlow14".format(setup.config().onos.host,
@@ -141,28 +137,14 @@ def test(instruction=None, **opts):
     logger.trace("Acquired nodes:\n{}".format(json.dumps(nodes, indent=4)))
     time.sleep(2)
 
-    if nodes is not None:
+    # The ping is only needed until the outcome of the test is known
+    if nodes is not None and not verdict.is_final():
         host_nodes = {key: nodes[key] for key in nodes.keys() if nodes[key]['type'] == 'host'}
         host1, host2 = random.sample(host_nodes.keys(), 2)  # Pick two random host from the list
         logger.info("Executing ping command: {} -> {}".format(host1, host2))
         stats = MininetDriver.ping_host(src=host1, dst=host2, count=1, wait_timeout=5)
         logger.trace("Ping results: {}".format(stats.as_dict() if stats is not None else stats))
 
-    # TODO: Synchronize with fuzzer instead
-    time.sleep(5)
+    # Wait for the fuzzer to report the fuzzed packet and for the controller to process it
+    FuzzerDriver.wait_for_completion(log_dir=OnosDriver.log_dir(), abort=verdict.is_final)
 # End def test
-
-
-# ===== ( Utility Functions ) ==========================================================================================
-
-def get_pid(name: str):
-    """ Search the PID of a program by its partial name"""
-    processes = subprocess.check_output(["ps", "-fea"]).decode(
-        sys.stdout.encoding).split('\n')
-    for p in processes:
-        args = p.split()
-        for part in args:
-            if name in part:
-                yield int(args[1])
-                break
-# End def get_pid
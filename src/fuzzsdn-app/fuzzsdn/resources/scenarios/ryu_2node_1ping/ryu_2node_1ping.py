@@ -1,13 +1,8 @@
 #!/usr/bin/env python3
 # coding: utf-8
 import logging
-import os
-import signal
-import subprocess
-import sys
-import time
 
-from fuzzsdn.app import setup
+from fuzzsdn.app import setup, verdict
 from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, RyuDriver
 
 # ===== ( Parameters ) =================================================================================================
@@ -37,7 +32,6 @@ def before_each(**opt):
 
     # Start onos
     success &= RyuDriver.start('ryu.app.simple_switch_14')
-    time.sleep(2)
     return success
 # End def before_each
 
@@ -45,21 +39,40 @@ def before_each(**opt):
 def after_each(**opt):
     """Job executed after each test."""
 
-    # Clean mininet
-    logger.info("Stopping Mininet")
-    MininetDriver.stop()
-    logger.debug("Done")
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
 
-    logger.info("Stopping Control Flow Fuzzer")
-    FuzzerDriver.stop(5)
-    logger.debug("Done")
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
 
     RyuDriver.stop()
-    time.sleep(2)
     logger.debug("done")
 # End def after_each
 
 
+def between_each(**opt):
+    """Job executed between two tests of the same sequence. The controller is kept running."""
+
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Control Flow Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
+# End def between_each
+
+
 def terminate(**opt):
     """Job to be executed after the end of a series of test"""
     pass
@@ -81,41 +94,23 @@ def test(instruction=None, **opt):
     if instruction is not None:
         FuzzerDriver.set_instructions(instruction)
 
-    logger.info("Closing all previous instances on control flow fuzzer")
-    for pid in get_pid("fuzzsdn-fuzzer.jar"):
-        os.kill(pid, signal.SIGKILL)
-
     logger.info("Starting Control Flow Fuzzer")
     FuzzerDriver.start()
-    time.sleep(5)
 
     logger.info("Starting Mininet network")
 
-    MininetDriver.start(
+    MininetDriver.prepare(
         cmd='mn --controller=remote,ip={},port={},protocols=OpenFlow14 --topo=single,2'.format(setup.config().ryu.host,
                                                                                                setup.config().fuzzer.port)
     )
 
-    logger.info("Executing ping command: h1 -> h2")
-    stats = MininetDriver.ping_host(src='h1', dst='h2', count=1, wait_timeout=5)
+    # The ping is only needed until the outcome of the test is known
+    if not verdict.is_final():
+        logger.info("Executing ping command: h1 -> h2")
+        stats = MininetDriver.ping_host(src='h1', dst='h2', count=1, wait_timeout=5)
+        logger.trace("Ping results: {}".format(stats.as_dict() if stats is not None else stats))
 
-    logger.trace("Ping results: {}".format(stats.as_dict() if stats is not None else stats))
-    time.sleep(5)
+    # Wait for the fuzzer to report the fuzzed packet and for the controller to process it
+    FuzzerDriver.wait_for_completion(log_dir=RyuDriver.log_dir(), abort=verdict.is_final)
 
 # End def run_fuzz_test
-
-
-# ===== ( Utility Functions ) ==========================================================================================
-
-
-def get_pid(name: str):
-    """ Search the PID of a program by its partial name"""
-    processes = subprocess.check_output(["ps", "-fea"]).decode(
-        sys.stdout.encoding).split('\n')
-    for p in processes:
-        args = p.split()
-        for part in args:
-            if name in part:
-                yield int(args[1])
-                break
-# End def get_pid
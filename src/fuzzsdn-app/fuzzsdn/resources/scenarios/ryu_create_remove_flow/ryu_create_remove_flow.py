@@ -1,15 +1,10 @@
 #!/usr/bin/env python3
 # coding: utf-8
 import logging
-import os
-import signal
-import subprocess
-import sys
 import time
 
-from fuzzsdn.app import setup
+from fuzzsdn.app import setup, verdict
 from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, RyuDriver
-from fuzzsdn.common.utils.database import Database as SqlDb
 
 # ===== ( Parameters ) =================================================================================================
 
@@ -38,7 +33,6 @@ def before_each(**opts):
 
     # Start Ryu
     success &= RyuDriver.start('ryu.app.simple_switch_14')
-    time.sleep(2)
 
     return success
 # End def before_each
@@ -47,25 +41,40 @@ def before_each(**opts):
 def after_each(**opts):
     """Job executed after each test."""
 
-    if SqlDb.is_connected():
-        logger.info("Disconnecting from the database...")
-        SqlDb.disconnect()
-        logger.info("Database is disconnected")
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
 
-    # Clean mininet
-    logger.info("Stopping Mininet")
-    MininetDriver.stop()
-    logger.debug("Done")
-
-    logger.info("Stopping fuzzer Fuzzer")
-    FuzzerDriver.stop(5)
-    logger.debug("Done")
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping fuzzer Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
 
     RyuDriver.stop()
     logger.debug("done")
 # End def after_each
 
 
+def between_each(**opts):
+    """Job executed between two tests of the same sequence. The controller is kept running."""
+
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping fuzzer Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
+# End def between_each
+
+
 def terminate(**opts):
     """Job to be executed after the end of a series of test"""
     return True
@@ -87,18 +96,12 @@ def test(instruction=None, **opts):
     if instruction is not None:
         FuzzerDriver.set_instructions(instruction)
 
-    logger.info("Closing all previous instances on control flow fuzzer")
-
-    # TODO: Use the FuzzerDriver instead
-    for pid in get_pid("fuzzsdn-fuzzer.jar"):
-        os.kill(pid, signal.SIGKILL)
-
     logger.info("Starting Control Flow Fuzzer")
     FuzzerDriver.start()
 
     logger.info("Starting Mininet network")
 
-    MininetDriver.start(
+    MininetDriver.prepare(
         cmd='mn --controller=remote,ip={},port={},protocols=OpenFlow14 --topo=single,2'.format(setup.config().onos.host,
                                                                                                setup.config().fuzzer.port)
     )
@@ -112,22 +115,7 @@ def test(instruction=None, **opts):
     logger.info("Removing all flows from s1.")
     MininetDriver.delete_flow(sw='s1', strict=True)
 
-    # TODO: Synchronize with fuzzer instead
-    time.sleep(5)
+    # Wait for the fuzzer to report the fuzzed packet and for the controller to process it
+    FuzzerDriver.wait_for_completion(log_dir=RyuDriver.log_dir(), abort=verdict.is_final)
 
 # End def test
-
-
-# ===== ( Utility Functions ) ==========================================================================================
-
-def get_pid(name: str):
-    """ Search the PID of a program by its partial name"""
-    processes = subprocess.check_output(["ps", "-fea"]).decode(
-        sys.stdout.encoding).split('\n')
-    for p in processes:
-        args = p.split()
-        for part in args:
-            if name in part:
-                yield int(args[1])
-                break
-# End def get_pid
@@ -4,14 +4,10 @@
 import importlib
 import json
 import logging
-import os
-import signal
-import subprocess
-import sys
 import time
 import random
 
-from fuzzsdn.app import setup
+from fuzzsdn.app import setup, verdict
 from fuzzsdn.app.drivers import FuzzerDriver, MininetDriver, RyuDriver
 
 # ===== ( Parameters ) =================================================================================================
@@ -42,28 +38,46 @@ def before_each(**opts):
 
     # Start Ryu
     success &= RyuDriver.start('ryu.app.simple_switch_stp_14')
-    time.sleep(2)
     return success
 # End def before_each
 
 
 def after_each(**opts):
     """Job executed after each test."""
-    # Clean mininet
-    logger.info("Stopping Mininet")
-    MininetDriver.stop()
-    logger.debug("Done")
-
-    logger.info("Stopping Fuzzer")
-    FuzzerDriver.stop(5)
-    logger.debug("Done")
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
 
     RyuDriver.stop()
-    time.sleep(2)
     logger.debug("done")
 # End def after_each
 
 
+def between_each(**opts):
+    """Job executed between two tests of the same sequence. The controller is kept running."""
+
+    # Clean mininet. In persistent mode, the network is kept until the end of the iteration
+    if not MininetDriver.is_persistent():
+        logger.info("Stopping Mininet")
+        MininetDriver.stop()
+        logger.debug("Done")
+
+    # In daemon mode, the fuzzer is kept until the end of the iteration
+    if not FuzzerDriver.is_daemon():
+        logger.info("Stopping Fuzzer")
+        FuzzerDriver.stop(5)
+        logger.debug("Done")
+# End def between_each
+
+
 def terminate(**opts):
     """Job to be executed after the end of a series of test"""
     pass
@@ -85,12 +99,6 @@ def test(instruction=None, **opts):
     if instruction is not None:
         FuzzerDriver.set_instructions(instruction)
 
-    logger.info("Closing all previous instances on control flow fuzzer")
-
-    # TODO: Use the FuzzerDriver instead
-    for pid in get_pid("fuzzsdn-fuzzer.jar"):
-        os.kill(pid, signal.SIGKILL)
-
     logger.info("Starting Control Flow Fuzzer")
     FuzzerDriver.start()
 
@@ -106,7 +114,7 @@ def test(instruction=None, **opts):
     if 'topo' in opts:
         topo = opts.get('topo', None)
 
-    MininetDriver.start(
+    MininetDriver.prepare(
         cmd="mn --custom {}".format(topo_path.as_posix())
             + " --topo={}".format(topo)
             + " --controller=remote,ip={},port={},protocols=OpenFlow14".format(setup.config().ryu.host,
@@ -117,28 +125,14 @@ def test(instruction=None, **opts):
     logger.trace("Acquired nodes:\n{}".format(json.dumps(nodes, indent=4)))
     time.sleep(2)
 
-    if nodes is not None:
+    # The ping is only needed until the outcome of the test is known
+    if nodes is not None and not verdict.is_final():
         host_nodes = {key: nodes[key] for key in nodes.keys() if nodes[key]['type'] == 'host'}
         host1, host2 = random.sample(host_nodes.keys(), 2)  # Pick two random host from the list
         logger.info("Executing ping command: {} -> {}".format(host1, host2))
         stats = MininetDriver.ping_host(src=host1, dst=host2, count=1, wait_timeout=5)
         logger.trace("Ping results: {}".format(stats.as_dict() if stats is not None else stats))
 
-    # TODO: Synchronize with fuzzer instead
-    time.sleep(5)
+    # Wait for the fuzzer to report the fuzzed packet and for the controller to process it
+    FuzzerDriver.wait_for_completion(log_dir=RyuDriver.log_dir(), abort=verdict.is_final)
 # End def test
-
-
-# ===== ( Utility Functions ) ==========================================================================================
-
-def get_pid(name: str):
-    """ Search the PID of a program by its partial name"""
-    processes = subprocess.check_output(["ps", "-fea"]).decode(
-        sys.stdout.encoding).split('\n')
-    for p in processes:
-        args = p.split()
-        for part in args:
-            if name in part:
-                yield int(args[1])
-                break
-# End def get_pid
@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Custom Mininet topology used to run several networks side by side on the same host.
+
+The topology wraps any topology known by "mn" and prefixes the name of all of its nodes, so the switches, their
+interfaces and the hosts of two sandboxes never collide. Usage:
+
+    mn --custom sandbox_topo.py --topo=prefixed,<prefix>,<topo>[,<topo args>]
+"""
+
+import re
+
+from mininet.topo import LinearTopo, MinimalTopo, SingleSwitchReversedTopo, SingleSwitchTopo, Topo
+from mininet.topolib import TorusTopo, TreeTopo
+
+######################################
+######### Global Variables ###########
+######################################
+
+# Topologies built into "mn"
+BUILTIN_TOPOS = {
+    'minimal'   : MinimalTopo,
+    'linear'    : LinearTopo,
+    'reversed'  : SingleSwitchReversedTopo,
+    'single'    : SingleSwitchTopo,
+    'tree'      : TreeTopo,
+    'torus'     : TorusTopo
+}
+
+
+######################################
+###### Define topologies here ########
+######################################
+
+class PrefixedTopo(Topo):
+    """A copy of another topology where all the node names are prefixed.
+
+        Args:
+            prefix (str): prefix to add to the node names
+            inner (Topo): topology to copy
+    """
+
+    def build(self, prefix, inner):
+
+        for node in inner.nodes():
+            info = dict(inner.nodeInfo(node))
+            if inner.isSwitch(node):
+                # Keep the dpid of the original name, otherwise Mininet infers it from the digits of the prefix
+                nums = re.findall(r'\d+', node)
+                if nums and 'dpid' not in info:
+                    info['dpid'] = '{:016x}'.format(int(nums[0]))
+                self.addSwitch(prefix + node, **info)
+            else:
+                self.addHost(prefix + node, **info)
+
+        for src, dst, info in inner.links(withInfo=True):
+            opts = {k: v for k, v in info.items() if k not in ('node1', 'node2')}
+            self.addLink(prefix + src, prefix + dst, **opts)
+# End class PrefixedTopo
+
+
+def prefixed(prefix, name, *args, **kwargs):
+    """Build the topology "name" with its arguments and prefix all its nodes."""
+    import __main__
+    topos = dict(BUILTIN_TOPOS)
+    topos.update(getattr(__main__, 'TOPOS', {}))  # Include the topologies of the other custom files given to "mn"
+    return PrefixedTopo(prefix=prefix, inner=topos[name](*args, **kwargs))
+# End def prefixed
+
+
+topos = {
+    'prefixed': prefixed,
+}
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from fuzzsdn.common.utils.log import add_logging_level
+
+# The application adds the TRACE level at startup, the modules under test log with it
+if not hasattr(logging, 'TRACE'):
+    add_logging_level('TRACE', logging.DEBUG - 1)
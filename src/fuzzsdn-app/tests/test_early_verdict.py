@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Tests that cutting a test short once its verdict is known (early_verdict) doesn't change its label: for each failure
+under test, the label decided from any prefix of the logs of a test accepted by `labeling.decides` must be the label
+decided from the complete logs.
+"""
+import pandas as pd
+import pytest
+
+from fuzzsdn.app.analytics.log import OnosLogParser
+from fuzzsdn.app.experiment import labeling
+from fuzzsdn.arguments import FailureToTestType as Fut
+
+# ===== ( Logs ) =======================================================================================================
+
+HELLO           = "Sending OF_13 Hello to /10.0.0.1:6653"
+OF_ERROR        = "Received error message OFBadActionErrorMsgVer13(xid=12, code=BAD_OUT_PORT, data=OFFlowMod())"
+PROCESSING      = "Error while processing message from switch NiciraSwitchHandshaker{session=10.0.0.1:52124, " \
+                  "dpid=00:00:00:00:00:00:00:01}"
+DECODER         = "io.netty.handler.codec.DecoderException: " \
+                  "org.projectfloodlight.openflow.exceptions.OFParseError: Wrong length: Expected to be >= 8, was: 4"
+DISCONNECTED    = "Switch disconnected callback for sw:[/10.0.0.1:52124 DPID[00:00:00:00:00:00:00:01]]. Cleaning up"
+
+LOGS = {
+    'no_error'              : [HELLO],
+    'error'                 : [HELLO, OF_ERROR],
+    'error_disconnection'   : [HELLO, OF_ERROR, DISCONNECTED],
+    'parsing_error'         : [HELLO, PROCESSING, DECODER],
+    'parsing_disconnection' : [HELLO, PROCESSING, DECODER, DISCONNECTED],
+}
+
+
+# ===== ( Helpers ) ====================================================================================================
+
+def _label(verdict, fut: str) -> str:
+    df = pd.DataFrame([dict(zip(('has_error', 'error_type', 'error_reason', 'error_effect'), verdict.as_tuple()))])
+    return labeling.label(df, fut, 'onos').iloc[0]
+# End def _label
+
+
+def _verdict(lines):
+    return OnosLogParser()._verdict("\n".join(lines) + "\n")
+# End def _verdict
+
+
+# ===== ( Tests ) ======================================================================================================
+
+@pytest.mark.parametrize('fut', labeling.names())
+@pytest.mark.parametrize('logs', LOGS.keys())
+def test_early_label_matches_full_label(fut, logs):
+    lines = LOGS[logs]
+    full_label = _label(_verdict(lines), fut)
+    for end in range(1, len(lines) + 1):
+        early = _verdict(lines[:end])
+        if labeling.decides(early, fut):
+            assert _label(early, fut) == full_label, "Label decided after {} line(s) of \"{}\"".format(end, logs)
+# End def test_early_label_matches_full_label
+
+
+def test_switch_disconnection_waits_for_the_effect():
+    early = _verdict([HELLO, OF_ERROR])
+    assert early.final is True
+    assert labeling.decides(early, Fut.SWITCH_DISCONNECTION) is False
+    assert labeling.decides(_verdict([HELLO, OF_ERROR, DISCONNECTED]), Fut.SWITCH_DISCONNECTION) is True
+# End def test_switch_disconnection_waits_for_the_effect
+
+
+def test_unknown_failure_waits_for_the_effect():
+    assert labeling.decides(_verdict([HELLO, OF_ERROR]), None) is False
+    assert labeling.decides(_verdict([HELLO, OF_ERROR]), Fut.PARSING_ERROR) is True
+# End def test_unknown_failure_waits_for_the_effect
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Tests that the log scanner finds the same matches, in the same order, as running `re.finditer` with each regex over the
+whole log.
+"""
+import random
+import re
+
+import pytest
+
+from fuzzsdn.app.analytics.log import LOG_KEYWORDS, LOG_RGX, LogScanner
+
+# ===== ( Logs ) =======================================================================================================
+
+ONOS_LINES = [
+    "2021-06-01T10:00:00,000 | DEBUG | Thread-1 | OFChannelHandler | Sending OF_14 Hello to /127.0.0.1:40500",
+    "2021-06-01T10:00:00,000 | DEBUG | Thread-1 | OFChannelHandler | Sending packet out",
+    "2021-06-01T10:00:00,000 | INFO  | Thread-1 | OFChannelHandler | New switch connection from /127.0.0.1:40500",
+    "2021-06-01T10:00:00,000 | INFO  | Thread-1 | DeviceManager | Added switch 00:00:00:00:00:01",
+    "2021-06-01T10:00:00,000 | ERROR | Thread-1 | OFChannelHandler | Error while processing message from switch "
+    "NiciraSwitchHandshaker{session=127.0.0.1:40500, dpid=00:00:00:00:00:00:00:01}",
+    "io.netty.handler.codec.DecoderException: org.projectfloodlight.openflow.exceptions.OFParseError: "
+    "Wrong length: Expected to be >= 16, was: 8",
+    "2021-06-01T10:00:00,000 | INFO  | Thread-1 | OFChannelHandler | Switch disconnected callback for sw:"
+    "[/127.0.0.1:40500 DPID[00:00:00:00:00:00:00:01]]. Cleaning up ...",
+    "2021-06-01T10:00:00,000 | WARN  | Thread-1 | OFChannelHandler | Received error message "
+    "OFBadActionErrorMsgVer14(xid=12, code=BAD_OUT_PORT, data=OFFlowMod())",
+    "New switch connection from /New switch connection from /127.0.0.1:40501",
+]
+ONOS_FILLER = "2021-06-01T10:00:00,000 | DEBUG | Thread-1 | FlowRuleManager | Flow rule stats updated for device"
+
+RYU_LINES = [
+    "EVENT ofp_event->switches EventOFPHello",
+    "hello ev <ryu.controller.ofp_event.EventOFPHello object at 0x7f2c1c0b5a90>",
+    "OFPErrorMsg(type=0x1, code=0x6, data=b'\\x05\\x0e\\x00\\x50')",
+    "Encountered an error while parsing OpenFlow packet from switch. This implies the switch sent a malformed "
+    "OpenFlow packet. version=0x5 msg_type=14",
+    "Traceback (most recent call last):\n  File \"ryu/controller.py\", line 10, in _recv_loop\n"
+    "struct.error: unpack_from requires a buffer of at least 8 bytes",
+]
+RYU_FILLER = "move onto main mode"
+
+
+def _log(lines, filler, length=2000, seed=0) -> str:
+    rng = random.Random(seed)
+    return "\n".join(rng.choice(lines) if rng.random() < 0.2 else filler for _ in range(length)) + "\n"
+# End def _log
+
+
+def _finditer_all(regexes, log_text):
+    found = list()
+    for rgx_key in regexes.keys():
+        for match in re.finditer(regexes[rgx_key], log_text):
+            found.append({'rgx_key': rgx_key, 'match': match})
+    return sorted(found, key=lambda m: m['match'].start())
+# End def _finditer_all
+
+
+def _spans(matches):
+    return [(m['rgx_key'], m['match'].span(), m['match'].groupdict()) for m in matches]
+# End def _spans
+
+
+# ===== ( Tests ) ======================================================================================================
+
+@pytest.mark.parametrize('ctrl, lines, filler', [('ONOS', ONOS_LINES, ONOS_FILLER), ('RYU', RYU_LINES, RYU_FILLER)],
+                         ids=['ONOS', 'RYU'])
+@pytest.mark.parametrize('seed', range(3))
+def test_same_matches_as_finditer(ctrl, lines, filler, seed):
+    log_text = _log(lines, filler, seed=seed)
+    scanner = LogScanner(LOG_RGX[ctrl], LOG_KEYWORDS[ctrl])
+
+    expected = _finditer_all(LOG_RGX[ctrl], log_text)
+    assert len(expected) > 0
+    assert _spans(scanner.scan(log_text)) == _spans(expected)
+# End def test_same_matches_as_finditer
+
+
+@pytest.mark.parametrize('ctrl', ['ONOS', 'RYU'])
+def test_no_keyword(ctrl):
+    assert LogScanner(LOG_RGX[ctrl], LOG_KEYWORDS[ctrl]).scan(ONOS_FILLER + "\n" + RYU_FILLER) == list()
+# End def test_no_keyword
+
+
+def test_missing_keyword():
+    with pytest.raises(ValueError):
+        LogScanner({'A': r'a', 'B': r'b'}, {'A': r'a'})
+# End def test_missing_keyword
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the ONOS REST client against a local HTTP stub standing in for the northbound API of ONOS.
+"""
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+from fuzzsdn.app.drivers.onos_rest import API_ROOT, OnosRestClient
+
+
+# ===== ( ONOS stub ) ==================================================================================================
+
+class OnosStub(ThreadingHTTPServer):
+    """HTTP server implementing the part of the northbound API of ONOS used by the client.
+
+    Args:
+        apps (dict): The state of the installed applications, by name. The applications listed in `activable` become
+                     "ACTIVE" when activated, the other ones stay in their state.
+        activable (set): The applications which can be activated.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, apps: dict, activable: set):
+        super().__init__(('127.0.0.1', 0), OnosStubHandler)
+        self.apps           = apps
+        self.activable      = activable
+        self.devices        = list()
+        self.hosts          = list()
+        self.flows          = list()
+        self.connections    = 0      # Number of connections opened by the clients
+        self.drop_next      = False  # Close the connection after the next response, without telling the client
+        self.thread         = threading.Thread(target=self.serve_forever, daemon=True)
+    # End def __init__
+# End class OnosStub
+
+
+class OnosStubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'  # Keep the connections alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+    # End def setup
+
+    def log_message(self, *_):
+        pass
+    # End def log_message
+
+    def do_GET(self):
+        path = self.__path()
+        if path == ['applications']:
+            self.__reply(200, {'applications': [{'name': n, 'state': s} for n, s in self.server.apps.items()]})
+        elif path in (['devices'], ['hosts'], ['flows']):
+            self.__reply(200, {path[0]: getattr(self.server, path[0])})
+        else:
+            self.__reply(404, None)
+    # End def do_GET
+
+    def do_POST(self):
+        self.__body()
+        path = self.__path()
+        if len(path) == 3 and path[0] == 'applications' and path[2] == 'active':
+            if path[1] not in self.server.apps:
+                self.__reply(404, None)
+                return
+            if path[1] in self.server.activable:
+                self.server.apps[path[1]] = 'ACTIVE'
+            self.__reply(200, {'name': path[1], 'state': self.server.apps[path[1]]})
+        else:
+            self.__reply(404, None)
+    # End def do_POST
+
+    def do_DELETE(self):
+        body = self.__body()
+        path = self.__path()
+        if path[0] == 'devices' and len(path) == 2:
+            self.server.devices = [d for d in self.server.devices if d['id'] != path[1]]
+            self.server.flows = [f for f in self.server.flows if f['deviceId'] != path[1]]
+        elif path[0] == 'hosts' and len(path) == 3:
+            self.server.hosts = [h for h in self.server.hosts if (h['mac'], str(h['vlan'])) != (path[1], path[2])]
+        elif path == ['flows']:
+            removed = {(f['deviceId'], f['flowId']) for f in body['flows']}
+            self.server.flows = [f for f in self.server.flows if (f['deviceId'], f['id']) not in removed]
+        elif len(path) == 3 and path[0] == 'applications' and path[2] == 'active':
+            self.server.apps[path[1]] = 'INSTALLED'
+        else:
+            self.__reply(404, None)
+            return
+        self.__reply(204, None)
+    # End def do_DELETE
+
+    def __path(self):
+        assert self.path.startswith(API_ROOT + '/')
+        return [unquote(p) for p in self.path[len(API_ROOT) + 1:].split('/')]
+    # End def __path
+
+    def __body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length)) if length > 0 else None
+    # End def __body
+
+    def __reply(self, status, content):
+        payload = json.dumps(content).encode() if content is not None else b''
+        self.send_response(status)
+        if status != 204:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        if self.server.drop_next is True:
+            self.server.drop_next = False
+            self.close_connection = True
+    # End def __reply
+# End class OnosStubHandler
+
+
+# ===== ( Fixtures ) ===================================================================================================
+
+@pytest.fixture
+def onos():
+    server = OnosStub(apps={'org.onosproject.openflow': 'INSTALLED', 'org.onosproject.broken': 'INSTALLED'},
+                      activable={'org.onosproject.openflow'})
+    server.thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+# End def onos
+
+
+@pytest.fixture
+def client(onos):
+    client = OnosRestClient('127.0.0.1', onos.server_address[1], 'onos', 'rocks', timeout=2.0)
+    yield client
+    client.close()
+# End def client
+
+
+# ===== ( Tests ) ======================================================================================================
+
+def test_is_ready(client):
+    assert client.is_ready() is True
+# End def test_is_ready
+
+
+def test_is_ready_without_onos():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]  # Nothing listens on the port once the socket is closed
+    assert OnosRestClient('127.0.0.1', port, 'onos', 'rocks', timeout=1.0).is_ready() is False
+# End def test_is_ready_without_onos
+
+
+def test_activate_app(client, onos):
+    assert client.activate_app('org.onosproject.openflow') is True
+    assert onos.apps['org.onosproject.openflow'] == 'ACTIVE'
+# End def test_activate_app
+
+
+def test_activate_unknown_app(client):
+    assert client.activate_app('org.onosproject.unknown') is None
+# End def test_activate_unknown_app
+
+
+def test_activate_app_not_active(client):
+    assert client.activate_app('org.onosproject.broken') is False
+# End def test_activate_app_not_active
+
+
+def test_purge(client, onos):
+    onos.devices    = [{'id': 'of:0000000000000001'}, {'id': 'of:0000000000000002'}]
+    onos.hosts      = [{'mac': '00:00:00:00:00:01', 'vlan': 'None'}]
+    onos.flows      = [{'deviceId': 'of:0000000000000001', 'id': '1'}, {'deviceId': 'of:0000000000000003', 'id': '2'}]
+
+    assert client.purge() is True
+    assert client.counts() == (0, 0, 0)
+# End def test_purge
+
+
+def test_keep_alive(client, onos):
+    for _ in range(5):
+        assert client.is_ready() is True
+    assert onos.connections == 1
+# End def test_keep_alive
+
+
+def test_reconnect_after_server_close(client, onos):
+    onos.drop_next = True
+    assert client.is_ready() is True  # The server closes the connection after this response
+
+    assert client.activate_app('org.onosproject.openflow') is True
+    assert onos.connections == 2
+# End def test_reconnect_after_server_close
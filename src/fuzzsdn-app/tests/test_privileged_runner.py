@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the checks of the arguments of the privileged helper.
+"""
+import os
+import subprocess
+
+import pytest
+
+from fuzzsdn.app.drivers import privileged_runner
+
+
+# ===== ( Node patterns ) ==============================================================================================
+
+@pytest.mark.parametrize('hosts, links', [
+    ('h1|h2', 's1|s1-*'),
+    ('sb0[A-Za-z_][A-Za-z0-9_]*', 'sb0[!0-9]*'),
+    ('', 's1'),
+])
+def test_clean_own_script_accepts_named_patterns(hosts, links):
+    assert 'Targeted cleanup complete' in privileged_runner.clean_own_script(hosts, links)
+# End def test_clean_own_script_accepts_named_patterns
+
+
+@pytest.mark.parametrize('hosts, links', [
+    ('', '*'),
+    ('', 's1|*'),
+    ('*', ''),
+    ('h1|', ''),
+    ('', '[a-z]*'),
+    ('', '1s'),
+    ('h1;reboot', ''),
+    ('', "s1'"),
+])
+def test_clean_own_script_rejects_other_patterns(hosts, links):
+    with pytest.raises(ValueError):
+        privileged_runner.clean_own_script(hosts, links)
+# End def test_clean_own_script_rejects_other_patterns
+
+
+def test_mn_clean_own_rejects_wildcard():
+    result, = privileged_runner.execute([{'op': 'mn_clean_own', 'links': '*'}], list(), os.getuid())
+    assert result['ok'] is False
+# End def test_mn_clean_own_rejects_wildcard
+
+
+# ===== ( Signals ) ====================================================================================================
+
+@pytest.fixture
+def child():
+    process = subprocess.Popen(['sleep', '30'])
+    yield process
+    process.kill()
+    process.wait()
+# End def child
+
+
+def test_kill_own_process(child):
+    result, = privileged_runner.execute([{'op': 'kill', 'signal': 'TERM', 'target': child.pid}], list(), os.getuid())
+    assert result['ok'] is True
+    assert child.wait(timeout=5) != 0
+# End def test_kill_own_process
+
+
+def test_kill_refuses_process_of_another_user(child):
+    other = os.getuid() + 4242
+    result, = privileged_runner.execute([{'op': 'kill', 'signal': 'KILL', 'target': child.pid}], list(), other)
+    assert result['ok'] is False
+    assert child.poll() is None
+# End def test_kill_refuses_process_of_another_user
+
+
+def test_kill_refuses_group_of_another_user(child):
+    other = os.getuid() + 4242
+    result, = privileged_runner.execute([{'op': 'kill', 'signal': 'KILL', 'target': -os.getpgid(child.pid)}],
+                                        list(), other)
+    assert result['ok'] is False
+    assert child.poll() is None
+# End def test_kill_refuses_group_of_another_user
+
+
+@pytest.mark.parametrize('target', [0, 1, -1])
+def test_kill_refuses_special_targets(target):
+    result, = privileged_runner.execute([{'op': 'kill', 'signal': 'KILL', 'target': target}], list(), os.getuid())
+    assert result['ok'] is False
+# End def test_kill_refuses_special_targets
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the dataset store: the partitions written for each iteration, the views derived from them, and the files of
+the views exported on demand.
+"""
+import os
+
+import pandas as pd
+
+from fuzzsdn.app.experiment import store
+
+
+# ===== ( Helpers ) ====================================================================================================
+
+def _samples(iteration, count, first_id=0, error_type=None, classes=('FAIL', 'PASS')):
+    return pd.DataFrame({
+        'sample_id'     : range(first_id, first_id + count),
+        'seq_id'        : range(first_id, first_id + count),
+        'iter_id'       : [iteration] * count,
+        'rule_id'       : [None] * count,
+        'field'         : [float(i) for i in range(count)],
+        'log_id'        : range(first_id, first_id + count),
+        'has_error'     : [1] * count,
+        'error_type'    : [error_type] * count,
+        'error_reason'  : [None] * count,
+        'error_effect'  : [None] * count,
+        'expression'    : [None] * count,
+        'classification': [None] * count,
+        'coverage'      : [None] * count,
+        'misclassified' : [None] * count,
+        'class'         : [classes[i % len(classes)] for i in range(count)],
+    })
+# End def _samples
+
+
+# ===== ( Tests ) ======================================================================================================
+
+def test_append_and_load(tmp_path):
+    data_dir = str(tmp_path)
+    store.append(data_dir, 0, _samples(0, 3))
+    store.append(data_dir, 1, _samples(1, 2, first_id=3))
+
+    assert store.iterations(data_dir) == [0, 1]
+    assert list(store.load(data_dir, 0)['sample_id']) == [0, 1, 2]
+    assert list(store.load(data_dir)['sample_id']) == [0, 1, 2, 3, 4]
+# End def test_append_and_load
+
+
+def test_append_replaces_partition(tmp_path):
+    data_dir = str(tmp_path)
+    store.append(data_dir, 0, _samples(0, 3))
+    store.append(data_dir, 0, _samples(0, 1))
+
+    assert len(store.load(data_dir).index) == 1
+    assert os.listdir(os.path.join(data_dir, store.STORE_DIR)) == ['it_0.parquet']
+# End def test_append_replaces_partition
+
+
+def test_views(tmp_path):
+    data_dir = str(tmp_path)
+    store.append(data_dir, 0, pd.concat([_samples(0, 2), _samples(0, 1, first_id=2, error_type='TIMEOUT')],
+                                        ignore_index=True))
+
+    debug = store.read(data_dir, 0, 'debug')
+    assert len(debug.index) == 3
+
+    labeled = store.read(data_dir, 0, 'labeled')
+    assert list(labeled.columns) == ['field', 'class']
+    assert len(labeled.index) == 2  # The tests which timed out are left out
+
+    raw = store.read(data_dir, 0, 'raw')
+    assert list(raw.columns) == ['field', 'has_error', 'error_type', 'error_reason', 'error_effect']
+# End def test_views
+
+
+def test_read_legacy_files(tmp_path):
+    data_dir = str(tmp_path)
+    pd.DataFrame({'field': [1.0], 'class': ['FAIL']}).to_csv(os.path.join(data_dir, 'it_0.csv'), index=False)
+
+    assert list(store.read(data_dir, 0, 'labeled')['class']) == ['FAIL']
+# End def test_read_legacy_files
+
+
+def test_export(tmp_path):
+    data_dir = str(tmp_path)
+    store.append(data_dir, 0, _samples(0, 2))
+    store.append(data_dir, 1, _samples(1, 2, first_id=2))
+
+    path = store.export(data_dir, 1, 'labeled')
+    assert os.path.basename(path) == 'it_1.csv'
+    assert len(pd.read_csv(path).index) == 4
+
+    path = store.export(data_dir, 0, 'arff')
+    assert os.path.basename(path) == 'it_0.arff'
+    with open(path) as f:
+        assert '@RELATION' in f.read().upper()
+# End def test_export
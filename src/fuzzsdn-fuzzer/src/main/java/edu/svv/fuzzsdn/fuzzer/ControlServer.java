@@ -0,0 +1,225 @@
+package edu.svv.fuzzsdn.fuzzer;
+
+import edu.svv.fuzzsdn.common.exceptions.ParsingException;
+import edu.svv.fuzzsdn.fuzzer.instructions.InstructionSet;
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+import javax.json.Json;
+import javax.json.JsonException;
+import javax.json.JsonObject;
+import javax.json.JsonObjectBuilder;
+import javax.json.JsonReader;
+import javax.json.JsonValue;
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.io.StringReader;
+import java.io.Writer;
+import java.net.InetAddress;
+import java.net.ServerSocket;
+import java.net.Socket;
+import java.nio.charset.StandardCharsets;
+
+/**
+ * Control channel of a long-running fuzzer. The server listens on the loopback interface and lets a client replace the
+ * instructions of the {@link Fuzzer} and fetch its reports without restarting the application.
+ * <p>
+ * Requests and responses are JSON objects, one per line. A request holds a "command" and its arguments:
+ * <ul>
+ *     <li>{@code {"command": "ping"}}: checks that the fuzzer is alive.</li>
+ *     <li>{@code {"command": "instructions", "instructions": {...}}}: replaces the instructions of the fuzzer and
+ *         discards its last report.</li>
+ *     <li>{@code {"command": "report"}}: returns the report of the last fuzzed packet, if any.</li>
+ *     <li>{@code {"command": "reset"}}: discards the last report.</li>
+ * </ul>
+ * Each response has a "status" which is "ok", "pending" (no report yet) or "error" (with a "reason").
+ * Clients are served one at a time.
+ */
+public class ControlServer implements Runnable
+{
+    // ===== ( Members ) ===============================================================================================
+
+    // Logger
+    private static final Logger log = LoggerFactory.getLogger(ControlServer.class);
+
+    private final Fuzzer        mFuzzer;
+    private final int           mPort;
+    private ServerSocket        mServerSocket;
+    private volatile boolean    mRunning;
+
+    // ===== ( Constructor ) ===========================================================================================
+
+    /**
+     * Create a control server for a fuzzer.
+     *
+     * @param fuzzer the {@link Fuzzer} controlled by the server
+     * @param port   the port on which the server listens
+     */
+    public ControlServer(Fuzzer fuzzer, int port)
+    {
+        this.mFuzzer    = fuzzer;
+        this.mPort      = port;
+        this.mRunning   = false;
+    }
+
+    // ===== ( Public Methods ) ========================================================================================
+
+    /**
+     * Listen for clients until the server is stopped.
+     */
+    @Override
+    public void run()
+    {
+        try (ServerSocket serverSocket = new ServerSocket(mPort, 1, InetAddress.getLoopbackAddress()))
+        {
+            mServerSocket = serverSocket;
+            mRunning = true;
+            log.info("Control server listening on port {}", mPort);
+
+            while (mRunning)
+            {
+                try (Socket client = serverSocket.accept())
+                {
+                    log.debug("New control client: {}", client.getRemoteSocketAddress());
+                    serve(client);
+                }
+                catch (IOException e)
+                {
+                    if (mRunning)
+                        log.warn("The connection with the control client has been lost:", e);
+                }
+            }
+        }
+        catch (IOException e)
+        {
+            log.error("Couldn't start the control server on port {}", mPort, e);
+        }
+        finally
+        {
+            mRunning = false;
+        }
+    }
+
+    /**
+     * Stop the server. The connection with the current client is closed.
+     */
+    public void stop()
+    {
+        mRunning = false;
+        try
+        {
+            if (mServerSocket != null)
+                mServerSocket.close();
+        }
+        catch (IOException e)
+        {
+            log.warn("An exception occurred while closing the control server:", e);
+        }
+    }
+
+    /**
+     * @return {@code true} if the server is listening for clients
+     */
+    public boolean isRunning()
+    {
+        return mRunning;
+    }
+
+    // ===== ( Private Methods ) =======================================================================================
+
+    /**
+     * Answer the requests of a client until it disconnects.
+     *
+     * @param client the {@link Socket} of the client
+     * @throws IOException if the connection fails
+     */
+    private void serve(Socket client) throws IOException
+    {
+        BufferedReader in = new BufferedReader(new InputStreamReader(client.getInputStream(), StandardCharsets.UTF_8));
+        Writer out = new BufferedWriter(new OutputStreamWriter(client.getOutputStream(), StandardCharsets.UTF_8));
+
+        String line;
+        while (mRunning && (line = in.readLine()) != null)
+        {
+            if (line.isBlank())
+                continue;
+
+            out.write(handle(line).toString());
+            out.write('\n');
+            out.flush();
+        }
+    }
+
+    /**
+     * Execute a request.
+     *
+     * @param line the JSON representation of the request
+     * @return the response to the request
+     */
+    JsonObject handle(String line)
+    {
+        JsonObject request;
+        try (JsonReader reader = Json.createReader(new StringReader(line)))
+        {
+            request = reader.readObject();
+        }
+        catch (JsonException | IllegalStateException e)
+        {
+            return error("Malformed request: " + e.getMessage());
+        }
+
+        String command = request.getString("command", "");
+        log.trace("Control command: {}", command);
+        switch (command)
+        {
+            case "ping":
+                return status("ok").build();
+
+            case "instructions":
+                if (!request.containsKey("instructions")
+                        || request.get("instructions").getValueType() != JsonValue.ValueType.OBJECT)
+                {
+                    return error("No \"instructions\" object in the request");
+                }
+
+                try
+                {
+                    InstructionSet instructionSet = InstructionSet.READER.readJSON(request.getJsonObject("instructions"));
+                    mFuzzer.setInstructionSet(instructionSet);
+                    log.info("Applying fuzzer instructions from the control channel:\n\t{}", instructionSet);
+                    return status("ok").build();
+                }
+                catch (ParsingException | RuntimeException e)
+                {
+                    log.error("Couldn't decode the fuzzer instructions from the control channel:", e);
+                    return error("Invalid instructions: " + e.getMessage());
+                }
+
+            case "report":
+                Report report = mFuzzer.getLastReport();
+                if (report == null)
+                    return status("pending").build();
+                return status("ok").add("report", report.toJSON()).build();
+
+            case "reset":
+                mFuzzer.clearLastReport();
+                return status("ok").build();
+
+            default:
+                return error("Unknown command \"" + command + "\"");
+        }
+    }
+
+    private static JsonObjectBuilder status(String status)
+    {
+        return Json.createObjectBuilder().add("status", status);
+    }
+
+    private static JsonObject error(String reason)
+    {
+        return status("error").add("reason", reason == null ? "" : reason).build();
+    }
+}
@@ -35,6 +35,7 @@ public class Core
     private final TCPProxy mProxy;
     private final Listener mListener;
     private final Fuzzer mPacketFuzzer;
+    private ControlServer mControlServer = null;
 
     // Thread Executor
     private final ExecutorService mThreadPool = Executors.newFixedThreadPool(10);
@@ -149,6 +150,16 @@ public class Core
                 .setProxyHandler(this.mPacketFuzzer);
         log.info("Starting TCP proxy.");
         mThreadPool.execute(mProxy);
+
+        // 3. Start the control server if a control port is given. The reports are then fetched through the control
+        //    channel instead of the report file.
+        if (!Utils.isNullOrEmpty(mConfig.get("ControlPort")) && mConfig.getInt("ControlPort", 0) > 0)
+        {
+            log.info("Starting Control Server.");
+            mControlServer = new ControlServer(mPacketFuzzer, mConfig.getInt("ControlPort", 0));
+            mPacketFuzzer.writeReportFile(false);
+            mThreadPool.execute(mControlServer);
+        }
     }
 
     /**
@@ -170,6 +181,13 @@ public class Core
             mProxy.stop();
         }
 
+        // Stops the control server
+        if (mControlServer != null && mControlServer.isRunning())
+        {
+            log.info("Stopping Control Server");
+            mControlServer.stop();
+        }
+
         // Close the threads
         try
         {
@@ -41,7 +41,9 @@ public class Fuzzer implements ProxyHandler
 
     // Members
     private final OFMessageReader<OFMessage>    mOfReader;
-    private InstructionSet                      mInstructionSet;
+    private volatile InstructionSet             mInstructionSet;
+    private volatile Report                     mLastReport;
+    private volatile boolean                    mWriteReportFile;
     private OFVersion                           mOfVersion;
 
     // ===== ( Constructor ) ===========================================================================================
@@ -52,6 +54,9 @@ public class Fuzzer implements ProxyHandler
     public Fuzzer()
     {
         log.info("Setting up {}", getClass().getSimpleName());
+        this.mLastReport = null;
+        this.mWriteReportFile = true;
+
         // Get configuration instance
         Configuration config = Configuration.getInstance();
 
@@ -99,7 +104,7 @@ public class Fuzzer implements ProxyHandler
         // Set the initial fuzzer instructions
         // TODO: Handle the case where the instructions are passed via arguments
         //       If there is a default fuzzer instruction file, read it
-        String path = AppPaths.userConfigDir().resolve("fuzzer_instr.json").toAbsolutePath().toString();
+        String path = config.get("InstructionsPath", AppPaths.userConfigDir().resolve("fuzzer_instr.json").toAbsolutePath().toString());
         File f = new File(path);
         if(f.exists() && !f.isDirectory())
         {
@@ -147,6 +152,53 @@ public class Fuzzer implements ProxyHandler
         return this;
     }
 
+    /**
+     * Replace the fuzzer instructions. The report of the last fuzzed packet is discarded.
+     *
+     * @param instructionSet : the new {@link InstructionSet}
+     * @return this Fuzzer object
+     */
+    public Fuzzer setInstructionSet(InstructionSet instructionSet)
+    {
+        this.mLastReport = null;
+        this.mInstructionSet = instructionSet;
+        return this;
+    }
+
+    /**
+     * Enable or disable the writing of the reports to the report file. The last report is always kept in memory.
+     *
+     * @param enable : {@code true} to write the reports to the report file
+     * @return this Fuzzer object
+     */
+    public Fuzzer writeReportFile(boolean enable)
+    {
+        this.mWriteReportFile = enable;
+        return this;
+    }
+
+    /**
+     * Discard the report of the last fuzzed packet.
+     *
+     * @return this Fuzzer object
+     */
+    public Fuzzer clearLastReport()
+    {
+        this.mLastReport = null;
+        return this;
+    }
+
+    // ===== ( Getters ) ===============================================================================================
+
+    /**
+     * @return the {@link Report} of the last fuzzed packet, or {@code null} if no packet has been fuzzed since the
+     *         instructions have been set
+     */
+    public Report getLastReport()
+    {
+        return mLastReport;
+    }
+
     // ===== ( Private Methods ) =======================================================================================
 
     /**
@@ -224,7 +276,8 @@ public class Fuzzer implements ProxyHandler
             // Save the final message to fuzzing report
             report
                     .setFinalPacket(msgBuf)
-                    .setEnd();
+                    .setEnd(mWriteReportFile);
+            mLastReport = report;
 
             if (log.isTraceEnabled())
             {
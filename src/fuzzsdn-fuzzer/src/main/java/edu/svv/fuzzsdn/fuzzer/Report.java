@@ -3,6 +3,7 @@ package edu.svv.fuzzsdn.fuzzer;
 import edu.svv.fuzzsdn.fuzzer.instructions.actions.Action;
 import edu.svv.fuzzsdn.common.openflow.PktStruct;
 import edu.svv.fuzzsdn.fuzzer.configuration.AppPaths;
+import edu.svv.fuzzsdn.fuzzer.configuration.Configuration;
 import edu.svv.fuzzsdn.common.utils.ByteBufUtil;
 import io.netty.buffer.ByteBuf;
 import org.apache.commons.codec.binary.Base64;
@@ -15,6 +16,10 @@ import javax.json.JsonObjectBuilder;
 import java.io.FileWriter;
 import java.io.IOException;
 import java.math.BigInteger;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
 import java.time.Instant;
 import java.util.ArrayList;
 import java.util.Arrays;
@@ -120,9 +125,21 @@ public class Report
      * Sets the packet structure
      */
     public Report setEnd()
+    {
+        return setEnd(true);
+    }
+
+    /**
+     * Sets the end time of the report
+     *
+     * @param writeToFile   if {@code true}, the report is written to the report file
+     * @return              This {@code Report} object
+     */
+    public Report setEnd(boolean writeToFile)
     {
         this.end = Instant.now().toEpochMilli();
-        this.writeToFile();
+        if (writeToFile)
+            this.writeToFile();
         return this;
     }
 
@@ -278,19 +295,24 @@ public class Report
     }
 
     /**
-     * Write the report to a file.
+     * Write the report to a file. The report is first written to a temporary file which is then moved to the report
+     * path, so the report file appears only once it is complete.
      *
      * @return          The corresponding {@link JsonObject}
      */
     public boolean writeToFile()
     {
         boolean success = false;
-        String fileName = AppPaths.userDataDir().resolve("fuzz_report.json").toAbsolutePath().toString();
+        String fileName = Configuration.getInstance().get(
+                "ReportPath",
+                AppPaths.userDataDir().resolve("fuzz_report.json").toAbsolutePath().toString()
+        );
+        Path tmpPath = Paths.get(fileName + ".tmp");
 
         try
         {
             // Constructs a FileWriter given a file name, using the platform's default charset
-            file = new FileWriter(fileName);
+            file = new FileWriter(tmpPath.toString());
             file.write(this.toJSON().toString());
             success = true;
         }
@@ -311,6 +333,20 @@ public class Report
                 e.printStackTrace();
             }
         }
+
+        // Move the complete report to its final location
+        if (success)
+        {
+            try
+            {
+                Files.move(tmpPath, Paths.get(fileName), StandardCopyOption.ATOMIC_MOVE, StandardCopyOption.REPLACE_EXISTING);
+            }
+            catch (IOException e)
+            {
+                e.printStackTrace();
+                success = false;
+            }
+        }
         return success;
     }
 
@@ -43,6 +43,8 @@ public class Configuration
     public static final int DFLT_SDN_SWITCH_PORT    = 52525;                            // Port used by the application to connect with the SDN Switch
     public static final int DFLT_SDN_CTRL_OF_PORT   = 6653;                             // Port used by the SDN Controller
 
+    public static final String PROPERTY_PREFIX      = "fuzzsdn.";                       // Prefix of the system properties overriding the configuration file
+
     // ===== ( Constructor ) ===========================================================================================
 
     /**
@@ -244,6 +246,16 @@ public class Configuration
 
             log.debug("Loading configuration file...");
             this.properties.load(new FileInputStream(AppPaths.userConfigFile().toAbsolutePath().toString()));
+
+            // Override the parameters given as system properties (i.e. "-Dfuzzsdn.<key>=<value>")
+            for (String name : System.getProperties().stringPropertyNames())
+            {
+                if (name.startsWith(PROPERTY_PREFIX))
+                {
+                    log.debug("Overriding configuration parameter \"{}\"", name.substring(PROPERTY_PREFIX.length()));
+                    this.properties.setProperty(name.substring(PROPERTY_PREFIX.length()), System.getProperty(name));
+                }
+            }
         }
         catch (IOException e)
         {